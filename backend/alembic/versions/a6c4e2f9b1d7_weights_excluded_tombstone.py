@@ -0,0 +1,34 @@
+"""weights excluded (tombstones de escenarios hijos)
+
+Revision ID: a6c4e2f9b1d7
+Revises: f2a7d3c8e6b1
+Create Date: 2026-10-21 09:41:27.530216
+
+- category_weights.excluded / indicator_weights.excluded: un hijo marca con
+  una fila así lo que quita de lo heredado (p.ej. un entorno eliminado);
+  gana sobre el peso del padre como cualquier fila propia.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a6c4e2f9b1d7"
+down_revision: Union[str, None] = "f2a7d3c8e6b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("category_weights", "indicator_weights"):
+        op.add_column(
+            table,
+            sa.Column("excluded", sa.Boolean(), nullable=False, server_default=sa.false()),
+        )
+
+
+def downgrade() -> None:
+    for table in ("indicator_weights", "category_weights"):
+        op.drop_column(table, "excluded")
@@ -0,0 +1,60 @@
+"""indicator_values covering indexes
+
+Revision ID: b7d2e4f1a6c3
+Revises: 7f0a9c123abc
+Create Date: 2026-10-19 10:12:31.418207
+
+Índices alineados a las consultas reales sobre indicator_values:
+
+- idx_iv_scenario_country_cover (scenario_id, country_id, indicator_id, normalized_value)
+    analytics: valores normalizados de un país en un escenario, y
+    DISTINCT country_id de un escenario → index-only.
+    listado: filtro escenario + país.
+- idx_iv_scenario_indicator_cover (scenario_id, indicator_id, country_id, normalized_value)
+    listado / conteo: filtro escenario + indicador → index-only para el count.
+- idx_iv_scenario_id (scenario_id, id)
+    listado por escenario ordenado por id DESC (OFFSET / keyset) sin filesort.
+
+El borrado en cascada por categoría (indicator_id IN (...) en todos los
+escenarios) ya se resuelve con idx_indicator_values_indicator.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d2e4f1a6c3"
+down_revision: Union[str, None] = "7f0a9c123abc"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = {
+    "idx_iv_scenario_country_cover": ["scenario_id", "country_id", "indicator_id", "normalized_value"],
+    "idx_iv_scenario_indicator_cover": ["scenario_id", "indicator_id", "country_id", "normalized_value"],
+    "idx_iv_scenario_id": ["scenario_id", "id"],
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    existing = {idx["name"] for idx in insp.get_indexes("indicator_values")}
+
+    for name, columns in INDEXES.items():
+        # si ya existe (create_all / intentos previos), no lo recreamos
+        if name in existing:
+            continue
+        op.create_index(name, "indicator_values", columns, unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    existing = {idx["name"] for idx in insp.get_indexes("indicator_values")}
+
+    for name in reversed(list(INDEXES)):
+        if name in existing:
+            op.drop_index(name, table_name="indicator_values")
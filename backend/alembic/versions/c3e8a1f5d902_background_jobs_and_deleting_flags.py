@@ -0,0 +1,59 @@
+"""background jobs and deleting flags
+
+Revision ID: c3e8a1f5d902
+Revises: b7d2e4f1a6c3
+Create Date: 2026-10-19 16:40:12.503118
+
+- scenarios.deleting / categories.deleting: el borrado en cascada corre en
+  segundo plano por lotes; mientras tanto la fila queda marcada y la app la
+  ignora.
+- background_jobs: estado y progreso de esos trabajos (app/services/jobs.py).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3e8a1f5d902"
+down_revision: Union[str, None] = "b7d2e4f1a6c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("scenarios", "categories"):
+        op.add_column(
+            table,
+            sa.Column("deleting", sa.Boolean(), nullable=False, server_default=sa.false()),
+        )
+
+    op.create_table(
+        "background_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(length=50), nullable=False),
+        sa.Column("target_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("done", sa.Integer(), nullable=False),
+        sa.Column("error", sa.String(length=500), nullable=True),
+        sa.Column("worker", sa.String(length=100), nullable=True),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_background_jobs_id", "background_jobs", ["id"])
+    op.create_index("idx_background_jobs_status", "background_jobs", ["status"])
+    op.create_index("idx_background_jobs_kind_target", "background_jobs", ["kind", "target_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_background_jobs_kind_target", table_name="background_jobs")
+    op.drop_index("idx_background_jobs_status", table_name="background_jobs")
+    op.drop_index("ix_background_jobs_id", table_name="background_jobs")
+    op.drop_table("background_jobs")
+
+    for table in ("categories", "scenarios"):
+        op.drop_column(table, "deleting")
@@ -0,0 +1,34 @@
+"""scenario parent (copy-on-write inheritance)
+
+Revision ID: e5f1c9a7b2d4
+Revises: c3e8a1f5d902
+Create Date: 2026-10-19 18:05:41.220914
+
+- scenarios.parent_id: un escenario puede heredar de otro. El hijo guarda
+  solo los valores / pesos que cambia; las lecturas resuelven la cadena.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5f1c9a7b2d4"
+down_revision: Union[str, None] = "c3e8a1f5d902"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("scenarios", sa.Column("parent_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_scenarios_parent_id", "scenarios", "scenarios", ["parent_id"], ["id"]
+    )
+    op.create_index("ix_scenarios_parent_id", "scenarios", ["parent_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scenarios_parent_id", table_name="scenarios")
+    op.drop_constraint("fk_scenarios_parent_id", "scenarios", type_="foreignkey")
+    op.drop_column("scenarios", "parent_id")
@@ -0,0 +1,31 @@
+"""background jobs heartbeat (lease)
+
+Revision ID: f2a7d3c8e6b1
+Revises: e5f1c9a7b2d4
+Create Date: 2026-10-20 10:12:03.418552
+
+- background_jobs.heartbeat_at: el worker dueño lo renueva mientras vive;
+  solo se retoman jobs cuyo heartbeat venció (JOB_LEASE_SECONDS).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a7d3c8e6b1"
+down_revision: Union[str, None] = "e5f1c9a7b2d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "background_jobs",
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("background_jobs", "heartbeat_at")
@@ -14,6 +14,73 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     CORS_ORIGINS: List[str]
 
+    # Pool de conexiones (se ignora en SQLite). Con N workers de uvicorn el
+    # máximo de conexiones es N * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800      # segundos; < wait_timeout de MySQL
+    DB_POOL_TIMEOUT: float = 30.0    # espera máxima por una conexión libre
+    DB_POOL_PRE_PING: bool = True
+
+    # Réplica de lectura (app/core/read_routing.py). Si se define, las rutas
+    # públicas / catálogo / exportaciones leen de aquí; quien acaba de
+    # escribir sigue en el primario durante READ_STICKY_SECONDS.
+    READ_DATABASE_URL: str | None = None
+    READ_STICKY_SECONDS: float = 5.0
+
+    # Motor async para rutas de lectura (app/db_async.py). Si no se da
+    # ASYNC_DATABASE_URL se deriva de READ_DATABASE_URL o, si no hay
+    # réplica, de DATABASE_URL (pymysql → aiomysql).
+    ASYNC_DB_ENABLED: bool = False
+    ASYNC_DATABASE_URL: str | None = None
+
+    # Requests más lentas que esto se registran en el log con su número
+    # de queries y tiempo en BD (app/core/query_stats.py)
+    SLOW_REQUEST_SECONDS: float = 1.0
+
+    # Queries más lentas que esto se agregan por SQL normalizado en una
+    # tabla en memoria de SLOW_QUERY_LOG_SIZE entradas (0 = desactivado),
+    # visible en /admin/slow-queries (app/core/slow_queries.py)
+    SLOW_QUERY_SECONDS: float = 0.1
+    SLOW_QUERY_LOG_SIZE: int = 200
+
+    # Perfilado opt-in (X-Profile: 1, solo ADMIN; app/core/profiling.py).
+    # Se guardan como mucho PROFILE_MAX_FILES perfiles en PROFILE_DIR.
+    PROFILING_ENABLED: bool = True
+    PROFILE_DIR: str = "/tmp/ceipa-profiles"
+    PROFILE_MAX_FILES: int = 50
+
+    # Trazas (app/core/tracing.py): fracción de requests trazadas (0 = solo
+    # las que llegan con `traceparent` muestreado). Exportador "jsonl"
+    # (TRACING_FILE) u "otlp" (OTLP/HTTP JSON a TRACING_OTLP_URL).
+    TRACING_SAMPLE_RATE: float = 0.0
+    TRACING_EXPORTER: str = "jsonl"
+    TRACING_FILE: str = "/tmp/ceipa-traces.jsonl"
+    TRACING_FILE_MAX_BYTES: int = 50_000_000
+    TRACING_OTLP_URL: str = "http://localhost:4318/v1/traces"
+
+    # Trabajos en segundo plano (app/services/jobs.py): hilos por proceso y
+    # filas por lote en los borrados en cascada (una transacción por lote)
+    JOB_WORKERS: int = 1
+    JOB_HEARTBEAT_SECONDS: float = 10.0
+    JOB_LEASE_SECONDS: float = 60.0   # sin heartbeat en este tiempo, el job se retoma
+    DELETE_BATCH_SIZE: int = 2000
+
+    # Cache de tokens / usuarios en get_current_user (0 = desactivada).
+    # Es por proceso: con varios workers, un cambio de rol / borrado tarda
+    # como mucho este tiempo en verse en los demás.
+    AUTH_CACHE_TTL_SECONDS: float = 30.0
+
+    # Token compartido para que Prometheus lea /metrics
+    # (`Authorization: Bearer <METRICS_TOKEN>`). Sin él, solo un ADMIN.
+    METRICS_TOKEN: str | None = None
+
+    # Pool de procesos para bcrypt (login / alta / cambio de contraseña).
+    # 0 workers = se ejecuta en el threadpool, como antes.
+    PASSWORD_POOL_WORKERS: int = 2
+    # Operaciones en cola + en curso antes de rechazar con 503
+    PASSWORD_POOL_MAX_PENDING: int = 32
+
     class Config:
         env_file = str(ENV_PATH)
         extra = "ignore"
@@ -0,0 +1,99 @@
+# app/core/auth_cache.py
+"""
+Cache de autenticación para get_current_user:
+
+- token → (sub, exp): evita verificar la firma del JWT en cada request.
+  Nunca se devuelve un token vencido (se compara exp en cada hit).
+- user_id → CurrentUser: foto inmutable del usuario (id, rol, ...), así
+  los guards de rol no hacen un SELECT por request.
+
+Las rutas de users llaman a invalidate_user() al cambiar rol / contraseña
+/ datos o al borrar, y el cambio se ve de inmediato en este proceso. En
+otros workers tarda como mucho AUTH_CACHE_TTL_SECONDS.
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.security import decode_token_claims
+from app.models.user import User
+
+_ttl = settings.AUTH_CACHE_TTL_SECONDS
+_tokens = TTLCache("auth_tokens", ttl_seconds=_ttl, maxsize=4096)
+_users = TTLCache("auth_users", ttl_seconds=_ttl, maxsize=1024)
+
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """Usuario autenticado (sin password_hash); compatible con UserOut."""
+
+    id: int
+    name: str
+    email: str
+    role: str
+    created_at: datetime | None
+    password_update_datetime: datetime | None
+
+    @classmethod
+    def from_model(cls, u: User) -> "CurrentUser":
+        return cls(
+            id=u.id,
+            name=u.name,
+            email=u.email,
+            role=u.role,
+            created_at=u.created_at,
+            password_update_datetime=u.password_update_datetime,
+        )
+
+
+def enabled() -> bool:
+    return _ttl > 0
+
+
+def token_subject(token: str) -> int | None:
+    """user_id del token, o None si es inválido / vencido."""
+    if enabled():
+        entry = _tokens.get(token)
+        if entry is not None:
+            sub, exp = entry
+            if exp is None or exp > time.time():
+                return sub
+            _tokens.invalidate(token)
+            return None
+
+    claims = decode_token_claims(token)
+    if not claims or claims.get("sub") is None:
+        return None
+    try:
+        sub = int(claims["sub"])
+    except (TypeError, ValueError):
+        return None
+    if enabled():
+        _tokens.set(token, (sub, claims.get("exp")))
+    return sub
+
+
+def get_user(db: Session, user_id: int) -> CurrentUser | None:
+    """Usuario desde cache; si no está, desde la BD (no se cachean ausentes)."""
+    if enabled():
+        cached = _users.get(user_id)
+        if cached is not None:
+            return cached
+    u = db.get(User, user_id)
+    if u is None:
+        return None
+    snapshot = CurrentUser.from_model(u)
+    if enabled():
+        _users.set(user_id, snapshot)
+    return snapshot
+
+
+def invalidate_user(user_id: int) -> None:
+    """Lo llaman las escrituras sobre users (rol, contraseña, borrado...)."""
+    # el token solo resuelve el id; el rol y la existencia salen de _users,
+    # así que basta con sacar al usuario para que la próxima request vaya a la BD
+    _users.invalidate(user_id)
@@ -0,0 +1,168 @@
+# app/core/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from app.core import metrics, read_routing
+
+# Registro de caches creadas (para métricas / limpieza en tests)
+CACHES: dict[str, "TTLCache"] = {}
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Cache en memoria (por proceso) con TTL y tamaño máximo (LRU).
+
+    Ojo: con varios workers de uvicorn cada proceso tiene su propia copia;
+    por eso las entradas SIEMPRE llevan TTL y las claves suelen incluir
+    la versión de datos del escenario (ver scenario_version).
+    """
+
+    def __init__(self, name: str, ttl_seconds: float = 60.0, maxsize: int = 1024):
+        self.name = name
+        self.ttl = ttl_seconds
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        CACHES[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            # lectura de una réplica quizá atrasada tras una escritura: no se guarda
+            if read_routing.may_fill_caches():
+                self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Borra una clave, o toda la cache si key es None."""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._data)
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+        }
+
+
+# ==========================================
+# Versión de datos por escenario
+# ==========================================
+# Cada escritura sobre valores / pesos de un escenario llama a
+# bump_scenario(); las caches usan la versión como parte de la clave,
+# así una escritura invalida todo lo derivado de ese escenario sin
+# tener que recorrer cada cache.
+_versions_lock = threading.Lock()
+_scenario_versions: dict[int, int] = {}
+_all_version = 0      # bumps que afectan a TODOS los escenarios
+_global_version = 0   # cualquier bump (para consultas sin escenario)
+# escenario hijo → padre (herencia); lo registra scenario_repo.lineage
+_scenario_parents: dict[int, int] = {}
+_MAX_CHAIN = 16
+
+
+def scenario_version(scenario_id: int | None) -> int:
+    """
+    Versión actual de los datos del escenario (None = todos los escenarios).
+    Un escenario hijo suma las versiones de sus ancestros: escribir en el
+    padre invalida también lo derivado de los hijos.
+    """
+    if scenario_id is None:
+        return _global_version
+    version = _all_version
+    for _ in range(_MAX_CHAIN):
+        version += _scenario_versions.get(scenario_id, 0)
+        scenario_id = _scenario_parents.get(scenario_id)
+        if scenario_id is None:
+            break
+    return version
+
+
+def link_scenario(scenario_id: int, parent_id: int) -> None:
+    _scenario_parents[scenario_id] = parent_id
+
+
+def bump_scenario(scenario_id: int | None) -> None:
+    """Marca como cambiados los datos de un escenario (None = todos)."""
+    global _all_version, _global_version
+    with _versions_lock:
+        _global_version += 1
+        if scenario_id is None:
+            _all_version += 1
+        else:
+            _scenario_versions[scenario_id] = _scenario_versions.get(scenario_id, 0) + 1
+
+
+# ==========================================
+# Versión del catálogo (países, categorías, indicadores)
+# ==========================================
+_catalog_version = 0
+
+
+def catalog_version() -> int:
+    return _catalog_version
+
+
+def bump_catalog() -> None:
+    """Lo llaman las escrituras de países / categorías / indicadores."""
+    global _catalog_version
+    with _versions_lock:
+        _catalog_version += 1
+
+
+def _collect_cache_stats():
+    """Hits / misses / tamaño por cache, leídos al exponer /metrics."""
+    stats = [c.stats() for c in list(CACHES.values())]
+    yield ("cache_hits_total", "counter", "Aciertos de cache",
+           [({"cache": s["name"]}, s["hits"]) for s in stats])
+    yield ("cache_misses_total", "counter", "Fallos de cache",
+           [({"cache": s["name"]}, s["misses"]) for s in stats])
+    yield ("cache_hit_ratio", "gauge", "hits / (hits + misses)",
+           [({"cache": s["name"]}, s["hit_ratio"]) for s in stats])
+    yield ("cache_entries", "gauge", "Entradas en cache",
+           [({"cache": s["name"]}, s["size"]) for s in stats])
+
+
+metrics.register_collector(_collect_cache_stats)
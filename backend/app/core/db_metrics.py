@@ -0,0 +1,130 @@
+# app/core/db_metrics.py
+"""
+Instrumentación del pool de conexiones (SQLAlchemy) para dimensionarlo
+según los workers de uvicorn en vez de adivinar:
+
+- conexiones en uso / overflow (gauges, se actualizan en cada checkout/checkin)
+- tiempo de espera para obtener una conexión (histograma)
+- timeouts de checkout, conexiones nuevas, invalidaciones
+- fallos del pre-ping (conexiones muertas detectadas al sacarlas del pool)
+
+Todo queda en el registro de app/core/metrics.py con la etiqueta engine.
+"""
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.core import metrics
+
+_checked_out = metrics.gauge(
+    "db_pool_checked_out", "Conexiones en uso", labelnames=("engine",)
+)
+_overflow = metrics.gauge(
+    "db_pool_overflow", "Conexiones abiertas por encima de pool_size", labelnames=("engine",)
+)
+_size = metrics.gauge(
+    "db_pool_size", "pool_size configurado", labelnames=("engine",)
+)
+_checkout_seconds = metrics.histogram(
+    "db_pool_checkout_seconds",
+    "Espera para obtener una conexión del pool",
+    labelnames=("engine",),
+)
+_timeouts = metrics.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts que agotaron pool_timeout", labelnames=("engine",)
+)
+_connects = metrics.counter(
+    "db_pool_connections_total", "Conexiones nuevas abiertas", labelnames=("engine",)
+)
+_invalidations = metrics.counter(
+    "db_pool_invalidations_total", "Conexiones invalidadas", labelnames=("engine",)
+)
+_pre_ping_failures = metrics.counter(
+    "db_pool_pre_ping_failures_total", "Conexiones muertas detectadas por pre-ping", labelnames=("engine",)
+)
+
+
+class _TimedCheckout:
+    """Mide el tiempo de Pool.connect() (espera en cola + conexión nueva si hace falta)."""
+
+    metrics_label = "default"
+
+    def connect(self):
+        t0 = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            _timeouts.inc(engine=self.metrics_label)
+            raise
+        finally:
+            _checkout_seconds.observe(time.perf_counter() - t0, engine=self.metrics_label)
+
+    def recreate(self):
+        # engine.dispose() crea un pool nuevo de la misma clase: conservar la etiqueta
+        new = super().recreate()
+        new.metrics_label = self.metrics_label
+        return new
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _refresh(pool: Pool, label: str, returning: int = 0) -> None:
+    if isinstance(pool, QueuePool):
+        _checked_out.set(pool.checkedout() - returning, engine=label)
+        _overflow.set(max(pool.overflow(), 0), engine=label)
+        _size.set(pool.size(), engine=label)
+
+
+def instrument_engine(engine, label: str) -> None:
+    """Engancha los eventos del pool / engine. `engine` puede ser sync o async."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    pool = sync_engine.pool
+    if isinstance(pool, _TimedCheckout):
+        pool.metrics_label = label
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        _connects.inc(engine=label)
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        _refresh(sync_engine.pool, label)
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        # el evento se emite antes de devolver la conexión a la cola
+        _refresh(sync_engine.pool, label, returning=1)
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_conn, record, exception):
+        _invalidations.inc(engine=label)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(context):
+        if getattr(context, "is_pre_ping", False):
+            _pre_ping_failures.inc(engine=label)
+
+    _refresh(pool, label)
+
+
+def pool_stats(engine) -> dict:
+    """Estado actual del pool (para /db/health)."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            timeout=pool.timeout(),
+        )
+    return stats
@@ -0,0 +1,68 @@
+# app/core/http_metrics.py
+"""
+Métricas HTTP por plantilla de ruta (/api/v1/countries/{code_or_id}, no
+la URL concreta, para no disparar la cardinalidad):
+
+- http_requests_total{method, route, status}
+- http_request_duration_seconds{method, route} (histograma)
+- http_response_size_bytes{route} (bytes enviados, ya comprimidos)
+- http_requests_in_flight
+
+ASGI puro, sin buffers ni copias del body: unos pocos µs por request.
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_requests = metrics.counter(
+    "http_requests_total", "Requests atendidas", labelnames=("method", "route", "status")
+)
+_duration = metrics.histogram(
+    "http_request_duration_seconds", "Latencia de la request", labelnames=("method", "route")
+)
+_size = metrics.histogram(
+    "http_response_size_bytes", "Tamaño del cuerpo de la respuesta",
+    labelnames=("route",), buckets=SIZE_BUCKETS,
+)
+_in_flight = metrics.gauge("http_requests_in_flight", "Requests en curso")
+
+
+class MetricsMiddleware:
+    """Debe ser el middleware más externo para medir también a los demás."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        _in_flight.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - t0
+            _in_flight.dec()
+            # el router deja la ruta resuelta en el scope
+            route = metrics.route_template(scope)
+            method = scope["method"]
+            _requests.inc(method=method, route=route, status=status)
+            _duration.observe(elapsed, method=method, route=route)
+            _size.observe(size, route=route)
@@ -0,0 +1,199 @@
+# app/core/metrics.py
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterable
+
+# Buckets de latencia en segundos (100µs .. 10s)
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Registro global: nombre → métrica
+REGISTRY: dict[str, "_Metric"] = {}
+_registry_lock = threading.Lock()
+
+# Métricas que se calculan al momento de exponerlas (p.ej. caches):
+# callables que devuelven (nombre, tipo, ayuda, [(labels, valor), ...])
+Sample = tuple[dict, float]
+Family = tuple[str, str, str, list[Sample]]
+COLLECTORS: list[Callable[[], Iterable[Family]]] = []
+
+# scope ASGI de la request en curso (lo fija el middleware); de ahí sale
+# la plantilla de ruta para etiquetar métricas
+_current_scope: ContextVar[dict | None] = ContextVar("current_scope", default=None)
+
+
+def set_current_scope(scope: dict):
+    return _current_scope.set(scope)
+
+
+def reset_current_scope(token) -> None:
+    _current_scope.reset(token)
+
+
+def current_route() -> str:
+    """Plantilla de la ruta en curso (p.ej. /api/v1/countries/{code_or_id})."""
+    scope = _current_scope.get()
+    if scope is None:
+        return "none"
+    return route_template(scope)
+
+
+def route_template(scope: dict) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return "unmatched"
+    # scope["root_path"] lo incluye si la app está montada bajo prefijo
+    return path
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self.values: dict[tuple, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # por label: [cuentas por bucket..., +Inf], suma
+        self.values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            # primer bucket con upper >= value (el último índice es +Inf)
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+
+
+def _get_or_create(cls, name: str, help: str, **kwargs):
+    with _registry_lock:
+        metric = REGISTRY.get(name)
+        if metric is None:
+            metric = REGISTRY[name] = cls(name, help, **kwargs)
+        return metric
+
+
+def counter(name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+    return _get_or_create(Counter, name, help, labelnames=labelnames)
+
+
+def gauge(name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+    return _get_or_create(Gauge, name, help, labelnames=labelnames)
+
+
+def histogram(
+    name: str, help: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS
+) -> Histogram:
+    return _get_or_create(Histogram, name, help, labelnames=labelnames, buckets=buckets)
+
+
+def register_collector(fn: Callable[[], Iterable[Family]]) -> None:
+    COLLECTORS.append(fn)
+
+
+# ==========================================
+# Exposición en formato texto de Prometheus
+# ==========================================
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Iterable[tuple[str, str]]) -> str:
+    inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs)
+    return "{" + inner + "}" if inner else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _render_metric(m: _Metric, out: list[str]) -> None:
+    out.append(f"# HELP {m.name} {m.help}")
+    out.append(f"# TYPE {m.name} {m.kind}")
+    with m._lock:
+        items = [(k, (list(v[0]), v[1]) if isinstance(m, Histogram) else v) for k, v in m.values.items()]
+    for key, value in sorted(items):
+        pairs = list(zip(m.labelnames, key))
+        if not isinstance(m, Histogram):
+            out.append(f"{m.name}{_labels(pairs)} {_number(value)}")
+            continue
+        counts, total = value
+        cumulative = 0
+        for upper, n in zip(m.buckets + (float("inf"),), counts):
+            cumulative += n
+            out.append(f"{m.name}_bucket{_labels(pairs + [('le', _number(upper))])} {cumulative}")
+        out.append(f"{m.name}_sum{_labels(pairs)} {_number(total)}")
+        out.append(f"{m.name}_count{_labels(pairs)} {cumulative}")
+
+
+def render() -> str:
+    """Todas las métricas (registro + collectors) en formato Prometheus."""
+    out: list[str] = []
+    with _registry_lock:
+        metrics = sorted(REGISTRY.values(), key=lambda m: m.name)
+    for m in metrics:
+        _render_metric(m, out)
+    for collect in COLLECTORS:
+        for name, kind, help, samples in collect():
+            out.append(f"# HELP {name} {help}")
+            out.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                out.append(f"{name}{_labels(labels.items())} {_number(value)}")
+    return "\n".join(out) + "\n"
@@ -0,0 +1,113 @@
+# app/core/password_pool.py
+"""
+bcrypt fuera del threadpool de la API.
+
+Hashear / verificar una contraseña son ~100-300 ms de CPU. En un pico de
+logins eso ocupaba los hilos de anyio y frenaba todos los endpoints sync.
+Aquí se mandan a un pool de procesos acotado (PASSWORD_POOL_WORKERS) y
+con control de admisión: si hay más de PASSWORD_POOL_MAX_PENDING
+operaciones pendientes se rechaza enseguida (PasswordPoolBusy → 503)
+en vez de encolar sin límite.
+
+Métricas: profundidad de cola, latencia (cola + cómputo) y rechazos.
+"""
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.core import metrics, security
+
+_pending_gauge = metrics.gauge(
+    "password_pool_pending",
+    "Operaciones de contraseña en cola o en curso",
+)
+_seconds = metrics.histogram(
+    "password_pool_seconds",
+    "Latencia de hash / verify (incluye la espera en cola)",
+    labelnames=("op",),
+)
+_rejected = metrics.counter(
+    "password_pool_rejected_total",
+    "Operaciones rechazadas por cola llena",
+    labelnames=("op",),
+)
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Cola llena: el llamador debe responder 503."""
+
+
+_lock = threading.Lock()
+_pending = 0
+_executor: ProcessPoolExecutor | None = None
+
+
+def _get_executor() -> ProcessPoolExecutor | None:
+    global _executor
+    if settings.PASSWORD_POOL_WORKERS <= 0:
+        return None
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                # spawn: no heredamos hilos / conexiones abiertas del proceso padre
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def _admit(op: str) -> None:
+    global _pending
+    with _lock:
+        if _pending >= settings.PASSWORD_POOL_MAX_PENDING:
+            _rejected.inc(op=op)
+            raise PasswordPoolBusy("Demasiadas solicitudes de autenticación, intenta de nuevo")
+        _pending += 1
+        _pending_gauge.set(_pending)
+
+
+def _release(op: str, started: float) -> None:
+    global _pending
+    with _lock:
+        _pending -= 1
+        _pending_gauge.set(_pending)
+    _seconds.observe(time.perf_counter() - started, op=op)
+
+
+async def _run(op: str, fn: Callable[..., Any], *args: Any) -> Any:
+    _admit(op)
+    started = time.perf_counter()
+    try:
+        executor = _get_executor()
+        if executor is None:
+            return await run_in_threadpool(fn, *args)
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    finally:
+        _release(op, started)
+
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await _run("verify", security.verify_password, plain, hashed)
+
+
+async def hash_password(plain: str) -> str:
+    """
+    Solo para endpoints async: no ocupa un hilo de anyio mientras espera.
+    Los scripts (seed_*) usan security.hash_password directamente.
+    """
+    return await _run("hash", security.hash_password, plain)
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,241 @@
+# app/core/profiling.py
+"""
+Perfilado opt-in de UNA request, para admins: `X-Profile: 1`.
+
+Si la cabecera viene y `authorize(scope)` la acepta (las rutas de admin
+usan require_admin), la request corre bajo cProfile y el resultado se
+guarda como .pstats (+ .json con metadatos) en PROFILE_DIR, conservando
+solo los últimos PROFILE_MAX_FILES. La respuesta trae X-Profile-Id para
+bajarlo desde /admin/profiles/{id} (snakeviz, gprof2dot, pstats...).
+
+Sin la cabecera el middleware solo mira la lista de headers. Con
+PROFILING_ENABLED=false ni siquiera se instala.
+
+Hilos: hasta Python 3.11 cProfile es por hilo, así que además del hilo
+del event loop se perfila el endpoint sync en su hilo del threadpool
+(instrument_routes). Desde 3.12 cProfile usa sys.monitoring y ve todos
+los hilos. En ambos casos pueden colarse otras requests que corran a la
+vez en el mismo proceso; conviene perfilar en un worker con poco tráfico.
+Una sola request perfilada a la vez por proceso.
+"""
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import re
+import secrets
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.core import metrics
+
+HEADER = b"x-profile"
+PROFILE_ID_RE = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+# hasta 3.11 el profiler de un hilo no ve los demás
+_PER_THREAD = sys.version_info < (3, 12)
+
+_busy = threading.Lock()
+
+
+class ProfileSession:
+    """Junta los profilers de los hilos que tocó la request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats: pstats.Stats | None = None
+
+    def add(self, profiler: cProfile.Profile) -> None:
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profiler)
+            else:
+                self.stats.add(profiler)
+
+
+_active: ContextVar[ProfileSession | None] = ContextVar("profile_session", default=None)
+
+
+# ==========================================
+# Almacenamiento acotado
+# ==========================================
+class ProfileStore:
+    def __init__(self, directory: str, max_files: int):
+        self.dir = Path(directory)
+        self.max_files = max_files
+
+    def new_id(self) -> str:
+        return time.strftime("%Y%m%dT%H%M%S") + "-" + secrets.token_hex(4)
+
+    def path(self, profile_id: str, ext: str = "pstats") -> Path | None:
+        """Ruta del perfil, o None si el id no es válido (evita path traversal)."""
+        if not PROFILE_ID_RE.match(profile_id):
+            return None
+        return self.dir / f"{profile_id}.{ext}"
+
+    def save(self, profile_id: str, session: ProfileSession, meta: dict) -> None:
+        if session.stats is None:
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        session.stats.dump_stats(str(self.path(profile_id)))
+        self.path(profile_id, "json").write_text(json.dumps(meta, ensure_ascii=False))
+        self._prune()
+
+    def _prune(self) -> None:
+        files = sorted(self.dir.glob("*.pstats"))  # el id empieza por fecha
+        for old in files[: max(len(files) - self.max_files, 0)]:
+            for ext in ("pstats", "json"):
+                old.with_suffix("." + ext).unlink(missing_ok=True)
+
+    def list(self) -> list[dict]:
+        if not self.dir.exists():
+            return []
+        out = []
+        for meta_file in sorted(self.dir.glob("*.json"), reverse=True):
+            try:
+                meta = json.loads(meta_file.read_text())
+            except (OSError, ValueError):
+                continue
+            pstats_file = meta_file.with_suffix(".pstats")
+            if pstats_file.exists():
+                meta["size_bytes"] = pstats_file.stat().st_size
+                out.append(meta)
+        return out
+
+    def summary(self, profile_id: str, top: int = 40, sort: str = "cumulative") -> str | None:
+        """Top de funciones en texto (como pstats.print_stats)."""
+        path = self.path(profile_id)
+        if path is None or not path.exists():
+            return None
+        buf = io.StringIO()
+        pstats.Stats(str(path), stream=buf).strip_dirs().sort_stats(sort).print_stats(top)
+        return buf.getvalue()
+
+
+store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+
+
+# ==========================================
+# Endpoints sync: perfilado en su hilo del threadpool
+# ==========================================
+def _profiled(fn: Callable) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        session = _active.get()
+        if session is None:
+            return fn(*args, **kwargs)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            session.add(profiler)
+
+    return wrapper
+
+
+def instrument_routes(app) -> None:
+    """
+    Envuelve los endpoints sync de la app (llamar después de registrar los
+    routers). Sin request perfilada el costo es leer un contextvar.
+    """
+    if not _PER_THREAD:
+        return
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        call = route.dependant.call
+        if call is None or inspect.iscoroutinefunction(call) or getattr(call, "__profiled__", False):
+            continue
+        wrapped = _profiled(call)
+        wrapped.__profiled__ = True
+        route.dependant.call = wrapped
+
+
+# ==========================================
+# Middleware
+# ==========================================
+def _wants_profile(scope: Scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == HEADER:
+            return value.strip() in (b"1", b"true")
+    return False
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, authorize: Callable[[Scope], bool]):
+        self.app = app
+        self.authorize = authorize  # sync: corre en el threadpool
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not await run_in_threadpool(self.authorize, scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not _busy.acquire(blocking=False):
+            await self.app(scope, receive, _with_header(send, "X-Profile", "busy"))
+            return
+
+        profile_id = store.new_id()
+        session = ProfileSession()
+        token = _active.set(session)
+        status = 500
+        send_with_id = _with_header(send, "X-Profile-Id", profile_id)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send_with_id(message)
+
+        profiler = cProfile.Profile()
+        t0 = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - t0
+            session.add(profiler)
+            _active.reset(token)
+            try:
+                await run_in_threadpool(store.save, profile_id, session, {
+                    "id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "route": metrics.route_template(scope),
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000, 3),
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "pid": os.getpid(),
+                })
+            finally:
+                _busy.release()
+
+
+def _with_header(send: Send, name: str, value: str) -> Send:
+    async def wrapper(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            MutableHeaders(scope=message)[name] = value
+        await send(message)
+
+    return wrapper
@@ -0,0 +1,111 @@
+# app/core/query_stats.py
+"""
+Conteo de queries SQL y tiempo en BD por request.
+
+Un listener global de SQLAlchemy (todas las Engine: primario, réplica y
+el sync_engine del motor async) suma en el QueryStats de la request en
+curso, que vive en un contextvar. El contexto se copia al threadpool y a
+los greenlets de run_sync, así que cuenta también lo que corre ahí.
+
+QueryStatsMiddleware:
+- fuera de producción agrega X-DB-Queries y X-DB-Time (ms) a la respuesta
+- registra en el log las requests lentas (SLOW_REQUEST_SECONDS)
+- alimenta el histograma http_request_db_queries de /metrics
+
+Los mismos listeners pasan las sentencias lentas (SLOW_QUERY_SECONDS) a
+app/core/slow_queries.py, dentro o fuera de una request.
+"""
+import logging
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.core import metrics, slow_queries
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+_queries_per_request = metrics.histogram(
+    "http_request_db_queries", "Queries SQL por request",
+    labelnames=("route",), buckets=QUERY_BUCKETS,
+)
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current() -> QueryStats | None:
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None or slow_queries.enabled():
+        conn.info["query_start"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop("query_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+    if elapsed >= settings.SLOW_QUERY_SECONDS and slow_queries.enabled():
+        slow_queries.record(statement, parameters, executemany, elapsed)
+
+
+def expose_headers() -> bool:
+    return settings.APP_ENV != "production"
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        headers = expose_headers()
+
+        async def send_wrapper(message: Message) -> None:
+            if headers and message["type"] == "http.response.start":
+                h = MutableHeaders(scope=message)
+                h["X-DB-Queries"] = str(stats.count)
+                h["X-DB-Time"] = f"{stats.seconds * 1000:.2f}"
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - t0
+            _current.reset(token)
+            route = metrics.route_template(scope)
+            _queries_per_request.observe(stats.count, route=route)
+            if elapsed >= settings.SLOW_REQUEST_SECONDS:
+                logger.warning(
+                    "Request lenta: %s %s %.0f ms (%d queries, %.0f ms en BD)",
+                    scope["method"], route, elapsed * 1000, stats.count, stats.seconds * 1000,
+                )
@@ -0,0 +1,101 @@
+# app/core/read_routing.py
+"""
+Lectura desde la réplica (READ_DATABASE_URL) con read-your-writes.
+
+Las rutas de lectura pesadas (públicas, catálogo, exportaciones) usan
+get_read_db / get_async_db, que van a la réplica salvo que:
+
+la request trae la cookie de "escritura reciente": la pone este middleware
+en cada escritura exitosa (POST/PUT/PATCH/DELETE, salvo /auth: el login no
+escribe datos que se lean de la réplica) y dura READ_STICKY_SECONDS, así
+quien acaba de guardar ve su cambio aunque la réplica vaya atrasada. Los
+demás clientes siguen leyendo de la réplica.
+
+Las caches en memoria (resultados, catálogo) se indexan por versiones que
+suben con cada escritura: mientras este proceso escribió hace menos de
+READ_STICKY_SECONDS, una lectura de la réplica no las llena (podría guardar
+datos viejos bajo la versión nueva); se sirve sin cachear.
+
+READ_STICKY_SECONDS debe ser mayor que el retraso típico de replicación.
+Sin READ_DATABASE_URL todo va al primario y la cookie no se emite.
+"""
+import time
+from contextvars import ContextVar
+
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+STICKY_COOKIE = "ceipa_primary"
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# escrituras que no marcan al cliente (login / logout)
+NOT_WRITES = ("/api/v1/auth/",)
+
+_last_write = float("-inf")
+# la request en curso lee de la réplica (lo fija el middleware)
+_replica_request: ContextVar[bool] = ContextVar("replica_request", default=False)
+
+
+def enabled() -> bool:
+    return bool(settings.READ_DATABASE_URL)
+
+
+def mark_write() -> None:
+    global _last_write
+    _last_write = time.monotonic()
+
+
+def recent_write() -> bool:
+    return time.monotonic() - _last_write < settings.READ_STICKY_SECONDS
+
+
+def use_primary(conn: HTTPConnection | None = None) -> bool:
+    """True si esta lectura debe ir al primario: solo quien acaba de escribir."""
+    if not enabled():
+        return True
+    return conn is not None and STICKY_COOKIE in conn.cookies
+
+
+def may_fill_caches() -> bool:
+    """False si la request lee de la réplica y el proceso escribió hace poco."""
+    return not (_replica_request.get() and recent_write())
+
+
+def _sticky_cookie() -> bytes:
+    max_age = max(int(settings.READ_STICKY_SECONDS), 1)
+    return f"{STICKY_COOKIE}=1; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax".encode()
+
+
+class ReadYourWritesMiddleware:
+    """
+    Marca las escrituras exitosas (cookie + reloj del proceso) y las
+    lecturas que van a la réplica (para no llenar caches con ellas).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not enabled():
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] not in WRITE_METHODS:
+            token = _replica_request.set(not use_primary(HTTPConnection(scope)))
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _replica_request.reset(token)
+            return
+        if scope["path"].startswith(NOT_WRITES):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                mark_write()
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"set-cookie", _sticky_cookie())]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
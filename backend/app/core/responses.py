@@ -0,0 +1,294 @@
+# app/core/responses.py
+"""
+Capa de respuestas para payloads JSON grandes (analytics / catálogo):
+
+- FastJSONResponse: serializa con orjson (si está instalado) en vez de json.
+- CachedPayload: body ya serializado + ETag + variantes comprimidas
+  (gzip / br), que se calculan una vez y viven junto al resultado cacheado.
+- CompressionMiddleware: comprime al vuelo las respuestas grandes que no
+  vienen ya comprimidas (las de CachedPayload traen Content-Encoding).
+
+Los tiempos de serialización y compresión van a las métricas por ruta.
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+
+try:  # serializador rápido (opcional)
+    import orjson
+except ImportError:  # pragma: no cover - fallback a json estándar
+    orjson = None
+
+try:  # brotli (opcional): si no está, solo se negocia gzip
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+# Por debajo de este tamaño comprimir no compensa
+MIN_COMPRESS_SIZE = 1024
+
+# Payloads cacheados: se comprimen una vez → nivel alto.
+# Respuestas al vuelo: nivel bajo, prima la latencia.
+CACHED_LEVELS = {"br": 9, "gzip": 9}
+DYNAMIC_LEVELS = {"br": 4, "gzip": 5}
+
+_serialize_seconds = metrics.histogram(
+    "http_response_serialize_seconds",
+    "Tiempo de serialización JSON de la respuesta",
+    labelnames=("route",),
+)
+_compress_seconds = metrics.histogram(
+    "http_response_compress_seconds",
+    "Tiempo de compresión de la respuesta",
+    labelnames=("route", "encoding", "cached"),
+)
+
+
+# ==========================================
+# 🔹 Serialización
+# ==========================================
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+def dumps(data: Any) -> bytes:
+    """JSON compacto en bytes (orjson si está disponible)."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        data, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse con orjson; registra el tiempo de serialización por ruta."""
+
+    def render(self, content: Any) -> bytes:
+        t0 = time.perf_counter()
+        body = dumps(content)
+        _serialize_seconds.observe(time.perf_counter() - t0, route=metrics.current_route())
+        return body
+
+
+# ==========================================
+# 🔹 Compresión
+# ==========================================
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    # mtime=0 → mismo body comprimido en cada proceso (ETag estable)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Elige br / gzip según Accept-Encoding (respeta q=0)."""
+    if not accept_encoding:
+        return None
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip().lower()] = q
+    for enc in ("br", "gzip"):
+        if enc == "br" and brotli is None:
+            continue
+        if accepted.get(enc, accepted.get("*", 0.0)) > 0:
+            return enc
+    return None
+
+
+class CachedPayload:
+    """
+    Resultado ya serializado, listo para servir. Las variantes comprimidas
+    se generan la primera vez que un cliente las pide y quedan guardadas
+    en el mismo objeto (que a su vez vive en una TTLCache).
+    """
+
+    __slots__ = ("body", "etag", "_encoded", "_lock")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        # débil: el mismo ETag vale para todas las codificaciones
+        self.etag = 'W/"' + hashlib.sha1(body).hexdigest() + '"'
+        self._encoded: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_data(cls, data: Any) -> "CachedPayload":
+        t0 = time.perf_counter()
+        body = dumps(data)
+        _serialize_seconds.observe(time.perf_counter() - t0, route=metrics.current_route())
+        return cls(body)
+
+    def encoded(self, encoding: str | None) -> bytes:
+        if encoding is None or len(self.body) < MIN_COMPRESS_SIZE:
+            return self.body
+        data = self._encoded.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._encoded.get(encoding)
+                if data is None:
+                    t0 = time.perf_counter()
+                    data = compress(self.body, encoding, CACHED_LEVELS[encoding])
+                    _compress_seconds.observe(
+                        time.perf_counter() - t0,
+                        route=metrics.current_route(), encoding=encoding, cached="1",
+                    )
+                    self._encoded[encoding] = data
+        return data
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    inm = request.headers.get("if-none-match")
+    if not inm:
+        return False
+    if inm.strip() == "*":
+        return True
+    # comparación débil: W/"x" == "x"
+    bare = etag.removeprefix("W/")
+    return any(t.strip().removeprefix("W/") == bare for t in inm.split(","))
+
+
+def not_modified(
+    request: Request, response: Response, etag: str, cache_control: str = "no-cache"
+) -> Response | None:
+    """
+    GET condicional para endpoints con response_model: fija ETag en la
+    respuesta y devuelve un 304 si el cliente ya tiene esa versión.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def payload_response(
+    request: Request,
+    payload: CachedPayload,
+    *,
+    cache_control: str = "public, max-age=60",
+    headers: dict | None = None,
+) -> Response:
+    """Sirve un CachedPayload: 304 si el ETag coincide, si no body comprimido."""
+    out = {"ETag": payload.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if headers:
+        out.update(headers)
+    if etag_matches(request, payload.etag):
+        return Response(status_code=304, headers=out)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    body = payload.encoded(encoding)
+    if body is not payload.body:
+        out["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=out)
+
+
+def cached_payload(cache, key, build: Callable[[], Any]) -> CachedPayload:
+    """get_or_set sobre una TTLCache guardando el payload ya serializado."""
+    return cache.get_or_set(key, lambda: CachedPayload.from_data(build()))
+
+
+# ==========================================
+# 🔹 Middleware de compresión al vuelo
+# ==========================================
+class CompressionMiddleware:
+    """
+    ASGI puro: comprime (br / gzip) las respuestas JSON grandes que no
+    traen Content-Encoding. También deja el scope de la request en un
+    contextvar para que las métricas sepan la ruta.
+
+    Las respuestas en streaming (más de un mensaje de body) se dejan tal cual.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MIN_COMPRESS_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = metrics.set_current_scope(scope)
+        try:
+            encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+            if encoding is None:
+                await self.app(scope, receive, send)
+                return
+            await self.app(scope, receive, _CompressingSend(send, scope, encoding, self.minimum_size))
+        finally:
+            metrics.reset_current_scope(token)
+
+
+class _CompressingSend:
+    def __init__(self, send: Send, scope: Scope, encoding: str, minimum_size: int):
+        self.send = send
+        self.scope = scope
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Message | None = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if "content-encoding" in headers or not headers.get(
+                "content-type", ""
+            ).startswith("application/json"):
+                self.passthrough = True
+                await self.send(message)
+                return
+            # se retiene hasta ver el body
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        if message.get("more_body", False) or len(body) < self.minimum_size:
+            self.passthrough = True
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        t0 = time.perf_counter()
+        data = compress(body, self.encoding, DYNAMIC_LEVELS[self.encoding])
+        _compress_seconds.observe(
+            time.perf_counter() - t0,
+            route=metrics.route_template(self.scope), encoding=self.encoding, cached="0",
+        )
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(data))
+        headers.add_vary_header("Accept-Encoding")
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": data})
@@ -0,0 +1,114 @@
+# app/core/search.py
+"""
+Índice de búsqueda en memoria para autocompletar (países, categorías,
+indicadores). Usa las mismas reglas que el importador de Excel
+(normalize_text: sin tildes, minúsculas, espacios compactados).
+
+- Trie de prefijos por token: "rep dom" → tokens que empiezan por
+  "rep" ∩ tokens que empiezan por "dom".
+- Índice de tokens exactos, para puntuar mejor una palabra completa.
+- Claves exactas (p.ej. ISO2 / ISO3) que van siempre primero.
+
+El costo de una búsqueda depende del largo de la consulta y del número de
+resultados, no del tamaño de la tabla.
+"""
+import re
+from typing import Hashable, Iterable
+
+from app.core.text import normalize_text
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# rangos (menor = mejor)
+RANK_EXACT = 0        # nombre completo o clave exacta (ISO)
+RANK_PREFIX = 1       # el nombre completo empieza por la consulta
+RANK_TOKENS = 2       # todas las palabras de la consulta, completas
+RANK_TOKEN_PREFIX = 3  # todas las palabras, alguna como prefijo
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+class _Node:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: dict[str, "_Node"] = {}
+        # docs con algún token que tiene este prefijo
+        self.ids: set[Hashable] = set()
+
+
+class SearchIndex:
+    def __init__(self):
+        self._root = _Node()
+        self._tokens: dict[str, set[Hashable]] = {}
+        self._exact: dict[str, set[Hashable]] = {}
+        self._fields: dict[Hashable, tuple[str, ...]] = {}
+        self._order: dict[Hashable, int] = {}
+
+    def add(self, doc_id: Hashable, fields: Iterable[str], exact_keys: Iterable[str] = ()) -> None:
+        """
+        Indexa un documento. `fields` son los textos buscables (nombre,
+        nombre en inglés...); `exact_keys` solo coinciden completas (ISO).
+        El orden de inserción es el desempate al ordenar resultados.
+        """
+        norm_fields = tuple(f for f in (normalize_text(x) for x in fields if x) if f)
+        self._fields[doc_id] = norm_fields
+        self._order.setdefault(doc_id, len(self._order))
+
+        for field in norm_fields:
+            self._exact.setdefault(field, set()).add(doc_id)
+            for token in _TOKEN_RE.findall(field):
+                self._tokens.setdefault(token, set()).add(doc_id)
+                node = self._root
+                for ch in token:
+                    node = node.children.setdefault(ch, _Node())
+                    node.ids.add(doc_id)
+
+        for key in exact_keys:
+            if key:
+                self._exact.setdefault(normalize_text(key), set()).add(doc_id)
+
+    def _prefix(self, token: str) -> set[Hashable]:
+        node = self._root
+        for ch in token:
+            node = node.children.get(ch)
+            if node is None:
+                return set()
+        return node.ids
+
+    def search(self, query: str) -> list[Hashable]:
+        """Ids que coinciden con la consulta, ordenados por relevancia."""
+        q = normalize_text(query)
+        tokens = _TOKEN_RE.findall(q)
+        if not tokens:
+            return []
+
+        # intersección empezando por el conjunto más chico
+        sets = sorted((self._prefix(t) for t in tokens), key=len)
+        if not sets[0]:
+            return []
+        matched = set(sets[0])
+        for s in sets[1:]:
+            matched &= s
+            if not matched:
+                return []
+
+        exact = self._exact.get(q, set())
+        full_tokens = [self._tokens.get(t, set()) for t in tokens]
+
+        def rank(doc_id: Hashable) -> tuple[int, int]:
+            if doc_id in exact:
+                r = RANK_EXACT
+            elif any(f.startswith(q) for f in self._fields[doc_id]):
+                r = RANK_PREFIX
+            elif all(doc_id in s for s in full_tokens):
+                r = RANK_TOKENS
+            else:
+                r = RANK_TOKEN_PREFIX
+            return r, self._order[doc_id]
+
+        # las claves exactas (ISO) pueden no estar en el trie
+        matched |= exact
+        return sorted(matched, key=rank)
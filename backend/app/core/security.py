@@ -1,28 +1,43 @@
 # app/core/security.py
+# jose y passlib (bcrypt, cryptography) se importan en el primer uso, no al
+# arrancar: son ~50 ms de import que no necesita /health ni ninguna ruta
+# pública (benchmarks/test_startup.py).
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
-from jose import jwt, JWTError
-from passlib.context import CryptContext
 from app.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache(maxsize=1)
+def pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return pwd_context().verify(plain, hashed)
 
 def hash_password(plain: str) -> str:
-    return pwd_context.hash(plain)
+    return pwd_context().hash(plain)
 
 def create_access_token(subject: str, expires_minutes: int = settings.ACCESS_TOKEN_EXPIRE_MINUTES, extra: dict | None = None) -> str:
+    from jose import jwt
+
     now = datetime.now(timezone.utc)
     payload = {"sub": subject, "iat": now, "exp": now + timedelta(minutes=expires_minutes)}
     if extra:
         payload.update(extra)
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
-def decode_token(token: str) -> Optional[str]:
+def decode_token_claims(token: str) -> Optional[dict]:
+    """Claims del JWT (firma y exp verificadas) o None si no es válido."""
+    from jose import JWTError, jwt
+
     try:
-        data = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        return data.get("sub")
+        return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
     except JWTError:
         return None
+
+def decode_token(token: str) -> Optional[str]:
+    data = decode_token_claims(token)
+    return data.get("sub") if data else None
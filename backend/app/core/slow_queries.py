@@ -0,0 +1,125 @@
+# app/core/slow_queries.py
+"""
+Registro de queries lentas, agregado en memoria (sin log del lado de la BD).
+
+Los listeners de app/core/query_stats.py llaman a `record()` con cada
+sentencia que tarda SLOW_QUERY_SECONDS o más. Se agrupa por SQL
+normalizado (literales → ?, listas IN colapsadas) y por cada grupo se
+guarda: veces, tiempo total / máximo, forma de los parámetros y las rutas
+de origen. La tabla tiene como mucho SLOW_QUERY_LOG_SIZE grupos: al llenarse
+sale el de menor tiempo total. Es por proceso; se ve en /admin/slow-queries.
+"""
+import re
+import threading
+import time
+from collections import Counter
+
+from app.config import settings
+from app.core import metrics
+
+MAX_ROUTES = 10  # rutas distintas que se recuerdan por sentencia
+
+_slow_total = metrics.counter(
+    "db_slow_queries_total", "Queries SQL por encima de SLOW_QUERY_SECONDS", labelnames=("route",),
+)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """SQL sin literales ni placeholders concretos: agrupa la misma query."""
+    sql = _STRING.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?, ...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+def params_shape(parameters, executemany: bool) -> str:
+    """Tipos de los parámetros, sin los valores (p.ej. "3×(int, int, str)")."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else ()
+        return f"{len(parameters)}×{params_shape(first, False)}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in sorted(parameters.items())) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+class _Entry:
+    __slots__ = ("statement", "count", "total", "max", "params", "routes", "last_at")
+
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.params = ""
+        self.routes: Counter = Counter()
+        self.last_at = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "params": self.params,
+            "routes": dict(self.routes.most_common()),
+            "last_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.last_at)),
+        }
+
+
+class SlowQueryLog:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def record(self, statement: str, parameters, executemany: bool, seconds: float, route: str) -> None:
+        key = normalize(statement)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    victim = min(self._entries.values(), key=lambda e: e.total)
+                    del self._entries[victim.statement]
+                    self.evicted += 1
+                entry = self._entries[key] = _Entry(key)
+            entry.count += 1
+            entry.total += seconds
+            entry.max = max(entry.max, seconds)
+            entry.params = params_shape(parameters, executemany)
+            entry.last_at = time.time()
+            if route in entry.routes or len(entry.routes) < MAX_ROUTES:
+                entry.routes[route] += 1
+
+    def top(self, limit: int = 20, sort: str = "total") -> list[dict]:
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda e: getattr(e, sort), reverse=True)
+            return [e.as_dict() for e in entries[:limit]]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.evicted = 0
+
+
+log = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE)
+
+
+def enabled() -> bool:
+    return settings.SLOW_QUERY_LOG_SIZE > 0
+
+
+def record(statement: str, parameters, executemany: bool, seconds: float) -> None:
+    route = metrics.current_route()
+    _slow_total.inc(route=route)
+    log.record(statement, parameters, executemany, seconds, route)
@@ -0,0 +1,18 @@
+# app/core/text.py
+import re
+import unicodedata
+
+
+def normalize_text(s: str) -> str:
+    """
+    Quita tildes, pasa a minúsculas y compacta espacios.
+    Sirve para comparar 'Alemania', 'ALEMANIA', 'alemánia' como lo mismo.
+    """
+    if not s:
+        return ""
+    s = s.strip()
+    s = unicodedata.normalize("NFD", s)
+    s = "".join(ch for ch in s if unicodedata.category(ch) != "Mn")
+    s = s.lower()
+    s = re.sub(r"\s+", " ", s)
+    return s
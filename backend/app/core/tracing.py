@@ -0,0 +1,356 @@
+# app/core/tracing.py
+"""
+Trazas livianas: en qué se va el tiempo DENTRO de una request.
+
+TracingMiddleware decide por request si se traza (TRACING_SAMPLE_RATE, o
+una cabecera W3C `traceparent` con el flag sampled) y abre el span raíz.
+Dentro, `@traced` (repositorios, analytics) y `with span("...")` (etapas
+del import de Excel) crean spans hijos con su padre, tiempos y atributos.
+Todos llevan trace_id y request_id (X-Request-ID entrante o uno nuevo).
+
+Sin muestrear, un span cuesta leer un contextvar. Los spans de una traza
+muestreada se exportan al terminar la request, en un hilo aparte con una
+cola acotada (si se llena se descartan), como:
+- "jsonl": una línea JSON por span en TRACING_FILE (rota a .1 al pasar
+  TRACING_FILE_MAX_BYTES)
+- "otlp": POST de OTLP/HTTP JSON a TRACING_OTLP_URL (collector de
+  OpenTelemetry, Jaeger, Tempo...)
+"""
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+# tope por traza (un import de Excel hace un upsert por celda)
+MAX_SPANS_PER_TRACE = 2000
+
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_dropped = metrics.counter("tracing_spans_dropped_total", "Spans descartados (cola de exportación llena)")
+
+
+class Span:
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "request_id",
+        "start_ns", "end_ns", "attributes", "status",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, request_id: str):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.request_id = request_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: dict = {}
+        self.status = "ok"
+
+    def set(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def as_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "request_id": self.request_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Lo que recibe `with span(...)` cuando la request no se traza."""
+    __slots__ = ()
+
+    def set(self, key: str, value) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Trace:
+    __slots__ = ("trace_id", "request_id", "spans", "dropped")
+
+    def __init__(self, trace_id: str, request_id: str):
+        self.trace_id = trace_id
+        self.request_id = request_id
+        self.spans: list[Span] = []  # append es seguro entre hilos
+        self.dropped = 0
+
+
+_trace: ContextVar[_Trace | None] = ContextVar("trace", default=None)
+_parent: ContextVar[Span | None] = ContextVar("trace_parent", default=None)
+
+
+def current_span() -> Span | None:
+    return _parent.get() if _trace.get() is not None else None
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span | _NoopSpan]:
+    trace = _trace.get()
+    if trace is None:
+        yield _NOOP
+        return
+    if len(trace.spans) >= MAX_SPANS_PER_TRACE:
+        trace.dropped += 1
+        yield _NOOP
+        return
+    parent = _parent.get()
+    s = Span(name, trace.trace_id, parent.span_id if parent else None, trace.request_id)
+    s.attributes.update(attributes)
+    token = _parent.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.attributes["error.type"] = type(e).__name__
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _parent.reset(token)
+        trace.spans.append(s)
+
+
+def traced(fn: Callable | None = None, *, name: str | None = None) -> Callable:
+    """
+    Decorador: un span por llamada, llamado "<módulo>.<función>"
+    (p.ej. indicator_value_repo.list_values). Sirve para sync y async.
+    """
+    if fn is None:
+        return functools.partial(traced, name=name)
+    span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            if _trace.get() is None:
+                return await fn(*args, **kwargs)
+            with span(span_name):
+                return await fn(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _trace.get() is None:
+            return fn(*args, **kwargs)
+        with span(span_name):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+# ==========================================
+# Exportación (en un hilo aparte)
+# ==========================================
+class JsonLinesExporter:
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def export(self, spans: list[Span]) -> None:
+        if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            os.replace(self.path, self.path + ".1")
+        lines = "".join(json.dumps(s.as_dict(), ensure_ascii=False, default=str) + "\n" for s in spans)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: list[Span]) -> dict:
+    """Cuerpo OTLP/HTTP JSON (ExportTraceServiceRequest)."""
+    local_ids = {s.span_id for s in spans}
+    return {"resourceSpans": [{
+        "resource": {"attributes": [
+            {"key": "service.name", "value": {"stringValue": settings.APP_NAME}},
+            {"key": "deployment.environment", "value": {"stringValue": settings.APP_ENV}},
+        ]},
+        "scopeSpans": [{
+            "scope": {"name": "app.core.tracing"},
+            "spans": [{
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                "name": s.name,
+                "kind": 1 if s.parent_id in local_ids else 2,  # INTERNAL / SERVER (raíz)
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [
+                    {"key": k, "value": _otlp_value(v)}
+                    for k, v in {"request.id": s.request_id, **s.attributes}.items()
+                ],
+                "status": {"code": 2 if s.status == "error" else 1},
+            } for s in spans],
+        }],
+    }]}
+
+
+class OTLPExporter:
+    def __init__(self, url: str, timeout: float = 2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def export(self, spans: list[Span]) -> None:
+        import requests
+
+        r = requests.post(self.url, json=to_otlp(spans), timeout=self.timeout)
+        r.raise_for_status()
+
+
+class BatchProcessor:
+    """Cola acotada + hilo daemon: exportar nunca frena una request."""
+
+    def __init__(self, exporter, max_queue: int = 1000):
+        self.exporter = exporter
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, spans: list[Span]) -> None:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            _dropped.inc(len(spans))
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Espera a que se exporte lo encolado (tests / apagado)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                self.exporter.export(spans)
+            except Exception:
+                logger.warning("No se pudieron exportar %d spans", len(spans), exc_info=True)
+            finally:
+                self._queue.task_done()
+
+
+def _build_processor() -> BatchProcessor:
+    if settings.TRACING_EXPORTER == "otlp":
+        exporter = OTLPExporter(settings.TRACING_OTLP_URL)
+    else:
+        exporter = JsonLinesExporter(settings.TRACING_FILE, settings.TRACING_FILE_MAX_BYTES)
+    return BatchProcessor(exporter)
+
+
+processor = _build_processor()
+
+
+def flush(timeout: float = 5.0) -> None:
+    processor.flush(timeout)
+
+
+# ==========================================
+# Middleware
+# ==========================================
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # traceparent entrante: se respeta su decisión de muestreo
+        parent_id = None
+        m = TRACEPARENT_RE.match(_header(scope, b"traceparent") or "")
+        if m:
+            sampled = int(m.group(3), 16) & 1
+            trace_id, parent_id = m.group(1), m.group(2)
+        else:
+            rate = settings.TRACING_SAMPLE_RATE
+            sampled = rate > 0 and (rate >= 1 or random.random() < rate)
+            trace_id = None
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _header(scope, b"x-request-id") or secrets.token_hex(8)
+        trace = _Trace(trace_id or secrets.token_hex(16), request_id)
+        root = Span(f"{scope['method']} {scope['path']}", trace.trace_id, parent_id, request_id)
+        trace_token = _trace.set(trace)
+        parent_token = _parent.set(root)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.set("http.status_code", message["status"])
+                h = MutableHeaders(scope=message)
+                h["X-Request-ID"] = request_id
+                h["traceparent"] = f"00-{trace.trace_id}-{root.span_id}-01"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            root.status = "error"
+            root.set("error.type", type(e).__name__)
+            raise
+        finally:
+            root.end_ns = time.time_ns()
+            route = metrics.route_template(scope)
+            root.name = f"{scope['method']} {route}"
+            root.set("http.method", scope["method"])
+            root.set("http.route", route)
+            root.set("http.target", scope["path"])
+            if root.attributes.get("http.status_code", 500) >= 500:
+                root.status = "error"
+            if trace.dropped:
+                root.set("spans.dropped", trace.dropped)
+            _parent.reset(parent_token)
+            _trace.reset(trace_token)
+            processor.submit(trace.spans + [root])
@@ -1,12 +1,52 @@
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from .config import settings
+from .core import read_routing
+from .core.db_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+
+def engine_options(url: str, *, is_async: bool = False) -> dict:
+    """
+    kwargs de create_engine según Settings. En SQLite no se tocan tamaño ni
+    overflow: en memoria usa su propio pool (SingletonThreadPool) y aiosqlite
+    usa NullPool (sus conexiones van atadas a un event loop); solo SQLite
+    sync en archivo usa el pool instrumentado con los valores por defecto.
+    """
+    opts: dict = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    poolclass = InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite":
+        if not is_async and u.database not in (None, "", ":memory:"):
+            opts["poolclass"] = poolclass
+        return opts
+    opts.update(
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return opts
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+instrument_engine(engine, "primary")
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# Réplica de lectura opcional; sin READ_DATABASE_URL es el mismo primario
+READ_DATABASE_URL = settings.READ_DATABASE_URL
+if READ_DATABASE_URL:
+    read_engine = create_engine(READ_DATABASE_URL, **engine_options(READ_DATABASE_URL))
+    instrument_engine(read_engine, "replica")
+    ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, autocommit=False)
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
 class Base(DeclarativeBase):
     pass
 
@@ -16,3 +56,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """Session de solo lectura: réplica, o primario si hubo escritura reciente."""
+    factory = SessionLocal if read_routing.use_primary(request) else ReadSessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
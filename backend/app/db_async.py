@@ -0,0 +1,99 @@
+# app/db_async.py
+"""
+Motor async (opcional) para las rutas de solo lectura (públicas / catálogo).
+
+Con ASYNC_DB_ENABLED=true las rutas esperan a la BD sin ocupar un hilo
+del threadpool: get_async_db entrega un AsyncSession y el código de
+repositorios / analytics (que es sync) se ejecuta con `run_sync`.
+
+Sin async habilitado, get_async_db entrega un adaptador con la misma
+interfaz (`await db.run_sync(fn)`) que corre fn en el threadpool con un
+Session normal; así las rutas no cambian según la configuración.
+
+Con réplica (READ_DATABASE_URL) el motor async apunta a ella; las
+lecturas que deben ir al primario (ver core/read_routing.py) usan el
+adaptador con SessionLocal.
+"""
+from typing import Any, AsyncIterator, Callable
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .core.db_metrics import instrument_engine
+from .core import read_routing
+from .db import ReadSessionLocal, SessionLocal, engine_options
+
+# driver sync → driver async equivalente
+_ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+}
+
+
+def async_url(url: str) -> str:
+    """URL async equivalente a una URL sync (mysql+pymysql → mysql+aiomysql...)."""
+    u = make_url(url)
+    driver = _ASYNC_DRIVERS.get(u.drivername)
+    if driver is None:
+        # ya es async (o desconocido): se usa tal cual
+        return url
+    return u.set(drivername=driver).render_as_string(hide_password=False)
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.ASYNC_DB_ENABLED:
+    _url = settings.ASYNC_DATABASE_URL or async_url(
+        settings.READ_DATABASE_URL or settings.DATABASE_URL
+    )
+    async_engine = create_async_engine(_url, **engine_options(_url, is_async=True))
+    instrument_engine(async_engine, "async")
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+class ThreadpoolSession:
+    """Mismo `run_sync` que AsyncSession, pero con un Session en el threadpool."""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self._factory = session_factory
+        self._session: Session | None = None
+
+    def _call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self._session is None:
+            self._session = self._factory()
+        return fn(self._session, *args, **kwargs)
+
+    async def run_sync(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(self._call, fn, *args, **kwargs)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await run_in_threadpool(self._session.close)
+            self._session = None
+
+
+async def get_async_db(request: Request) -> AsyncIterator[AsyncSession | ThreadpoolSession]:
+    """Dependencia de lectura: usar siempre como `await db.run_sync(fn, ...)`."""
+    primary = read_routing.enabled() and read_routing.use_primary(request)
+    if AsyncSessionLocal is not None and not primary:
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+
+    session = ThreadpoolSession(SessionLocal if primary else ReadSessionLocal)
+    try:
+        yield session
+    finally:
+        await session.close()
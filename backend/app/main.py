@@ -1,12 +1,22 @@
 # app/main.py
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from .config import settings
-from .db import get_db
+from .core import metrics, password_pool, profiling
+from .core.tracing import TracingMiddleware
+from .core.http_metrics import MetricsMiddleware
+from .core.query_stats import QueryStatsMiddleware
+from .core.responses import CompressionMiddleware, FastJSONResponse
+from .core.db_metrics import pool_stats
+from .core.read_routing import ReadYourWritesMiddleware
+from .db import get_db, SessionLocal, engine, read_engine
+from .services import jobs, public_bundle
 from .routes.users import router as users_router
 from .routes.auth import router as auth_router
 from .routes.countries import router as countries_router
@@ -17,10 +27,21 @@ from .routes.weights import router as weights_router
 from .routes.indicator_values import router as indicator_values_router
 from .routes.public import router as public_router
 from .routes.public_descriptions import router as public_descriptions_router
+from .routes.admin import router as admin_router, profile_allowed, require_metrics_access
+from .routes.jobs import router as jobs_router
 
 
 
 
+def _warm_caches() -> None:
+    """Precalcula el bundle público del escenario activo."""
+    db = SessionLocal()
+    try:
+        public_bundle.warm_active(db)
+    finally:
+        db.close()
+
+
 # ==========================================
 # 🔹 Lifespan: se ejecuta al iniciar y cerrar la app
 # ==========================================
@@ -28,8 +49,15 @@ from .routes.public_descriptions import router as public_descriptions_router
 async def lifespan(app: FastAPI):
     # 👉 Aquí podrías abrir conexiones, cargar cache o inicializar servicios
     # No hagas Base.metadata.create_all() aquí (usa Alembic para migraciones)
+
+    # cache caliente en segundo plano: no retrasa el arranque
+    asyncio.get_running_loop().run_in_executor(None, _warm_caches)
+    # borrados en cascada que quedaron a medias (reinicio / caída)
+    asyncio.get_running_loop().run_in_executor(None, jobs.resume_unfinished)
     yield
     # 👉 Aquí cerrarías recursos (conexiones, tareas en segundo plano, etc.)
+    password_pool.shutdown()
+    jobs.shutdown()
 
 
 # ==========================================
@@ -52,8 +80,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # el dashboard lee el job de activación en dos fases (PATCH /scenarios/{id})
+    expose_headers=["X-Activation-Job"],
 )
 
+# X-Profile: 1 (solo ADMIN) perfila esa request con cProfile; sin la
+# cabecera no hace nada. Va por dentro de los demás middlewares.
+if settings.PROFILING_ENABLED:
+    app.add_middleware(profiling.ProfilingMiddleware, authorize=profile_allowed)
+
+# Compresión br / gzip de respuestas JSON grandes (las ya cacheadas
+# comprimidas pasan de largo: traen Content-Encoding)
+app.add_middleware(CompressionMiddleware)
+
+# Con réplica de lectura: cookie de escritura reciente (read-your-writes)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Queries SQL por request (X-DB-Queries / X-DB-Time fuera de producción)
+app.add_middleware(QueryStatsMiddleware)
+
+# Trazas muestreadas (TRACING_SAMPLE_RATE / traceparent): span raíz por
+# request y spans hijos de repositorios, analytics e importador
+app.add_middleware(TracingMiddleware)
+
+# Métricas por ruta: se agrega al final para quedar por fuera de todo
+# (mide también CORS / compresión y el tamaño ya comprimido)
+app.add_middleware(MetricsMiddleware)
+
 
 # ==========================================
 # 🔹 Health checks
@@ -70,9 +123,27 @@ def health():
 
 @app.get("/db/health", tags=["system"])
 def db_health(db: Session = Depends(get_db)):
-    """Verifica conexión a la base de datos."""
+    """Verifica conexión a la base de datos (y estado del pool)."""
     ok = db.execute(text("SELECT 1")).scalar() == 1
-    return {"database_url": settings.DATABASE_URL, "ok": ok}
+    body = {"database_url": settings.DATABASE_URL, "ok": ok, "pool": pool_stats(engine)}
+    if read_engine is not engine:
+        body["replica_pool"] = pool_stats(read_engine)
+    return body
+
+
+@app.get(
+    "/metrics",
+    tags=["system"],
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_metrics_access)],
+)
+def prometheus_metrics():
+    """
+    Métricas en formato texto de Prometheus (requests, caches, pool, imports...).
+    Requiere METRICS_TOKEN (scraper) o un ADMIN: exponen rutas, volúmenes y
+    el estado interno del servicio.
+    """
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 
 # ==========================================
@@ -83,11 +154,18 @@ API_PREFIX = "/api/v1"
 # Ejemplo: /api/v1/users
 app.include_router(users_router, prefix=API_PREFIX)
 app.include_router(auth_router, prefix=API_PREFIX)
-app.include_router(countries_router, prefix=API_PREFIX)
-app.include_router(categories_router, prefix=API_PREFIX)
-app.include_router(indicators_router, prefix=API_PREFIX)
-app.include_router(scenarios_router, prefix=API_PREFIX)
+# catálogo y analytics: payloads grandes → serialización rápida (orjson)
+app.include_router(countries_router, prefix=API_PREFIX, default_response_class=FastJSONResponse)
+app.include_router(categories_router, prefix=API_PREFIX, default_response_class=FastJSONResponse)
+app.include_router(indicators_router, prefix=API_PREFIX, default_response_class=FastJSONResponse)
+app.include_router(scenarios_router, prefix=API_PREFIX, default_response_class=FastJSONResponse)
 app.include_router(weights_router, prefix=API_PREFIX)
-app.include_router(indicator_values_router, prefix=API_PREFIX)
-app.include_router(public_router, prefix=API_PREFIX)
-app.include_router(public_descriptions_router, prefix=API_PREFIX)
\ No newline at end of file
+app.include_router(indicator_values_router, prefix=API_PREFIX, default_response_class=FastJSONResponse)
+app.include_router(public_router, prefix=API_PREFIX, default_response_class=FastJSONResponse)
+app.include_router(public_descriptions_router, prefix=API_PREFIX)
+app.include_router(admin_router, prefix=API_PREFIX)
+app.include_router(jobs_router, prefix=API_PREFIX)
+
+# endpoints sync perfilables en su hilo (ver app/core/profiling.py)
+if settings.PROFILING_ENABLED:
+    profiling.instrument_routes(app)
@@ -6,4 +6,5 @@ from .indicator import Indicator
 from .scenario import Scenario
 from .weights import CategoryWeight, IndicatorWeight
 from .indicator_value import IndicatorValue
-from .public_description import PublicDescription
\ No newline at end of file
+from .public_description import PublicDescription
+from .job import Job
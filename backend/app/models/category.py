@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, func, UniqueConstraint, Index
+from sqlalchemy import String, Integer, DateTime, Boolean, func, false, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db import Base
 
@@ -10,6 +10,8 @@ class Category(Base):
     name: Mapped[str] = mapped_column(String(120), nullable=False)
     slug: Mapped[str] = mapped_column(String(120), nullable=False, unique=True, index=True)
     description: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    # borrado en curso (job en segundo plano): fuera del catálogo
+    deleting: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -28,6 +28,10 @@ class IndicatorValue(Base):
     __table_args__ = (
         UniqueConstraint("scenario_id", "country_id", "indicator_id", name="uq_scenario_country_indicator"),
         Index("idx_indicator_values_indicator", "indicator_id"),
+        # índices cubrientes (incluyen normalized_value) para analytics y listados
+        Index("idx_iv_scenario_country_cover", "scenario_id", "country_id", "indicator_id", "normalized_value"),
+        Index("idx_iv_scenario_indicator_cover", "scenario_id", "indicator_id", "country_id", "normalized_value"),
+        Index("idx_iv_scenario_id", "scenario_id", "id"),
         CheckConstraint(
             "normalized_value IS NULL OR (normalized_value >= 0 AND normalized_value <= 5)",
             name="ck_norm_0_5",
@@ -0,0 +1,39 @@
+# app/models/job.py
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime, ForeignKey, func, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db import Base
+
+
+class Job(Base):
+    """
+    Trabajo en segundo plano (app/services/jobs.py). Vive en la BD para
+    que cualquier worker pueda informar el progreso y retomarlo.
+    """
+    __tablename__ = "background_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)          # p.ej. "delete_scenario"
+    target_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # pending → running → done | failed
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # filas a procesar
+    done: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    worker: Mapped[str | None] = mapped_column(String(100), nullable=True)  # host:pid que lo ejecuta
+    # lease: el worker dueño lo renueva mientras vive; vencido, otro lo retoma
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    created_by: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("idx_background_jobs_status", "status"),
+        Index("idx_background_jobs_kind_target", "kind", "target_id"),
+    )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, Boolean, ForeignKey, func, UniqueConstraint, Index, text
+from sqlalchemy import String, Integer, DateTime, Boolean, ForeignKey, func, false, UniqueConstraint, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db import Base
 
@@ -10,6 +10,10 @@ class Scenario(Base):
     name: Mapped[str] = mapped_column(String(120), nullable=False, unique=True, index=True)
     description: Mapped[str | None] = mapped_column(String(500), nullable=True)
     active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    # herencia copy-on-write: el hijo guarda solo los valores / pesos que cambia
+    parent_id: Mapped[int | None] = mapped_column(ForeignKey("scenarios.id"), nullable=True, index=True)
+    # borrado en curso (job en segundo plano): la app ya no lo muestra ni lo usa
+    deleting: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
 
     created_by: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
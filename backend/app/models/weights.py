@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, ForeignKey, Numeric, UniqueConstraint
+from sqlalchemy import Boolean, Integer, ForeignKey, Numeric, UniqueConstraint, false
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db import Base
 
@@ -9,6 +9,8 @@ class CategoryWeight(Base):
     scenario_id: Mapped[int] = mapped_column(ForeignKey("scenarios.id"), nullable=False)
     category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), nullable=False)
     weight: Mapped[float] = mapped_column(Numeric(6, 4), nullable=False)  # 0..1
+    # tombstone de un escenario hijo: quita el entorno heredado del padre
+    excluded: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
 
     __table_args__ = (UniqueConstraint("scenario_id", "category_id", name="uq_scenario_category"),)
 
@@ -19,5 +21,7 @@ class IndicatorWeight(Base):
     scenario_id: Mapped[int] = mapped_column(ForeignKey("scenarios.id"), nullable=False)
     indicator_id: Mapped[int] = mapped_column(ForeignKey("indicators.id"), nullable=False)
     weight: Mapped[float] = mapped_column(Numeric(6, 4), nullable=False)  # 0..1
+    # tombstone de un escenario hijo: quita el peso heredado del padre
+    excluded: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
 
     __table_args__ = (UniqueConstraint("scenario_id", "indicator_id", name="uq_scenario_indicator"),)
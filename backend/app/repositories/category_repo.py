@@ -1,5 +1,5 @@
 from math import ceil
-from sqlalchemy import select, func
+from sqlalchemy import delete as sql_delete, func, select
 from sqlalchemy.orm import Session
 import re
 
@@ -9,6 +9,12 @@ from app.schemas.category import CategoryCreate, CategoryUpdate
 from app.models.weights import CategoryWeight, IndicatorWeight
 from app.models.indicator import Indicator
 from app.models.indicator_value import IndicatorValue  # ajusta el nombre del archivo si cambia
+from app.core.cache import bump_catalog, bump_scenario
+from app.core.tracing import traced
+from app.models.job import Job
+from app.services import jobs
+from app.services import catalog_registry
+from app.services.catalog_registry import CategoryEntry
 
 
 def slugify(s: str) -> str:
@@ -19,17 +25,19 @@ def slugify(s: str) -> str:
     return s
 
 
+@traced
 def list_categories(db: Session, q: str | None, page: int, limit: int):
-    stmt = select(Category)
+    # desde el registro del catálogo (memoria), ordenadas por nombre
+    cat = catalog_registry.get_catalog(db)
     if q:
-        q_like = f"%{q}%"
-        stmt = stmt.where(Category.name.ilike(q_like))
+        # índice de búsqueda: exactos primero, luego prefijos
+        rows: list[CategoryEntry] = [cat.categories[i] for i in cat.category_search.search(q)]
+    else:
+        rows = cat.categories_sorted
 
-    total = db.scalar(select(func.count()).select_from(stmt.subquery())) or 0
+    total = len(rows)
     offset = (page - 1) * limit
-    rows = db.scalars(
-        stmt.order_by(Category.name.asc()).offset(offset).limit(limit)
-    ).all()
+    rows = rows[offset:offset + limit]
 
     return {
         "page": page,
@@ -40,14 +48,23 @@ def list_categories(db: Session, q: str | None, page: int, limit: int):
     }
 
 
+@traced
+def find_by_slug(db: Session, slug: str) -> CategoryEntry | None:
+    """Solo lectura (registro del catálogo); para modificar usar get_by_slug."""
+    return catalog_registry.get_catalog(db).category_by_slug.get(slug)
+
+
+@traced
 def get_by_slug(db: Session, slug: str) -> Category | None:
-    return db.scalar(select(Category).where(Category.slug == slug))
+    return db.scalar(select(Category).where(Category.slug == slug, Category.deleting.is_(False)))
 
 
+@traced
 def get_by_name(db: Session, name: str) -> Category | None:
     return db.scalar(select(Category).where(Category.name == name))
 
 
+@traced
 def create_category(db: Session, data: CategoryCreate) -> Category:
     slug = slugify(data.name)
     if get_by_slug(db, slug):
@@ -55,10 +72,12 @@ def create_category(db: Session, data: CategoryCreate) -> Category:
     c = Category(**data.model_dump(), slug=slug)
     db.add(c)
     db.commit()
+    bump_catalog()
     db.refresh(c)
     return c
 
 
+@traced
 def update_category(db: Session, cat: Category, data: CategoryUpdate) -> Category:
     for k, v in data.model_dump(exclude_unset=True).items():
         setattr(cat, k, v)
@@ -66,11 +85,13 @@ def update_category(db: Session, cat: Category, data: CategoryUpdate) -> Categor
         cat.slug = slugify(data.name)
     db.add(cat)
     db.commit()
+    bump_catalog()
     db.refresh(cat)
     return cat
 
 
-def delete_category(db: Session, category: Category) -> None:
+@traced
+def delete_category(db: Session, category: Category, user_id: int | None = None) -> Job:
     """
     Elimina un entorno (categoría) y EN CASCADA:
     - todos sus indicadores
@@ -78,12 +99,14 @@ def delete_category(db: Session, category: Category) -> None:
     - todos los valores de esos indicadores
 
     Solo se bloquea si la categoría está asignada a uno o más escenarios.
+    En la request solo se marca como `deleting` (sale del catálogo junto
+    con sus indicadores) y el borrado corre como job (purge_category).
     """
 
     # 1) ¿Está asignado a escenarios? (CategoryWeight = escenario-entorno)
     assigned_count = (
         db.query(CategoryWeight)
-        .filter(CategoryWeight.category_id == category.id)
+        .filter(CategoryWeight.category_id == category.id, CategoryWeight.excluded.is_(False))
         .count()
     )
     if assigned_count > 0:
@@ -92,30 +115,40 @@ def delete_category(db: Session, category: Category) -> None:
             "Primero elimínalo de esos escenarios."
         )
 
-    # 2) Obtener IDs de indicadores EXCLUSIVAMENTE desde la tabla, sin usar category.indicators
-    indicator_ids = [
-        row[0]
-        for row in db.query(Indicator.id)
-        .filter(Indicator.category_id == category.id)
-        .all()
-    ]
+    category.deleting = True
+    db.add(category)
+    db.commit()
+    bump_catalog()
+    bump_scenario(None)  # índices y rankings dejan de contarla ya, no al terminar el job
+    return jobs.submit(db, "delete_category", category.id, user_id)
+
 
+@jobs.handler("delete_category")
+def purge_category(db: Session, category_id: int, progress: jobs.Progress) -> None:
+    """Job: valores y pesos de sus indicadores por lotes, luego indicadores y categoría."""
+    if db.get(Category, category_id) is None:
+        return  # ya lo borró otra ejecución
+
+    # IDs de indicadores EXCLUSIVAMENTE desde la tabla, sin usar category.indicators
+    indicator_ids = db.scalars(select(Indicator.id).where(Indicator.category_id == category_id)).all()
+
+    children = (IndicatorValue, IndicatorWeight)
+    if indicator_ids:
+        progress.set_total(len(indicator_ids) + sum(
+            db.scalar(select(func.count()).select_from(m).where(m.indicator_id.in_(indicator_ids))) or 0
+            for m in children
+        ))
+        for model in children:
+            jobs.delete_in_batches(db, model, model.indicator_id.in_(indicator_ids), progress=progress)
+
+    # rezagados + indicadores + categoría, en una sola transacción
     if indicator_ids:
-        # 2.a) Borrar valores de esos indicadores
-        db.query(IndicatorValue).filter(
-            IndicatorValue.indicator_id.in_(indicator_ids)
-        ).delete(synchronize_session=False)
-
-        # 2.b) Borrar pesos de esos indicadores
-        db.query(IndicatorWeight).filter(
-            IndicatorWeight.indicator_id.in_(indicator_ids)
-        ).delete(synchronize_session=False)
-
-        # 2.c) Borrar los indicadores
-        db.query(Indicator).filter(
-            Indicator.id.in_(indicator_ids)
-        ).delete(synchronize_session=False)
-
-    # 3) Finalmente borrar la categoría
-    db.delete(category)
+        for model in children:
+            db.execute(sql_delete(model).where(model.indicator_id.in_(indicator_ids)))
+        db.execute(sql_delete(Indicator).where(Indicator.id.in_(indicator_ids)))
+        progress.advance(len(indicator_ids))
+    db.execute(sql_delete(CategoryWeight).where(CategoryWeight.category_id == category_id))
+    db.execute(sql_delete(Category).where(Category.id == category_id))
     db.commit()
+    bump_catalog()
+    bump_scenario(None)
@@ -1,11 +1,15 @@
 # app/repositories/indicator_repo.py
 from math import ceil
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.indicator import Indicator
 from app.models.indicator_value import IndicatorValue
 from app.models.weights import IndicatorWeight
 from app.schemas.indicator import IndicatorCreate, IndicatorUpdate
+from app.core.cache import bump_catalog
+from app.core.tracing import traced
+from app.services import catalog_registry
+from app.services.catalog_registry import IndicatorEntry
 import re
 
 def slugify(s: str) -> str:
@@ -15,19 +19,21 @@ def slugify(s: str) -> str:
     s = re.sub(r"-+", "-", s)
     return s
 
+@traced
 def list_indicators(db: Session, q: str | None, category_id: int | None, page: int, limit: int):
-    stmt = select(Indicator)
+    # desde el registro del catálogo (memoria), ordenados por nombre
+    cat = catalog_registry.get_catalog(db)
     if q:
-        stmt = stmt.where(Indicator.name.ilike(f"%{q}%"))
+        # índice de búsqueda: exactos primero, luego prefijos
+        rows: list[IndicatorEntry] = [cat.indicators[i] for i in cat.indicator_search.search(q)]
+    else:
+        rows = cat.indicators_sorted
     if category_id:
-        stmt = stmt.where(Indicator.category_id == category_id)
+        rows = [i for i in rows if i.category_id == category_id]
 
-    total = db.scalar(select(func.count()).select_from(stmt.subquery())) or 0
-    rows = db.scalars(
-        stmt.order_by(Indicator.name.asc())
-            .offset((page - 1) * limit)
-            .limit(limit)
-    ).all()
+    total = len(rows)
+    offset = (page - 1) * limit
+    rows = rows[offset:offset + limit]
 
     return {
         "page": page,
@@ -37,15 +43,24 @@ def list_indicators(db: Session, q: str | None, category_id: int | None, page: i
         "items": rows,
     }
 
+@traced
 def get_by_id(db: Session, indicator_id: int) -> Indicator | None:
     return db.get(Indicator, indicator_id)
 
+@traced
+def find_by_slug(db: Session, slug: str) -> IndicatorEntry | None:
+    """Solo lectura (registro del catálogo); para modificar usar get_by_slug."""
+    return catalog_registry.get_catalog(db).indicator_by_slug.get(slug)
+
+@traced
 def get_by_slug(db: Session, slug: str) -> Indicator | None:
     return db.scalar(select(Indicator).where(Indicator.slug == slug))
 
+@traced
 def get_by_name(db: Session, name: str) -> Indicator | None:
     return db.scalar(select(Indicator).where(Indicator.name == name))
 
+@traced
 def create(db: Session, data: IndicatorCreate) -> Indicator:
     slug = slugify(data.name)
     if get_by_slug(db, slug):
@@ -67,9 +82,11 @@ def create(db: Session, data: IndicatorCreate) -> Indicator:
 
     db.add(ind)
     db.commit()
+    bump_catalog()
     db.refresh(ind)
     return ind
 
+@traced
 def update(db: Session, ind: Indicator, data: IndicatorUpdate) -> Indicator:
     payload = data.model_dump(exclude_unset=True)
 
@@ -104,9 +121,11 @@ def update(db: Session, ind: Indicator, data: IndicatorUpdate) -> Indicator:
 
     db.add(ind)
     db.commit()
+    bump_catalog()
     db.refresh(ind)
     return ind
 
+@traced
 def safe_delete_indicator(db: Session, indicator: Indicator) -> None:
     """
     Solo borra la variable si NO tiene valores.
@@ -130,3 +149,4 @@ def safe_delete_indicator(db: Session, indicator: Indicator) -> None:
 
     db.delete(indicator)
     db.commit()
+    bump_catalog()
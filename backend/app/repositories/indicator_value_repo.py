@@ -1,11 +1,27 @@
 # app/repositories/indicator_value_repo.py
+import base64
 from math import ceil
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_
 from sqlalchemy.orm import Session
 from app.models.indicator_value import IndicatorValue
 from app.models.indicator import Indicator
-from app.schemas.indicator_value import IndicatorValueCreate, IndicatorValueUpdate
+from app.models.scenario import Scenario
+from app.schemas.indicator_value import (
+  IndicatorValueCreate,
+  IndicatorValueUpdate,
+  IndicatorValueBulkPayload,
+)
 from app.core.normalization import normalize_value, NormalizationError
+from app.core.cache import TTLCache, bump_scenario, scenario_version
+from app.core.tracing import traced
+from app.repositories import scenario_repo, weights_repo
+from app.services import catalog_registry
+from app.services.catalog_registry import IndicatorEntry
+
+# count(*) por filtros; las claves llevan la versión del escenario
+_value_counts = TTLCache("indicator_value_counts", ttl_seconds=300, maxsize=4096)
+# matriz densa país × indicador por (escenario, versión)
+_matrices = TTLCache("scenario_matrix", ttl_seconds=300, maxsize=32)
 
 
 def _find_existing(db: Session, scenario_id: int, country_id: int, indicator_id: int):
@@ -18,34 +34,40 @@ def _find_existing(db: Session, scenario_id: int, country_id: int, indicator_id:
   return db.scalar(stmt)
 
 
+def _checked_normalize(ind: Indicator | IndicatorEntry, raw_value: float | None) -> float | None:
+  """Valida el raw contra min / max del indicador y lo normaliza (None si no hay raw)."""
+  if raw_value is None:
+      return None
+
+  raw = float(raw_value)
+
+  # usamos los min / max del indicador si existen
+  min_val = getattr(ind, "min_value", None)
+  max_val = getattr(ind, "max_value", None)
+
+  if min_val is not None and raw < min_val:
+      raise NormalizationError(
+          f"El valor {raw} está por debajo del mínimo permitido ({min_val}) "
+          f"para el indicador '{ind.name}'."
+      )
+  if max_val is not None and raw > max_val:
+      raise NormalizationError(
+          f"El valor {raw} está por encima del máximo permitido ({max_val}) "
+          f"para el indicador '{ind.name}'."
+      )
+
+  return normalize_value(ind, raw)
+
+
+@traced
 def upsert_value(db: Session, payload: IndicatorValueCreate, user_id: int | None) -> IndicatorValue:
-  # 1. validar que exista el indicador
-  ind = db.get(Indicator, payload.indicator_id)
+  # 1. validar que exista el indicador (registro del catálogo, sin query)
+  ind = catalog_registry.get_indicator(db, payload.indicator_id)
   if not ind:
       raise ValueError("Indicador no existe")
 
   # 2. validar escala + normalizar (si hay raw)
-  if payload.raw_value is not None:
-      raw = float(payload.raw_value)
-
-      # usamos los min / max del indicador si existen
-      min_val = getattr(ind, "min_value", None)
-      max_val = getattr(ind, "max_value", None)
-
-      if min_val is not None and raw < min_val:
-          raise NormalizationError(
-              f"El valor {raw} está por debajo del mínimo permitido ({min_val}) "
-              f"para el indicador '{ind.name}'."
-          )
-      if max_val is not None and raw > max_val:
-          raise NormalizationError(
-              f"El valor {raw} está por encima del máximo permitido ({max_val}) "
-              f"para el indicador '{ind.name}'."
-          )
-
-      norm = normalize_value(ind, raw)
-  else:
-      norm = None
+  norm = _checked_normalize(ind, payload.raw_value)
 
   # 3. ver si YA existe ese value para ese escenario
   current = _find_existing(
@@ -59,6 +81,7 @@ def upsert_value(db: Session, payload: IndicatorValueCreate, user_id: int | None
       current.normalized_value = norm
       db.add(current)
       db.commit()
+      bump_scenario(payload.scenario_id)
       db.refresh(current)
       return current
 
@@ -73,43 +96,71 @@ def upsert_value(db: Session, payload: IndicatorValueCreate, user_id: int | None
   )
   db.add(rec)
   db.commit()
+  bump_scenario(payload.scenario_id)
   db.refresh(rec)
   return rec
 
 
+@traced
 def update_value(db: Session, iv: IndicatorValue, payload: IndicatorValueUpdate) -> IndicatorValue:
   data = payload.model_dump(exclude_unset=True)
   if "raw_value" in data:
       iv.raw_value = data["raw_value"]
 
-      ind = db.get(Indicator, iv.indicator_id)
-
-      if iv.raw_value is not None:
-          raw = float(iv.raw_value)
-          min_val = getattr(ind, "min_value", None)
-          max_val = getattr(ind, "max_value", None)
-
-          if min_val is not None and raw < min_val:
-              raise NormalizationError(
-                  f"El valor {raw} está por debajo del mínimo permitido ({min_val}) "
-                  f"para el indicador '{ind.name}'."
-              )
-          if max_val is not None and raw > max_val:
-              raise NormalizationError(
-                  f"El valor {raw} está por encima del máximo permitido ({max_val}) "
-                  f"para el indicador '{ind.name}'."
-              )
-
-          iv.normalized_value = normalize_value(ind, raw)
-      else:
-          iv.normalized_value = None
+      ind = catalog_registry.get_indicator(db, iv.indicator_id)
+      iv.normalized_value = _checked_normalize(ind, iv.raw_value)
 
   db.add(iv)
   db.commit()
+  bump_scenario(iv.scenario_id)
   db.refresh(iv)
   return iv
 
 
+def _encode_cursor(key: tuple) -> str:
+  raw = ".".join(str(k) for k in key)
+  return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, size: int) -> tuple[int, ...]:
+  try:
+      padded = cursor + "=" * (-len(cursor) % 4)
+      key = tuple(int(p) for p in base64.urlsafe_b64decode(padded).decode().split("."))
+  except (ValueError, UnicodeDecodeError):
+      raise ValueError("Cursor inválido")
+  if len(key) != size:
+      raise ValueError("Cursor inválido")
+  return key
+
+
+@traced
+def count_values(
+  db: Session,
+  scenario_id: int | None,
+  country_id: int | None,
+  indicator_id: int | None,
+) -> int:
+  """
+  count(*) con los mismos filtros que list_values, cacheado por escenario:
+  la clave incluye la versión de datos del escenario, así que cualquier
+  escritura sobre ese escenario lo invalida.
+  """
+  key = (scenario_id, country_id, indicator_id, scenario_version(scenario_id))
+
+  def _count() -> int:
+      stmt = select(func.count(IndicatorValue.id))
+      if scenario_id:
+          stmt = stmt.where(IndicatorValue.scenario_id == scenario_id)
+      if country_id:
+          stmt = stmt.where(IndicatorValue.country_id == country_id)
+      if indicator_id:
+          stmt = stmt.where(IndicatorValue.indicator_id == indicator_id)
+      return db.scalar(stmt) or 0
+
+  return _value_counts.get_or_set(key, _count)
+
+
+@traced
 def list_values(
   db: Session,
   scenario_id: int | None,
@@ -117,7 +168,20 @@ def list_values(
   indicator_id: int | None,
   page: int,
   limit: int,
+  *,
+  cursor: str | None = None,
+  sort: str = "id",
+  include_total: bool = True,
 ):
+  """
+  Lista valores con dos modos de paginación:
+  - page (OFFSET): el de siempre, para la UI.
+  - cursor (keyset): si viene cursor, se ignora page y se continúa desde la
+    última clave vista; cada página cuesta lo mismo que la primera.
+
+  sort="id" ordena por id DESC; sort="cell" por (escenario, país, indicador) ASC,
+  que es el orden del índice único.
+  """
   stmt = select(IndicatorValue)
   if scenario_id:
       stmt = stmt.where(IndicatorValue.scenario_id == scenario_id)
@@ -126,26 +190,345 @@ def list_values(
   if indicator_id:
       stmt = stmt.where(IndicatorValue.indicator_id == indicator_id)
 
-  total = db.scalar(select(func.count()).select_from(stmt.subquery())) or 0
-  rows = db.scalars(
-      stmt.order_by(IndicatorValue.id.desc())
-      .offset((page - 1) * limit)
-      .limit(limit)
-  ).all()
+  if sort == "cell":
+      key_cols = (IndicatorValue.scenario_id, IndicatorValue.country_id, IndicatorValue.indicator_id)
+      stmt = stmt.order_by(*(c.asc() for c in key_cols))
+      if cursor:
+          key = _decode_cursor(cursor, 3)
+          # las columnas iniciales fijadas por igualdad no entran en la
+          # comparación de tuplas; así el planner recorre el índice como rango
+          fixed = 0
+          for value in (scenario_id, country_id):
+              if not value:
+                  break
+              fixed += 1
+          if fixed == 2:
+              stmt = stmt.where(IndicatorValue.indicator_id > key[2])
+          else:
+              stmt = stmt.where(tuple_(*key_cols[fixed:]) > tuple_(*key[fixed:]))
+  else:
+      stmt = stmt.order_by(IndicatorValue.id.desc())
+      if cursor:
+          stmt = stmt.where(IndicatorValue.id < _decode_cursor(cursor, 1)[0])
+
+  if not cursor:
+      stmt = stmt.offset((page - 1) * limit)
+
+  # pedimos uno de más para saber si hay página siguiente sin contar
+  rows = db.scalars(stmt.limit(limit + 1)).all()
+  has_more = len(rows) > limit
+  rows = rows[:limit]
+
+  next_cursor = None
+  if has_more and rows:
+      last = rows[-1]
+      if sort == "cell":
+          next_cursor = _encode_cursor((last.scenario_id, last.country_id, last.indicator_id))
+      else:
+          next_cursor = _encode_cursor((last.id,))
+
+  total = None
+  total_pages = None
+  if include_total:
+      total = count_values(db, scenario_id, country_id, indicator_id)
+      total_pages = ceil(total / limit) if limit else 1
 
   return {
       "page": page,
       "limit": limit,
       "total": total,
-      "total_pages": ceil(total / limit) if limit else 1,
+      "total_pages": total_pages,
+      "next_cursor": next_cursor,
       "items": rows,
   }
 
 
+@traced
+def get_matrix(db: Session, scenario_id: int) -> dict:
+  """
+  Matriz completa país × indicador de un escenario en formato columnar:
+
+      country_ids[]    → filas
+      indicator_ids[]  → columnas
+      values[]         → normalized_value, row-major (len = filas * columnas), null si no hay dato
+      raw_values[]     → raw_value, mismo orden
+
+  Se arma desde una query Core de 4 columnas (sin entidades ORM ni
+  modelos Pydantic por celda) y se cachea por versión del escenario.
+  Un escenario hijo muestra sus valores sobre los heredados, salvo los de
+  entornos que quitó.
+  """
+  version = scenario_version(scenario_id)
+
+  def _build() -> dict:
+      sc = db.get(Scenario, scenario_id)
+      chain = scenario_repo.lineage(db, sc) if sc is not None else [scenario_id]
+      cols = (
+          IndicatorValue.country_id,
+          IndicatorValue.indicator_id,
+          IndicatorValue.raw_value,
+          IndicatorValue.normalized_value,
+      )
+      if len(chain) == 1:
+          rows = db.execute(select(*cols).where(IndicatorValue.scenario_id == scenario_id)).all()
+      else:
+          merged = scenario_repo.overlay(chain, (
+              (sid, (cid, iid), (raw, norm))
+              for sid, cid, iid, raw, norm in db.execute(
+                  select(IndicatorValue.scenario_id, *cols).where(IndicatorValue.scenario_id.in_(chain))
+              )
+          ))
+          rows = [(cid, iid, raw, norm) for (cid, iid), (raw, norm) in merged.items()]
+          excluded = weights_repo.excluded_categories(db, chain)
+          if excluded:
+              # entornos que el hijo quitó: sus valores heredados no se ven
+              indicators = catalog_registry.get_catalog(db).indicators
+              rows = [
+                  r for r in rows
+                  if r[1] not in indicators or indicators[r[1]].category_id not in excluded
+              ]
+
+      country_ids = sorted({r[0] for r in rows})
+      indicator_ids = sorted({r[1] for r in rows})
+      row_pos = {cid: i for i, cid in enumerate(country_ids)}
+      col_pos = {iid: j for j, iid in enumerate(indicator_ids)}
+      width = len(indicator_ids)
+
+      size = len(country_ids) * width
+      values: list[float | None] = [None] * size
+      raw_values: list[float | None] = [None] * size
+      for country_id, indicator_id, raw, norm in rows:
+          k = row_pos[country_id] * width + col_pos[indicator_id]
+          if raw is not None:
+              raw_values[k] = float(raw)
+          if norm is not None:
+              values[k] = float(norm)
+
+      return {
+          "scenario_id": scenario_id,
+          "version": version,
+          "country_ids": country_ids,
+          "indicator_ids": indicator_ids,
+          "values": values,
+          "raw_values": raw_values,
+      }
+
+  return _matrices.get_or_set((scenario_id, version), _build)
+
+
+@traced
+def inherited_raw_values(db: Session, scenario_id: int) -> dict[tuple[int, int], float | None]:
+  """
+  Celdas (país, indicador) que el escenario hereda de sus ancestros (sin
+  fila propia) → raw_value efectivo. {} si no tiene padre.
+  """
+  sc = db.get(Scenario, scenario_id)
+  if sc is None or sc.parent_id is None:
+      return {}
+  chain = scenario_repo.lineage(db, sc)
+  rows = db.execute(
+      select(
+          IndicatorValue.scenario_id,
+          IndicatorValue.country_id,
+          IndicatorValue.indicator_id,
+          IndicatorValue.raw_value,
+      ).where(IndicatorValue.scenario_id.in_(chain))
+  ).all()
+  own = {(cid, iid) for sid, cid, iid, _ in rows if sid == scenario_id}
+  inherited = scenario_repo.overlay(
+      chain[1:], ((sid, (cid, iid), raw) for sid, cid, iid, raw in rows if sid != scenario_id)
+  )
+  return {
+      cell: (float(raw) if raw is not None else None)
+      for cell, raw in inherited.items()
+      if cell not in own
+  }
+
+
+@traced
 def get_by_id(db: Session, value_id: int) -> IndicatorValue | None:
   return db.get(IndicatorValue, value_id)
 
 
+@traced
 def delete_value(db: Session, iv: IndicatorValue) -> None:
+  scenario_id = iv.scenario_id
   db.delete(iv)
   db.commit()
+  bump_scenario(scenario_id)
+
+
+@traced
+def bulk_apply(db: Session, payload: IndicatorValueBulkPayload, user_id: int | None) -> dict:
+  """
+  Aplica un lote de operaciones (upsert / update / delete) de un escenario
+  en UNA sola transacción.
+
+  - Indicadores y valores existentes se cargan con un par de queries,
+    no una por celda.
+  - La validación + normalización es la misma que en upsert_value.
+  - Los errores se reportan por ítem; si payload.atomic es True y hay
+    alguno, no se guarda nada.
+  """
+  scenario_id = payload.scenario_id
+  sc = db.get(Scenario, scenario_id)
+  if not sc or sc.deleting:
+      raise ValueError("Escenario no encontrado")
+
+  items = payload.items
+
+  # 1. ids involucrados
+  value_ids = {it.id for it in items if it.id is not None}
+
+  # 2. valores existentes del escenario: por id y por (país, indicador)
+  by_id: dict[int, IndicatorValue] = {}
+  if value_ids:
+      for iv in db.scalars(
+          select(IndicatorValue).where(
+              IndicatorValue.scenario_id == scenario_id,
+              IndicatorValue.id.in_(value_ids),
+          )
+      ).all():
+          by_id[iv.id] = iv
+
+  # indicadores y países: del registro del catálogo (min / max / tipo para
+  # normalizar; los países solo para validar las celdas nuevas)
+  catalog = catalog_registry.get_catalog(db)
+  wanted = {it.indicator_id for it in items if it.indicator_id is not None}
+  wanted_countries = {it.country_id for it in items if it.country_id is not None}
+  if not (wanted <= catalog.indicators.keys() and wanted_countries <= catalog.countries.keys()):
+      catalog = catalog_registry.refresh_on_miss(db)
+  indicators = catalog.indicators
+  countries = catalog.countries
+
+  by_cell: dict[tuple[int, int], IndicatorValue] = {
+      (iv.country_id, iv.indicator_id): iv for iv in by_id.values()
+  }
+  cell_pairs = {
+      (it.country_id, it.indicator_id)
+      for it in items
+      if it.country_id is not None and it.indicator_id is not None
+  }
+  if cell_pairs:
+      country_ids = {c for c, _ in cell_pairs}
+      pair_indicator_ids = {i for _, i in cell_pairs}
+      for iv in db.scalars(
+          select(IndicatorValue).where(
+              IndicatorValue.scenario_id == scenario_id,
+              IndicatorValue.country_id.in_(country_ids),
+              IndicatorValue.indicator_id.in_(pair_indicator_ids),
+          )
+      ).all():
+          by_id[iv.id] = iv
+          by_cell[(iv.country_id, iv.indicator_id)] = iv
+
+  # 3. aplicar en memoria
+  results: list[dict] = []
+  touched: list[tuple[dict, IndicatorValue]] = []
+  # celdas cuya fila se borró en este lote (el DELETE aún no se emitió)
+  deleted_cells: set[tuple[int, int]] = set()
+  error_count = 0
+
+  for index, it in enumerate(items):
+      res = {
+          "index": index,
+          "op": it.op,
+          "status": "error",
+          "id": it.id,
+          "country_id": it.country_id,
+          "indicator_id": it.indicator_id,
+      }
+      results.append(res)
+
+      try:
+          if it.id is not None:
+              current = by_id.get(it.id)
+              if current is None:
+                  raise ValueError("Registro no encontrado en el escenario")
+          elif it.op == "update":
+              raise ValueError("La operación update requiere id")
+          elif it.country_id is None or it.indicator_id is None:
+              raise ValueError("Se requiere id o (country_id, indicator_id)")
+          else:
+              current = by_cell.get((it.country_id, it.indicator_id))
+
+          if it.op == "delete":
+              if current is None:
+                  raise ValueError("Registro no encontrado en el escenario")
+              if current in db.new:
+                  # creado en este mismo lote: basta con sacarlo de la sesión
+                  db.expunge(current)
+              else:
+                  db.delete(current)
+                  deleted_cells.add((current.country_id, current.indicator_id))
+              by_id.pop(current.id, None)
+              by_cell.pop((current.country_id, current.indicator_id), None)
+              res.update(
+                  status="deleted",
+                  id=current.id,
+                  country_id=current.country_id,
+                  indicator_id=current.indicator_id,
+              )
+              continue
+
+          indicator_id = current.indicator_id if current is not None else it.indicator_id
+          ind = indicators.get(indicator_id)
+          if not ind:
+              raise ValueError("Indicador no existe")
+          norm = _checked_normalize(ind, it.raw_value)
+
+          if current is not None:
+              current.raw_value = it.raw_value
+              current.normalized_value = norm
+              res["status"] = "updated"
+          else:
+              if it.country_id not in countries:
+                  raise ValueError("País no existe")
+              cell = (it.country_id, it.indicator_id)
+              if cell in deleted_cells:
+                  # el flush ordena INSERT antes que DELETE: se emite el
+                  # borrado ya para no chocar con el índice único de la celda
+                  db.flush()
+                  deleted_cells.clear()
+              current = IndicatorValue(
+                  scenario_id=scenario_id,
+                  country_id=it.country_id,
+                  indicator_id=it.indicator_id,
+                  raw_value=it.raw_value,
+                  normalized_value=norm,
+                  loaded_by=user_id,
+              )
+              db.add(current)
+              by_cell[(it.country_id, it.indicator_id)] = current
+              res["status"] = "created"
+
+          res.update(
+              country_id=current.country_id,
+              indicator_id=current.indicator_id,
+              normalized_value=norm,
+          )
+          touched.append((res, current))
+      except ValueError as e:
+          # NormalizationError también es ValueError
+          res["error"] = str(e)
+          error_count += 1
+
+  # 4. una sola transacción para todo el lote
+  if payload.atomic and error_count:
+      db.rollback()
+      committed = False
+  else:
+      db.flush()
+      for res, iv in touched:
+          res["id"] = iv.id
+      db.commit()
+      bump_scenario(scenario_id)
+      committed = True
+
+  return {
+      "scenario_id": scenario_id,
+      "processed": len(items) - error_count if committed else 0,
+      "errors": error_count,
+      "committed": committed,
+      "items": results,
+  }
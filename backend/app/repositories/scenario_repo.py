@@ -1,14 +1,22 @@
 from math import ceil
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, delete as sql_delete, update as sql_update, insert, literal, select, func
+from sqlalchemy.orm import Session, aliased
 from app.models.scenario import Scenario
 from app.schemas.scenario import ScenarioCreate, ScenarioUpdate
 from app.models.weights import CategoryWeight, IndicatorWeight
 from app.models.indicator_value import IndicatorValue
 from app.models.indicator import Indicator
+from app.core.cache import bump_scenario, link_scenario
+from app.core.tracing import traced
+from app.models.job import Job
+from app.services import jobs
 
+# niveles de herencia permitidos (escenario + ancestros)
+MAX_DEPTH = 8
+
+@traced
 def list_scenarios(db: Session, q: str | None, page: int, limit: int, only_active: bool | None):
-    stmt = select(Scenario)
+    stmt = select(Scenario).where(Scenario.deleting.is_(False))
     if q:
         stmt = stmt.where(Scenario.name.ilike(f"%{q}%"))
     if only_active is True:
@@ -20,12 +28,61 @@ def list_scenarios(db: Session, q: str | None, page: int, limit: int, only_activ
     rows = db.scalars(stmt.order_by(Scenario.name.asc()).offset((page-1)*limit).limit(limit)).all()
     return {"page": page, "limit": limit, "total": total, "total_pages": ceil(total/limit) if limit else 1, "items": rows}
 
+@traced
 def get_by_id(db: Session, scenario_id: int) -> Scenario | None:
-    return db.get(Scenario, scenario_id)
+    """None también si se está borrando (la app ya no lo usa)."""
+    sc = db.get(Scenario, scenario_id)
+    return None if sc is None or sc.deleting else sc
 
+@traced
 def get_by_name(db: Session, name: str) -> Scenario | None:
     return db.scalar(select(Scenario).where(Scenario.name == name))
 
+@traced
+def lineage(db: Session, sc: Scenario) -> list[int]:
+    """
+    Ids de la cadena de herencia: [escenario, padre, abuelo, ...]. Sin padre
+    no hace query; con padre, una sola (CTE recursiva).
+    """
+    if sc.parent_id is None:
+        return [sc.id]
+    chain = (
+        select(Scenario.id, Scenario.parent_id, literal(1, Integer).label("depth"))
+        .where(Scenario.id == sc.parent_id)
+        .cte("chain", recursive=True)
+    )
+    ancestor = aliased(Scenario)
+    chain = chain.union_all(
+        select(ancestor.id, ancestor.parent_id, chain.c.depth + 1)
+        .where(ancestor.id == chain.c.parent_id, chain.c.depth < MAX_DEPTH)
+    )
+    ids = [sc.id, *db.scalars(select(chain.c.id).order_by(chain.c.depth))]
+    for child, parent in zip(ids, ids[1:]):
+        link_scenario(child, parent)
+    return ids
+
+def overlay(chain: list[int], rows) -> dict:
+    """
+    Junta filas (scenario_id, clave, valor) de toda la cadena en una pasada:
+    por cada clave gana el escenario más cercano (el propio sobre el padre).
+    """
+    if len(chain) == 1:
+        return {key: value for _, key, value in rows}
+    rank = {sid: i for i, sid in enumerate(chain)}
+    merged: dict = {}
+    for sid, key, value in rows:
+        r = rank[sid]
+        current = merged.get(key)
+        if current is None or r < current[0]:
+            merged[key] = (r, value)
+    return {key: value for key, (_, value) in merged.items()}
+
+@traced
+def count_children(db: Session, scenario_id: int) -> int:
+    """Hijos directos, incluidos los que se están borrando (aún tienen la FK)."""
+    return db.scalar(select(func.count()).select_from(Scenario).where(Scenario.parent_id == scenario_id)) or 0
+
+@traced
 def create(db: Session, data: ScenarioCreate, user_id: int | None) -> Scenario:
     """
     Crea un escenario. Si viene marcado como active=True y el usuario tiene permiso,
@@ -36,6 +93,7 @@ def create(db: Session, data: ScenarioCreate, user_id: int | None) -> Scenario:
         name=data.name,
         description=data.description,
         active=data.active,
+        parent_id=data.parent_id,
         created_by=user_id,
     )
     db.add(sc)
@@ -49,15 +107,56 @@ def create(db: Session, data: ScenarioCreate, user_id: int | None) -> Scenario:
 
     return sc
 
+@traced
+def clone(db: Session, source: Scenario, name: str, description: str | None, user_id: int | None) -> Scenario:
+    """
+    Copia un escenario (queda inactivo) con sus valores y pesos, con
+    INSERT ... SELECT dentro de la BD: ninguna fila pasa por Python.
+    Todo en una transacción; los valores conservan quién los cargó.
+    Un hijo se clona como hermano: mismo padre, solo su delta.
+    """
+    sc = Scenario(
+        name=name,
+        description=source.description if description is None else description,
+        active=False,
+        parent_id=source.parent_id,
+        created_by=user_id,
+    )
+    db.add(sc)
+    db.flush()
+    new_id = literal(sc.id, Integer)
+
+    db.execute(insert(CategoryWeight).from_select(
+        ["scenario_id", "category_id", "weight", "excluded"],
+        select(new_id, CategoryWeight.category_id, CategoryWeight.weight, CategoryWeight.excluded)
+        .where(CategoryWeight.scenario_id == source.id),
+    ))
+    db.execute(insert(IndicatorWeight).from_select(
+        ["scenario_id", "indicator_id", "weight", "excluded"],
+        select(new_id, IndicatorWeight.indicator_id, IndicatorWeight.weight, IndicatorWeight.excluded)
+        .where(IndicatorWeight.scenario_id == source.id),
+    ))
+    db.execute(insert(IndicatorValue).from_select(
+        ["scenario_id", "country_id", "indicator_id", "raw_value", "normalized_value", "loaded_by"],
+        select(
+            new_id, IndicatorValue.country_id, IndicatorValue.indicator_id,
+            IndicatorValue.raw_value, IndicatorValue.normalized_value, IndicatorValue.loaded_by,
+        ).where(IndicatorValue.scenario_id == source.id),
+    ))
+    db.commit()
+    db.refresh(sc)
+    return sc
+
+@traced
 def update(db: Session, sc: Scenario, data: ScenarioUpdate) -> Scenario:
     """
-    Actualiza un escenario. Si en el payload se pide active=True,
-    al final se llama a set_active_exclusive para que solo este quede activo.
+    Actualiza un escenario. active=True NO se aplica aquí: activar es en dos
+    fases (precalentar y luego swap, ver services/activation.py) y lo encola
+    la ruta. active=False sí se aplica.
     """
     payload = data.model_dump(exclude_unset=True)
-
-    # ¿Se está pidiendo explícitamente activar este escenario?
-    should_activate = payload.get("active") is True
+    if payload.get("active") is True:
+        del payload["active"]
 
     # Aplicar cambios normales
     for k, v in payload.items():
@@ -65,19 +164,17 @@ def update(db: Session, sc: Scenario, data: ScenarioUpdate) -> Scenario:
 
     db.add(sc)
     db.commit()
+    bump_scenario(sc.id)
     db.refresh(sc)
-
-    # Si deberíamos activarlo en exclusiva, lo hacemos ahora
-    if should_activate:
-        set_active_exclusive(db, sc.id)
-        db.refresh(sc)
-
     return sc
 
-def delete(db: Session, scenario: Scenario) -> None:
+@traced
+def delete(db: Session, scenario: Scenario, user_id: int | None = None) -> Job:
     """
-    Borra un escenario solo si NO está activo.
-    Elimina además todas las relaciones:
+    Borra un escenario solo si NO está activo ni tiene hijos. En la request
+    solo se marca como `deleting` (desaparece de listados, analytics y
+    escrituras) y se encola el job que borra en segundo plano
+    (purge_scenario) todas sus relaciones:
     - indicator_values
     - indicator_weights
     - category_weights
@@ -87,27 +184,43 @@ def delete(db: Session, scenario: Scenario) -> None:
             "No se puede eliminar el escenario activo. "
             "Active otro escenario o desactive este antes de eliminarlo."
         )
+    if count_children(db, scenario.id):
+        raise ValueError(
+            "No se puede eliminar un escenario del que heredan otros. "
+            "Elimine primero los escenarios derivados."
+        )
 
-    # 1) borrar valores
-    db.query(IndicatorValue).filter(
-        IndicatorValue.scenario_id == scenario.id
-    ).delete(synchronize_session=False)
+    scenario.deleting = True
+    db.add(scenario)
+    db.commit()
+    bump_scenario(scenario.id)
+    return jobs.submit(db, "delete_scenario", scenario.id, user_id)
 
-    # 2) borrar pesos de indicadores
-    db.query(IndicatorWeight).filter(
-        IndicatorWeight.scenario_id == scenario.id
-    ).delete(synchronize_session=False)
 
-    # 3) borrar pesos de categorías
-    db.query(CategoryWeight).filter(
-        CategoryWeight.scenario_id == scenario.id
-    ).delete(synchronize_session=False)
+@jobs.handler("delete_scenario")
+def purge_scenario(db: Session, scenario_id: int, progress: jobs.Progress) -> None:
+    """Job: borra por lotes cortos los datos del escenario y luego el escenario."""
+    if db.get(Scenario, scenario_id) is None:
+        return  # ya lo borró otra ejecución
 
-    # 4) borrar escenario
-    db.delete(scenario)
+    children = (IndicatorValue, IndicatorWeight, CategoryWeight)
+    progress.set_total(sum(
+        db.scalar(select(func.count()).select_from(m).where(m.scenario_id == scenario_id)) or 0
+        for m in children
+    ))
+    for model in children:
+        jobs.delete_in_batches(db, model, model.scenario_id == scenario_id, progress=progress)
+
+    # rezagados (escrituras que entraron durante el borrado) + el escenario,
+    # en una sola transacción
+    for model in children:
+        db.execute(sql_delete(model).where(model.scenario_id == scenario_id))
+    db.execute(sql_delete(Scenario).where(Scenario.id == scenario_id))
     db.commit()
+    bump_scenario(scenario_id)
 
 
+@traced
 def remove_category_from_scenario(
     db: Session, scenario_id: int, category_id: int
 ) -> None:
@@ -116,6 +229,9 @@ def remove_category_from_scenario(
     - IndicatorValues de ese escenario + indicadores del entorno
     - IndicatorWeights de esos indicadores en ese escenario
     - CategoryWeight de ese entorno en ese escenario
+
+    Un escenario hijo además guarda un tombstone (CategoryWeight excluded):
+    sin él seguiría viendo el entorno, sus pesos y sus valores del padre.
     """
     # IDs de los indicadores de ese entorno
     indicator_ids = [
@@ -144,12 +260,25 @@ def remove_category_from_scenario(
         CategoryWeight.category_id == category_id,
     ).delete(synchronize_session=False)
 
+    sc = db.get(Scenario, scenario_id)
+    if sc is not None and sc.parent_id is not None:
+        db.add(CategoryWeight(scenario_id=scenario_id, category_id=category_id, weight=0, excluded=True))
+
     db.commit()
+    bump_scenario(scenario_id)
 
+@traced
 def set_active_exclusive(db: Session, scenario_id: int) -> None:
-    db.query(Scenario).update({Scenario.active: False})
-    target = db.get(Scenario, scenario_id)
-    if target:
-        target.active = True
-        db.add(target)
+    """
+    Swap del escenario activo en una sola transacción: los lectores ven el
+    anterior o el nuevo, nunca ninguno. No invalida caches: los datos no
+    cambian, las públicas se resuelven por id y el bundle lleva `active`
+    en la clave (así sobrevive lo precalentado por services/activation.py).
+    """
+    db.execute(
+        sql_update(Scenario)
+        .where(Scenario.active.is_(True), Scenario.id != scenario_id)
+        .values(active=False)
+    )
+    db.execute(sql_update(Scenario).where(Scenario.id == scenario_id).values(active=True))
     db.commit()
\ No newline at end of file
@@ -1,29 +1,96 @@
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.models.scenario import Scenario
 from app.models.weights import CategoryWeight, IndicatorWeight
 from app.schemas.weights import CategoryWeightsPayload, IndicatorWeightsPayload
+from app.core.cache import bump_scenario
+from app.core.tracing import traced
+from app.repositories import scenario_repo
 
+@traced
 def upsert_category_weights(db: Session, payload: CategoryWeightsPayload):
     # borra existentes y re-inserta lo recibido (estrategia simple, atómica si está en transacción)
     db.query(CategoryWeight).filter(CategoryWeight.scenario_id == payload.scenario_id).delete()
-    for it in payload.items:
-        db.add(CategoryWeight(scenario_id=payload.scenario_id, category_id=it.category_id, weight=it.weight))
+    for category_id, weight, excluded in _own_rows(
+        db, CategoryWeight, "category_id", payload.scenario_id,
+        {it.category_id: it.weight for it in payload.items},
+    ):
+        db.add(CategoryWeight(scenario_id=payload.scenario_id, category_id=category_id,
+                              weight=weight, excluded=excluded))
     db.commit()
+    bump_scenario(payload.scenario_id)
 
+@traced
 def upsert_indicator_weights(db: Session, payload: IndicatorWeightsPayload):
     db.query(IndicatorWeight).filter(IndicatorWeight.scenario_id == payload.scenario_id).delete()
-    for it in payload.items:
-        db.add(IndicatorWeight(scenario_id=payload.scenario_id, indicator_id=it.indicator_id, weight=it.weight))
+    for indicator_id, weight, excluded in _own_rows(
+        db, IndicatorWeight, "indicator_id", payload.scenario_id,
+        {it.indicator_id: it.weight for it in payload.items},
+    ):
+        db.add(IndicatorWeight(scenario_id=payload.scenario_id, indicator_id=indicator_id,
+                               weight=weight, excluded=excluded))
     db.commit()
+    bump_scenario(payload.scenario_id)
 
+def _own_rows(db: Session, model, key_col, scenario_id: int, weights: dict) -> list[tuple]:
+    """
+    Filas (clave, peso, excluded) que guarda el escenario para que sus pesos
+    efectivos sean `weights` (el editor manda siempre el set completo).
+    Un hijo guarda solo lo que difiere de lo heredado, más un tombstone por
+    cada peso heredado que ya no está.
+    """
+    sc = db.get(Scenario, scenario_id)
+    if sc is None or sc.parent_id is None:
+        return [(key, w, False) for key, w in weights.items()]
+    inherited = {
+        getattr(r, key_col): float(r.weight)
+        for r in _effective(db, model, key_col, sc.parent_id)
+    }
+    rows = [
+        (key, w, False) for key, w in weights.items()
+        # misma precisión que la columna (Numeric(6, 4))
+        if key not in inherited or round(w, 4) != round(inherited[key], 4)
+    ]
+    rows += [(key, 0, True) for key in inherited.keys() - weights.keys()]
+    return rows
+
+def _effective(db: Session, model, key_col, scenario_id: int) -> list:
+    """Filas propias + heredadas (por clave gana el escenario más cercano), sin tombstones."""
+    sc = db.get(Scenario, scenario_id)
+    if sc is None or sc.parent_id is None:
+        return db.scalars(select(model).where(model.scenario_id == scenario_id, model.excluded.is_(False))).all()
+    chain = scenario_repo.lineage(db, sc)
+    rows = db.scalars(select(model).where(model.scenario_id.in_(chain))).all()
+    merged = scenario_repo.overlay(chain, ((r.scenario_id, getattr(r, key_col), r) for r in rows))
+    return [r for r in merged.values() if not r.excluded]
+
+@traced
+def excluded_categories(db: Session, chain: list[int]) -> set[int]:
+    """
+    Entornos que el escenario quitó de lo heredado: el tombstone es la fila
+    más cercana de la cadena para esa categoría. Sin padre, siempre vacío.
+    """
+    if len(chain) == 1:
+        return set()
+    rows = db.execute(
+        select(CategoryWeight.scenario_id, CategoryWeight.category_id, CategoryWeight.excluded)
+        .where(CategoryWeight.scenario_id.in_(chain))
+    )
+    return {cat_id for cat_id, excluded in scenario_repo.overlay(chain, rows).items() if excluded}
+
+@traced
 def get_category_weights(db: Session, scenario_id: int):
-    return db.scalars(select(CategoryWeight).where(CategoryWeight.scenario_id == scenario_id)).all()
+    """Pesos efectivos: los de un escenario hijo incluyen los heredados."""
+    return _effective(db, CategoryWeight, "category_id", scenario_id)
 
+@traced
 def get_indicator_weights(db: Session, scenario_id: int):
-    return db.scalars(select(IndicatorWeight).where(IndicatorWeight.scenario_id == scenario_id)).all()
+    return _effective(db, IndicatorWeight, "indicator_id", scenario_id)
 
+@traced
 def sum_category_weights(db: Session, scenario_id: int) -> float:
-    return float(db.scalar(select(func.coalesce(func.sum(CategoryWeight.weight), 0)).where(CategoryWeight.scenario_id == scenario_id)) or 0.0)
+    return float(sum(r.weight for r in get_category_weights(db, scenario_id)))
 
+@traced
 def sum_indicator_weights(db: Session, scenario_id: int) -> float:
-    return float(db.scalar(select(func.coalesce(func.sum(IndicatorWeight.weight), 0)).where(IndicatorWeight.scenario_id == scenario_id)) or 0.0)
+    return float(sum(r.weight for r in get_indicator_weights(db, scenario_id)))
@@ -0,0 +1,97 @@
+# app/routes/admin.py
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, PlainTextResponse
+from sqlalchemy.orm import Session
+from starlette.types import Scope
+
+from app.core import profiling, slow_queries
+from app.config import settings
+from app.db import SessionLocal, get_db
+from .auth import get_current_user, get_token_from_request, require_admin
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+def profile_allowed(scope: Scope) -> bool:
+    """
+    ¿Puede esta request pedir X-Profile? Mismas reglas que require_admin
+    (token en Authorization o cookie). Lo usa ProfilingMiddleware.
+    """
+    request = Request(scope)
+    db = SessionLocal()
+    try:
+        token = get_token_from_request(request, request.cookies.get("token"))
+        require_admin(get_current_user(token, db))
+        return True
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+def require_metrics_access(
+    token: str = Depends(get_token_from_request),
+    db: Session = Depends(get_db),
+) -> None:
+    """
+    Guarda de /metrics: el token compartido del scraper (METRICS_TOKEN,
+    como `Authorization: Bearer ...`) o un usuario ADMIN.
+    """
+    if settings.METRICS_TOKEN and hmac.compare_digest(token, settings.METRICS_TOKEN):
+        return
+    require_admin(get_current_user(token, db))
+
+
+# =====================
+#   PERFILES (X-Profile: 1)
+# =====================
+@router.get("/profiles")
+def list_profiles():
+    """Perfiles guardados, del más nuevo al más viejo."""
+    return {"items": profiling.store.list()}
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str):
+    """Archivo .pstats (snakeviz, gprof2dot, python -m pstats...)."""
+    path = profiling.store.path(profile_id)
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+
+@router.get("/profiles/{profile_id}/summary", response_class=PlainTextResponse)
+def profile_summary(
+    profile_id: str,
+    top: int = Query(40, ge=1, le=500),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls|ncalls)$"),
+):
+    """Top de funciones en texto, para mirarlo sin bajar el archivo."""
+    text = profiling.store.summary(profile_id, top=top, sort=sort)
+    if text is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    return PlainTextResponse(text)
+
+
+# =====================
+#   QUERIES LENTAS
+# =====================
+@router.get("/slow-queries")
+def list_slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    sort: str = Query("total", pattern="^(total|max|count)$"),
+):
+    """Sentencias más costosas desde el arranque (o el último reset), por proceso."""
+    return {
+        "threshold_ms": settings.SLOW_QUERY_SECONDS * 1000,
+        "enabled": slow_queries.enabled(),
+        "evicted": slow_queries.log.evicted,
+        "items": slow_queries.log.top(limit, sort),
+    }
+
+
+@router.delete("/slow-queries", status_code=204)
+def reset_slow_queries():
+    slow_queries.log.reset()
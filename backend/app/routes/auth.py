@@ -8,6 +8,7 @@ from fastapi import (
     Request,
     Cookie
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from typing import Optional
@@ -16,7 +17,10 @@ from app.config import settings
 from app.db import get_db
 from app.models.user import User as UserModel
 from app.schemas.user import UserOut
-from app.core.security import verify_password, create_access_token, decode_token
+from app.core.security import create_access_token
+from app.core import password_pool
+from app.core import auth_cache
+from app.core.auth_cache import CurrentUser
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -48,15 +52,17 @@ def get_token_from_request(
 def get_current_user(
     token: str = Depends(get_token_from_request),
     db: Session = Depends(get_db),
-) -> UserModel:
-    sub = decode_token(token)
-    if not sub:
+) -> CurrentUser:
+    # token y usuario salen de una cache corta (ver app/core/auth_cache.py):
+    # las rutas de users la invalidan al cambiar rol / contraseña / borrar
+    sub = auth_cache.token_subject(token)
+    if sub is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido o expirado",
         )
 
-    user = db.get(UserModel, int(sub))
+    user = auth_cache.get_user(db, sub)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,7 +73,7 @@ def get_current_user(
 # -----------------------------
 # 3) GUARDAS DE ROL
 # -----------------------------
-def require_admin(current: UserModel = Depends(get_current_user)) -> UserModel:
+def require_admin(current: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     if current.role != "ADMIN":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -77,8 +83,8 @@ def require_admin(current: UserModel = Depends(get_current_user)) -> UserModel:
 
 
 def require_admin_or_analyst(
-    current: UserModel = Depends(get_current_user),
-) -> UserModel:
+    current: CurrentUser = Depends(get_current_user),
+) -> CurrentUser:
     if current.role not in ("ADMIN", "ANALISTA"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -89,8 +95,8 @@ def require_admin_or_analyst(
 
 def require_self_or_admin(
     user_id: int,
-    current: UserModel = Depends(get_current_user),
-) -> UserModel:
+    current: CurrentUser = Depends(get_current_user),
+) -> CurrentUser:
     if current.role == "ADMIN":
         return current
     if current.id != user_id:
@@ -103,17 +109,33 @@ def require_self_or_admin(
 # -----------------------------
 # 4) LOGIN
 # -----------------------------
+def _find_user_by_email(db: Session, email: str) -> UserModel | None:
+    return db.query(UserModel).filter(UserModel.email == email).first()
+
+
 @router.post("/login")
-def login(
+async def login(
     form: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
     response: Response = None,
 ):
+    # async: bcrypt va al pool de procesos (app/core/password_pool.py) y la
+    # consulta al threadpool, así un pico de logins no ocupa los hilos
     email = form.username.lower().strip()
     password = form.password
 
-    user = db.query(UserModel).filter(UserModel.email == email).first()
-    if not user or not verify_password(password, user.password_hash):
+    user = await run_in_threadpool(_find_user_by_email, db, email)
+    try:
+        valid = user is not None and await password_pool.verify_password(
+            password, user.password_hash
+        )
+    except password_pool.PasswordPoolBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales inválidas",
@@ -172,5 +194,5 @@ def logout(response: Response):
 # 6) QUIÉN SOY
 # -----------------------------
 @router.get("/me", response_model=UserOut)
-def me(current: UserModel = Depends(get_current_user)):
+def me(current: CurrentUser = Depends(get_current_user)):
     return current
@@ -1,18 +1,22 @@
 # app/api/categories.py
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
+from app.core.responses import not_modified
 from app.db import get_db
+from app.db_async import get_async_db
 from app.schemas.category import (
     CategoryCreate,
     CategoryUpdate,
     CategoryOut,
     PaginatedCategories,
 )
+from app.schemas.job import JobOut
 from app.repositories import category_repo as repo
 from app.models.weights import CategoryWeight
 from app.models.scenario import Scenario
+from app.services import catalog_registry
 from .auth import get_current_user
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
@@ -29,6 +33,7 @@ def category_in_active_scenario(db: Session, category_id: int) -> bool:
         .filter(
             Scenario.active.is_(True),
             CategoryWeight.category_id == category_id,
+            CategoryWeight.excluded.is_(False),
         )
         .scalar()
         or 0
@@ -64,18 +69,25 @@ def ensure_can_modify_category(db: Session, category_id: int, current) -> None:
 
 
 @router.get("", response_model=PaginatedCategories)
-def list_categories(
+async def list_categories(
+    request: Request,
+    response: Response,
     q: str | None = Query(default=None, description="Buscar por nombre"),
     page: int = Query(default=1, ge=1),
     limit: int = Query(default=20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
 ):
-    return repo.list_categories(db, q=q, page=page, limit=limit)
+    # ETag = versión del catálogo → If-None-Match devuelve 304 sin cuerpo
+    catalog = await db.run_sync(catalog_registry.get_catalog)
+    cached = not_modified(request, response, catalog.etag)
+    if cached:
+        return cached
+    return await db.run_sync(repo.list_categories, q=q, page=page, limit=limit)
 
 
 @router.get("/{slug}", response_model=CategoryOut)
-def get_category(slug: str, db: Session = Depends(get_db)):
-    cat = repo.get_by_slug(db, slug)
+async def get_category(slug: str, db=Depends(get_async_db)):
+    cat = await db.run_sync(repo.find_by_slug, slug)
     if not cat:
         raise HTTPException(status_code=404, detail="Categoría no encontrada")
     return cat
@@ -128,13 +140,18 @@ def update_category(
 
 @router.delete(
     "/{slug}",
-    status_code=status.HTTP_204_NO_CONTENT,
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobOut,
 )
 def delete_category(
     slug: str,
     db: Session = Depends(get_db),
     current=Depends(get_current_user),
 ):
+    """
+    Marca el entorno como en borrado y encola el borrado en cascada
+    (por lotes, en segundo plano). El progreso: GET /jobs/{id}.
+    """
     cat = repo.get_by_slug(db, slug)
     if not cat:
         raise HTTPException(status_code=404, detail="Categoría no encontrada")
@@ -144,8 +161,7 @@ def delete_category(
 
     try:
         # aquí se usa tu lógica existente con CategoryWeight, Indicator, etc.
-        repo.delete_category(db, cat)
+        return repo.delete_category(db, cat, user_id=current.id)
     except ValueError as e:
         # relaciones que impiden borrar
         raise HTTPException(status_code=409, detail=str(e))
-    return None
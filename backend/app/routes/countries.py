@@ -1,33 +1,43 @@
 # app/routes/countries.py
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from ..db import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from ..core.responses import not_modified
+from ..db_async import get_async_db
 from ..schemas.country import CountryOut, PaginatedCountries
 from ..repositories import country_repo as repo
+from ..services import catalog_registry
 
 router = APIRouter(prefix="/countries", tags=["Countries"])
 
 @router.get("", response_model=PaginatedCountries)
-def list_countries(
+async def list_countries(
+    request: Request,
+    response: Response,
     q: str | None = Query(default=None, description="Buscar por nombre/ISO"),
     page: int = Query(default=1, ge=1),
     limit: int = Query(default=20, ge=0, le=500),
     only_enabled: bool = Query(default=True),
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
 ):
-    return repo.list_countries(db, q=q, page=page, limit=limit, only_enabled=only_enabled)
+    # ETag = versión del catálogo → If-None-Match devuelve 304 sin cuerpo
+    catalog = await db.run_sync(catalog_registry.get_catalog)
+    cached = not_modified(request, response, catalog.etag)
+    if cached:
+        return cached
+    return await db.run_sync(
+        repo.list_countries, q=q, page=page, limit=limit, only_enabled=only_enabled
+    )
 
 @router.get("/{code_or_id}", response_model=CountryOut)
-def get_country(code_or_id: str, db: Session = Depends(get_db)):
+async def get_country(code_or_id: str, db=Depends(get_async_db)):
     """
     Permite obtener por id (numérico) o por ISO (2 o 3 letras).
     Ejemplos: /countries/cr  /countries/cri  /countries/170
     """
     country = None
     if code_or_id.isdigit():
-        country = repo.get_by_id(db, int(code_or_id))
+        country = await db.run_sync(repo.get_by_id, int(code_or_id))
     else:
-        country = repo.get_by_iso(db, code_or_id)
+        country = await db.run_sync(repo.get_by_iso, code_or_id)
 
     if not country:
         raise HTTPException(status_code=404, detail="País no encontrado")
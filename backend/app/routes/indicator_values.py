@@ -1,3 +1,5 @@
+import time
+
 from fastapi import (
     APIRouter,
     Depends,
@@ -15,23 +17,31 @@ from app.schemas.indicator_value import (
     IndicatorValueUpdate,
     IndicatorValueOut,
     PaginatedIndicatorValues,
+    IndicatorValueBulkPayload,
+    IndicatorValueBulkOut,
 )
 from app.repositories import indicator_value_repo as repo
 from .auth import require_admin, get_current_user, require_admin_or_analyst
+from app.core import metrics, tracing
 from app.core.normalization import NormalizationError
-
-# 👇 Ajusta estas rutas si tus modelos están en otro lado
-from app.models.country import Country
-from app.models.indicator import Indicator
+from app.core.text import normalize_text
+from app.services import catalog_registry
+from app.services.catalog_registry import CountryEntry, IndicatorEntry
 
 # --------- extras para el Excel ----------
-from openpyxl import load_workbook
+# openpyxl (~100 ms de import) se carga en el primer import de Excel
 from io import BytesIO
-import unicodedata
-import re
 
 router = APIRouter(prefix="/indicator-values", tags=["IndicatorValues"])
 
+# límite alto para clientes automáticos que recorren todo con cursor
+MAX_PAGE_SIZE = 5000
+
+_import_seconds = metrics.histogram(
+    "excel_import_seconds", "Duración de la importación de Excel", labelnames=("outcome",)
+)
+_import_cells = metrics.counter("excel_import_cells_total", "Celdas importadas desde Excel")
+
 
 # ================== ENDPOINTS EXISTENTES ==================
 
@@ -41,10 +51,26 @@ def list_indicator_values(
     country_id: int | None = Query(None),
     indicator_id: int | None = Query(None),
     page: int = Query(1, ge=1),
-    limit: int = Query(20, ge=1, le=200),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="Cursor keyset (next_cursor de la página anterior)"),
+    sort: str = Query("id", pattern="^(id|cell)$", description="id (DESC) o cell (escenario, país, indicador)"),
+    include_total: bool = Query(True, description="Si es false no se calcula total / total_pages"),
     db: Session = Depends(get_db),
 ):
-    return repo.list_values(db, scenario_id, country_id, indicator_id, page, limit)
+    try:
+        return repo.list_values(
+            db,
+            scenario_id,
+            country_id,
+            indicator_id,
+            page,
+            limit,
+            cursor=cursor,
+            sort=sort,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post(
@@ -100,22 +126,31 @@ def delete_indicator_value(value_id: int, db: Session = Depends(get_db)):
     return None
 
 
-# ================== HELPERS PARA EXCEL ==================
+# ================== GUARDADO MASIVO ==================
 
-def normalize_text(s: str) -> str:
+@router.post(
+    "/bulk",
+    response_model=IndicatorValueBulkOut,
+    dependencies=[Depends(require_admin_or_analyst)],
+)
+def bulk_indicator_values(
+    payload: IndicatorValueBulkPayload,
+    db: Session = Depends(get_db),
+    current=Depends(get_current_user),
+):
     """
-    Quita tildes, pasa a minúsculas y compacta espacios.
-    Sirve para comparar 'Alemania', 'ALEMANIA', 'alemánia' como lo mismo.
+    Aplica varias operaciones (upsert / update / delete) de un escenario
+    en una sola request y un solo commit. Devuelve el resultado por ítem.
     """
-    if not s:
-        return ""
-    s = s.strip()
-    s = unicodedata.normalize("NFD", s)
-    s = "".join(ch for ch in s if unicodedata.category(ch) != "Mn")
-    s = s.lower()
-    s = re.sub(r"\s+", " ", s)
-    return s
+    try:
+        return repo.bulk_apply(
+            db, payload, user_id=current.id if current else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 
+# ================== HELPERS PARA EXCEL ==================
 
 def is_number(value) -> bool:
     return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -125,51 +160,27 @@ def is_text(value) -> bool:
     return isinstance(value, str) and value.strip() != ""
 
 
-def build_country_map(db: Session):
+@tracing.traced
+def build_country_map(db: Session) -> tuple[dict[str, CountryEntry], set[str]]:
     """
-    Construye un dict para buscar países por:
-    - iso2
-    - iso3
-    - name_es
-    - name_en
-    Usando normalize_text.
+    Dict para buscar países por iso2 / iso3 / name_es / name_en
+    (normalizados con normalize_text). Sale del registro del catálogo:
+    ya está armado, no se consulta la BD en cada importación.
     """
-    countries = db.query(Country).all()
-    country_map: dict[str, Country] = {}
-    ambiguous: set[str] = set()
-
-    for c in countries:
-        keys = [c.iso2, c.iso3, c.name_es, c.name_en]
-        for key in keys:
-            if not key:
-                continue
-            norm = normalize_text(str(key))
-            if norm in country_map and country_map[norm].id != c.id:
-                ambiguous.add(norm)
-            else:
-                country_map[norm] = c
-
-    return country_map, ambiguous
+    cat = catalog_registry.get_catalog(db)
+    return cat.country_by_name, cat.country_ambiguous
 
 
-def build_indicator_map(db: Session):
+@tracing.traced
+def build_indicator_map(db: Session) -> tuple[dict[str, IndicatorEntry], set[str]]:
     """
-    Construye un dict para buscar indicadores por nombre (indicator.name).
+    Dict para buscar indicadores por nombre normalizado (registro del catálogo).
     """
-    indicators = db.query(Indicator).all()
-    indicator_map: dict[str, Indicator] = {}
-    ambiguous: set[str] = set()
-
-    for ind in indicators:
-        norm = normalize_text(ind.name)
-        if norm in indicator_map and indicator_map[norm].id != ind.id:
-            ambiguous.add(norm)
-        else:
-            indicator_map[norm] = ind
-
-    return indicator_map, ambiguous
+    cat = catalog_registry.get_catalog(db)
+    return cat.indicator_by_name, cat.indicator_ambiguous
 
 
+@tracing.traced
 def detect_headers(ws):
     """
     Detecta automáticamente:
@@ -236,8 +247,24 @@ async def import_indicator_values_matrix_excel(
     - Ignora mayúsculas, tildes y espacios extras al comparar nombres.
     - Usa el repo.upsert_value para que la normalización funcione igual
       que cuando se hace manual.
+    - En un escenario hijo no guarda las celdas iguales al valor heredado
+      ("inherited" en la respuesta).
     """
-
+    t0 = time.perf_counter()
+    outcome = "error"
+    try:
+        with tracing.span("excel_import", scenario_id=scenario_id) as sp:
+            result = await _import_matrix_excel(scenario_id, file, db, current)
+            sp.set("processed", result["processed"])
+            sp.set("errors", len(result["errors"]))
+        outcome = "ok"
+        _import_cells.inc(result["processed"])
+        return result
+    finally:
+        _import_seconds.observe(time.perf_counter() - t0, outcome=outcome)
+
+
+async def _import_matrix_excel(scenario_id: int, file: UploadFile, db: Session, current) -> dict:
     # 1) Validar extensión
     if not file.filename.lower().endswith((".xlsx", ".xlsm", ".xls")):
         raise HTTPException(
@@ -247,10 +274,13 @@ async def import_indicator_values_matrix_excel(
 
     # 2) Leer archivo
     contents = await file.read()
-    try:
-        wb = load_workbook(BytesIO(contents), data_only=True)
-    except Exception:
-        raise HTTPException(status_code=400, detail="No se pudo leer el archivo Excel.")
+    with tracing.span("excel_import.load_workbook", bytes=len(contents)):
+        from openpyxl import load_workbook
+
+        try:
+            wb = load_workbook(BytesIO(contents), data_only=True)
+        except Exception:
+            raise HTTPException(status_code=400, detail="No se pudo leer el archivo Excel.")
 
     ws = wb.active
 
@@ -338,50 +368,64 @@ async def import_indicator_values_matrix_excel(
 
     # 8) Recorrer matriz y hacer upsert a través del repo
     processed = 0
-
-    for r, country_id in row_country_id.items():
-        for c, indicator_id in col_indicator_id.items():
-            cell = ws.cell(row=r, column=c)
-            cell_value = cell.value
-            coord = cell.coordinate
-
-            if cell_value is None or cell_value == "":
-                continue
-
-            if not is_number(cell_value):
-                errors.append(
-                    f"Celda {coord}: valor '{cell_value}' no es numérico, se ignora."
+    unchanged = 0
+    errors_before = len(errors)
+    # escenario hijo: las celdas iguales a lo heredado no se guardan (solo el delta)
+    inherited = repo.inherited_raw_values(db, scenario_id)
+
+    with tracing.span("excel_import.upsert_cells") as sp:
+        for r, country_id in row_country_id.items():
+            for c, indicator_id in col_indicator_id.items():
+                cell = ws.cell(row=r, column=c)
+                cell_value = cell.value
+                coord = cell.coordinate
+
+                if cell_value is None or cell_value == "":
+                    continue
+
+                if not is_number(cell_value):
+                    errors.append(
+                        f"Celda {coord}: valor '{cell_value}' no es numérico, se ignora."
+                    )
+                    continue
+
+                raw_value = float(cell_value)
+                cell_key = (country_id, indicator_id)
+                if cell_key in inherited and inherited[cell_key] == raw_value:
+                    unchanged += 1
+                    continue
+
+                payload = IndicatorValueCreate(
+                    scenario_id=scenario_id,
+                    country_id=country_id,
+                    indicator_id=indicator_id,
+                    raw_value=raw_value,
                 )
-                continue
-
-            raw_value = float(cell_value)
 
-            payload = IndicatorValueCreate(
-                scenario_id=scenario_id,
-                country_id=country_id,
-                indicator_id=indicator_id,
-                raw_value=raw_value,
-            )
-
-            try:
-                # usamos tu repo para mantener toda la lógica de normalización igual
-                repo.upsert_value(
-                    db,
-                    payload,
-                    user_id=current.id if current else None,
-                )
-                processed += 1
-            except NormalizationError as e:
-                errors.append(
-                    f"Celda {coord}: error de normalización: {str(e)}"
-                )
-            except ValueError as e:
-                # por ejemplo si el escenario no existe, etc.
-                errors.append(
-                    f"Celda {coord}: error de datos: {str(e)}"
-                )
+                try:
+                    # usamos tu repo para mantener toda la lógica de normalización igual
+                    repo.upsert_value(
+                        db,
+                        payload,
+                        user_id=current.id if current else None,
+                    )
+                    processed += 1
+                except NormalizationError as e:
+                    errors.append(
+                        f"Celda {coord}: error de normalización: {str(e)}"
+                    )
+                except ValueError as e:
+                    # por ejemplo si el escenario no existe, etc.
+                    errors.append(
+                        f"Celda {coord}: error de datos: {str(e)}"
+                    )
+
+        sp.set("processed", processed)
+        sp.set("inherited", unchanged)
+        sp.set("errors", len(errors) - errors_before)
 
     return {
         "processed": processed,
+        "inherited": unchanged,
         "errors": errors,
     }
@@ -1,9 +1,11 @@
 # app/api/indicators.py
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
+from app.core.responses import not_modified
 from app.db import get_db
+from app.db_async import get_async_db
 from app.schemas.indicator import (
     IndicatorCreate,
     IndicatorUpdate,
@@ -14,6 +16,7 @@ from app.repositories import indicator_repo as repo
 from app.models.indicator import Indicator
 from app.models.weights import CategoryWeight
 from app.models.scenario import Scenario
+from app.services import catalog_registry
 from .auth import get_current_user
 
 router = APIRouter(prefix="/indicators", tags=["Indicators"])
@@ -29,6 +32,7 @@ def category_in_active_scenario(db: Session, category_id: int) -> bool:
         .filter(
             Scenario.active.is_(True),
             CategoryWeight.category_id == category_id,
+            CategoryWeight.excluded.is_(False),
         )
         .scalar()
         or 0
@@ -64,21 +68,28 @@ def ensure_can_modify_indicator(db: Session, indicator: Indicator, current) -> N
 
 
 @router.get("", response_model=PaginatedIndicators)
-def list_indicators(
+async def list_indicators(
+    request: Request,
+    response: Response,
     q: str | None = Query(None, description="Buscar por nombre"),
     category_id: int | None = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
 ):
-    return repo.list_indicators(
-        db, q=q, category_id=category_id, page=page, limit=limit
+    # ETag = versión del catálogo → If-None-Match devuelve 304 sin cuerpo
+    catalog = await db.run_sync(catalog_registry.get_catalog)
+    cached = not_modified(request, response, catalog.etag)
+    if cached:
+        return cached
+    return await db.run_sync(
+        repo.list_indicators, q=q, category_id=category_id, page=page, limit=limit
     )
 
 
 @router.get("/{slug}", response_model=IndicatorOut)
-def get_indicator(slug: str, db: Session = Depends(get_db)):
-    ind = repo.get_by_slug(db, slug)
+async def get_indicator(slug: str, db=Depends(get_async_db)):
+    ind = await db.run_sync(repo.find_by_slug, slug)
     if not ind:
         raise HTTPException(status_code=404, detail="Indicador no encontrado")
     return ind
@@ -0,0 +1,19 @@
+# app/routes/jobs.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.models.job import Job
+from app.schemas.job import JobOut
+from .auth import require_admin_or_analyst
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"], dependencies=[Depends(require_admin_or_analyst)])
+
+
+@router.get("/{job_id}", response_model=JobOut)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Estado y progreso de un trabajo en segundo plano (p.ej. un borrado en cascada)."""
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return job
@@ -1,49 +1,110 @@
 # app/routes/public.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, Callable
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from app.db import get_db
-from app.services import analytics
+from app.core.cache import TTLCache, scenario_version
+from app.core.responses import CachedPayload, cached_payload, payload_response
+from app.db_async import get_async_db
+from app.services import analytics, public_bundle
 
 router = APIRouter(prefix="/public", tags=["Public"])
 
+# resultados ya serializados (+ comprimidos) por (consulta, escenario, versión)
+_results = TTLCache("public_results", ttl_seconds=600, maxsize=512)
+
+
+async def _cached_result(
+    request: Request,
+    db,
+    scenario_id: int | None,
+    key: tuple,
+    build: Callable[[Session, int], Any],
+):
+    """Resuelve el escenario, y sirve el resultado desde cache (ETag + gzip/br)."""
+
+    def _load(s: Session) -> CachedPayload:
+        sc = analytics.resolve_scenario(s, scenario_id)
+        return cached_payload(
+            _results, key + (sc.id, scenario_version(sc.id)), lambda: build(s, sc.id)
+        )
+
+    try:
+        # async: con ASYNC_DB_ENABLED no ocupa un hilo mientras espera a la BD
+        payload = await db.run_sync(_load)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return payload_response(request, payload)
+
+
 @router.get("/index/category")
-def get_category_index(
+async def get_category_index(
+    request: Request,
     country_id: int = Query(...),
     category_id: int = Query(...),
     scenario_id: int | None = Query(None, description="Si no se envía, usa el escenario activo"),
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
 ):
-    try:
-        return analytics.category_index(db, country_id, category_id, scenario_id=scenario_id)
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+    return await _cached_result(
+        request, db, scenario_id, ("index_category", country_id, category_id),
+        lambda s, sid: analytics.category_index(s, country_id, category_id, scenario_id=sid),
+    )
 
 @router.get("/index/global")
-def get_global_index(
+async def get_global_index(
+    request: Request,
     country_id: int = Query(...),
     scenario_id: int | None = Query(None, description="Si no se envía, usa el escenario activo"),
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
 ):
-    try:
-        return analytics.global_index(db, country_id, scenario_id=scenario_id)
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+    return await _cached_result(
+        request, db, scenario_id, ("index_global", country_id),
+        lambda s, sid: analytics.global_index(s, country_id, scenario_id=sid),
+    )
 
 @router.get("/ranking/global")
-def get_global_ranking(
+async def get_global_ranking(
+    request: Request,
     limit: int = Query(10, ge=1, le=200),
     order: str = Query("desc", pattern="^(asc|desc)$"),
     scenario_id: int | None = Query(None, description="Si no se envía, usa el escenario activo"),
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
 ):
-    return analytics.ranking_global(db, limit=limit, order=order, scenario_id=scenario_id)
+    return await _cached_result(
+        request, db, scenario_id, ("ranking_global", limit, order),
+        lambda s, sid: analytics.ranking_global(s, limit=limit, order=order, scenario_id=sid),
+    )
 
 @router.get("/ranking/category")
-def get_category_ranking(
+async def get_category_ranking(
+    request: Request,
     category_id: int = Query(...),
     limit: int = Query(10, ge=1, le=200),
     order: str = Query("desc", pattern="^(asc|desc)$"),
     scenario_id: int | None = Query(None, description="Si no se envía, usa el escenario activo"),
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
 ):
-    return analytics.ranking_by_category(db, category_id=category_id, limit=limit, order=order, scenario_id=scenario_id)
+    return await _cached_result(
+        request, db, scenario_id, ("ranking_category", category_id, limit, order),
+        lambda s, sid: analytics.ranking_by_category(
+            s, category_id=category_id, limit=limit, order=order, scenario_id=sid
+        ),
+    )
+
+@router.get("/bundle")
+async def get_public_bundle(
+    request: Request,
+    scenario_id: int | None = Query(None, description="Si no se envía, usa el escenario activo"),
+    db=Depends(get_async_db),
+):
+    """
+    Todo lo que necesita la página de resultados públicos en una respuesta:
+    escenario, pesos, categorías, países, indicadores por categoría, matriz
+    de valores, descripciones y rankings precalculados.
+    Se sirve desde cache con ETag (If-None-Match → 304), ya comprimido
+    (br / gzip) según Accept-Encoding.
+    """
+    try:
+        payload = await db.run_sync(public_bundle.get_bundle, scenario_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return payload_response(request, payload)
@@ -3,7 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.db import get_db        # ✅ igual que en main.py
+from app.db import get_db, get_read_db        # ✅ igual que en main.py
 from app.models.public_description import PublicDescription
 from app.schemas.public_description import (
     PublicDescriptionRead,
@@ -11,6 +11,7 @@ from app.schemas.public_description import (
     PublicDescriptionUpdate,
     PublicDescriptionKey,
 )
+from app.services import public_bundle
 from .auth import require_admin
 
 
@@ -21,7 +22,7 @@ router = APIRouter(prefix="/public-descriptions", tags=["Public Descriptions"])
 #   LISTAR TODAS
 # =====================
 @router.get("", response_model=list[PublicDescriptionRead])
-def list_public_descriptions(db: Session = Depends(get_db)):
+def list_public_descriptions(db: Session = Depends(get_read_db)):
     return db.query(PublicDescription).all()
 
 
@@ -29,7 +30,7 @@ def list_public_descriptions(db: Session = Depends(get_db)):
 #   OBTENER UNA POR KEY
 # =====================
 @router.get("/{key}", response_model=PublicDescriptionRead)
-def get_public_description(key: PublicDescriptionKey, db: Session = Depends(get_db)):
+def get_public_description(key: PublicDescriptionKey, db: Session = Depends(get_read_db)):
     obj = db.query(PublicDescription).filter(PublicDescription.key == key).first()
     if not obj:
         raise HTTPException(status_code=404, detail="Descripción no encontrada")
@@ -54,6 +55,7 @@ def upsert_public_description(
         obj.content = payload.content
 
     db.commit()
+    public_bundle.invalidate()
     db.refresh(obj)
     return obj
 
@@ -69,3 +71,4 @@ def delete_public_description(key: PublicDescriptionKey, db: Session = Depends(g
 
     db.delete(obj)
     db.commit()
+    public_bundle.invalidate()
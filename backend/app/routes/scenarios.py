@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from app.db import get_db
-from app.schemas.scenario import ScenarioCreate, ScenarioUpdate, ScenarioOut, PaginatedScenarios
+from app.core.cache import TTLCache, scenario_version
+from app.core.responses import cached_payload, payload_response
+from app.db import SessionLocal, get_db, get_read_db
+from app.schemas.scenario import (
+    ActivationStatus, ScenarioClone, ScenarioCreate, ScenarioUpdate, ScenarioOut, PaginatedScenarios,
+)
+from app.schemas.job import JobOut
 from app.repositories import scenario_repo as repo
+from app.repositories import indicator_value_repo
+from app.services import activation, public_bundle
 from .auth import get_current_user
 from app.models.scenario import Scenario
 
 router = APIRouter(prefix="/scenarios", tags=["Scenarios"])
 
+# matriz ya serializada (+ gzip/br) por (escenario, versión de datos)
+_matrix_payloads = TTLCache("scenario_matrix_payload", ttl_seconds=300, maxsize=32)
+
 
 # -------------------------------------------------
 # LISTAR
@@ -45,6 +55,32 @@ def get_scenario(scenario_id: int, db: Session = Depends(get_db)):
     return sc
 
 
+# -------------------------------------------------
+# MATRIZ PAÍS × INDICADOR (columnar)
+# -------------------------------------------------
+def _matrix_payload(db: Session, scenario_id: int):
+    return cached_payload(
+        _matrix_payloads,
+        (scenario_id, scenario_version(scenario_id)),
+        lambda: indicator_value_repo.get_matrix(db, scenario_id),
+    )
+
+
+@router.get("/{scenario_id}/matrix")
+def get_scenario_matrix(scenario_id: int, request: Request, db: Session = Depends(get_read_db)):
+    """
+    Todos los valores del escenario como arrays paralelos:
+    country_ids[], indicator_ids[] y values[] / raw_values[] row-major
+    (índice = fila * len(indicator_ids) + columna), con null donde no hay dato.
+    """
+    sc = repo.get_by_id(db, scenario_id)  # queda en la sesión: get_matrix no lo vuelve a leer
+    if not sc:
+        raise HTTPException(status_code=404, detail="Escenario no encontrado")
+    payload = _matrix_payload(db, scenario_id)
+    # no-cache: el navegador revalida siempre con If-None-Match (304 si no cambió)
+    return payload_response(request, payload, cache_control="no-cache")
+
+
 # -------------------------------------------------
 # CREAR ESCENARIO (ADMIN Y ANALISTA)
 # -------------------------------------------------
@@ -58,6 +94,14 @@ def create_scenario(
     if repo.get_by_name(db, payload.name):
         raise HTTPException(status_code=409, detail="Ya existe un escenario con ese nombre")
 
+    # escenario padre: el nuevo hereda sus valores y pesos
+    if payload.parent_id is not None:
+        parent = repo.get_by_id(db, payload.parent_id)
+        if not parent:
+            raise HTTPException(status_code=404, detail="Escenario padre no encontrado")
+        if len(repo.lineage(db, parent)) >= repo.MAX_DEPTH:
+            raise HTTPException(status_code=400, detail="Demasiados niveles de herencia")
+
     # ANALISTA solo puede crear escenarios inactivos
     if current.role == "ANALISTA":
         payload.active = False
@@ -65,6 +109,42 @@ def create_scenario(
     return repo.create(db, payload, user_id=current.id)
 
 
+# -------------------------------------------------
+# CLONAR ESCENARIO (ADMIN Y ANALISTA)
+# -------------------------------------------------
+def _warm_scenario(scenario_id: int) -> None:
+    """Tras responder: matriz y bundle público del escenario nuevo en cache."""
+    db = SessionLocal()
+    try:
+        _matrix_payload(db, scenario_id).encoded("gzip")
+        public_bundle.warm(db, scenario_id)
+    finally:
+        db.close()
+
+
+@router.post("/{scenario_id}/clone", response_model=ScenarioOut, status_code=status.HTTP_201_CREATED)
+def clone_scenario(
+    scenario_id: int,
+    payload: ScenarioClone,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current=Depends(get_current_user)
+):
+    """
+    Copia valores, pesos de indicadores y pesos de entornos en la BD
+    (INSERT ... SELECT). El escenario nuevo queda inactivo.
+    """
+    sc = repo.get_by_id(db, scenario_id)
+    if not sc:
+        raise HTTPException(status_code=404, detail="Escenario no encontrado")
+    if repo.get_by_name(db, payload.name):
+        raise HTTPException(status_code=409, detail="Ya existe un escenario con ese nombre")
+
+    clone = repo.clone(db, sc, payload.name, payload.description, user_id=current.id)
+    background_tasks.add_task(_warm_scenario, clone.id)
+    return clone
+
+
 # -------------------------------------------------
 # EDITAR ESCENARIO (ADMIN total — ANALISTA limitado)
 # -------------------------------------------------
@@ -72,9 +152,14 @@ def create_scenario(
 def update_scenario(
     scenario_id: int,
     payload: ScenarioUpdate,
+    response: Response,
     db: Session = Depends(get_db),
     current=Depends(get_current_user)
 ):
+    """
+    active=True no activa en el momento: encola la activación en dos fases
+    (cabecera X-Activation-Job; estado en GET /scenarios/{id}/activation).
+    """
     sc = repo.get_by_id(db, scenario_id)
     if not sc:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
@@ -96,18 +181,29 @@ def update_scenario(
         if other and other.id != sc.id:
             raise HTTPException(status_code=409, detail="Nombre ya está en uso")
 
-    return repo.update(db, sc, payload)
+    wants_activation = payload.active is True and not sc.active
+    if wants_activation:
+        _ensure_no_activation_in_progress(db)
+
+    sc = repo.update(db, sc, payload)
+    if wants_activation:
+        response.headers["X-Activation-Job"] = str(activation.request(db, sc, user_id=current.id).id)
+    return sc
 
 
 # -------------------------------------------------
 # ELIMINAR (ADMIN puede todo — ANALISTA solo inactivos)
 # -------------------------------------------------
-@router.delete("/{scenario_id}", status_code=204)
+@router.delete("/{scenario_id}", status_code=202, response_model=JobOut)
 def delete_scenario(
     scenario_id: int,
     db: Session = Depends(get_db),
     current=Depends(get_current_user)
 ):
+    """
+    Marca el escenario como en borrado (deja de verse enseguida) y encola
+    el borrado de sus datos por lotes. El progreso: GET /jobs/{id}.
+    """
     sc = repo.get_by_id(db, scenario_id)
     if not sc:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
@@ -120,12 +216,10 @@ def delete_scenario(
         )
 
     try:
-        repo.delete(db, sc)
+        return repo.delete(db, sc, user_id=current.id)
     except ValueError as e:
         raise HTTPException(status_code=409, detail=str(e))
 
-    return None
-
 
 # -------------------------------------------------
 # QUITAR ENTORNO DEL ESCENARIO
@@ -150,14 +244,24 @@ def remove_category_from_scenario(
 
 
 # -------------------------------------------------
-# ACTIVAR ESCENARIO (solo ADMIN)
+# ACTIVAR ESCENARIO (solo ADMIN) — en dos fases
 # -------------------------------------------------
-@router.post("/{scenario_id}/activate", status_code=204)
+def _ensure_no_activation_in_progress(db: Session) -> None:
+    if activation.in_progress(db):
+        raise HTTPException(status_code=409, detail="Ya hay una activación de escenario en curso.")
+
+
+@router.post("/{scenario_id}/activate", status_code=202, response_model=JobOut)
 def activate_scenario(
     scenario_id: int,
     db: Session = Depends(get_db),
     current=Depends(get_current_user)
 ):
+    """
+    Precalienta en segundo plano los resultados públicos del escenario y
+    recién entonces lo deja como activo (swap atómico). Mientras tanto el
+    sitio sigue sirviendo el activo anterior. Estado: GET /{id}/activation.
+    """
     if current.role != "ADMIN":
         raise HTTPException(status_code=403, detail="Solo el administrador puede activar escenarios.")
 
@@ -165,5 +269,27 @@ def activate_scenario(
     if not sc:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
 
-    repo.set_active_exclusive(db, scenario_id)
-    return None
+    _ensure_no_activation_in_progress(db)
+    return activation.request(db, sc, user_id=current.id)
+
+
+@router.get("/{scenario_id}/activation", response_model=ActivationStatus)
+def get_activation_status(
+    scenario_id: int,
+    db: Session = Depends(get_db),
+    current=Depends(get_current_user)
+):
+    sc = repo.get_by_id(db, scenario_id)
+    if not sc:
+        raise HTTPException(status_code=404, detail="Escenario no encontrado")
+
+    job = activation.latest(db, scenario_id)
+    if sc.active:
+        state = "active"
+    elif job is not None and job.status in ("pending", "running"):
+        state = "warming"
+    elif job is not None and job.status == "failed":
+        state = "failed"
+    else:
+        state = "inactive"
+    return {"scenario_id": sc.id, "active": sc.active, "state": state, "job": job}
@@ -3,6 +3,7 @@ from datetime import datetime
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
@@ -14,13 +15,21 @@ from .auth import get_current_user, require_admin, require_self_or_admin
 from math import ceil
 from fastapi import Query
 
-from app.core.security import hash_password
+from app.core import auth_cache, password_pool
 from pydantic import BaseModel
 from app.core.password_policy import validate_password_strength
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
+async def _hash_or_503(plain: str) -> str:
+    """bcrypt en el pool de procesos; si la cola está llena, 503."""
+    try:
+        return await password_pool.hash_password(plain)
+    except password_pool.PasswordPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
 def get_user_or_404(db: Session, user_id: int) -> User:
     user = db.get(User, user_id)
     if not user:
@@ -28,6 +37,22 @@ def get_user_or_404(db: Session, user_id: int) -> User:
     return user
 
 
+def _commit_or_409(db: Session) -> None:
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        # normalmente es por UNIQUE(email)
+        raise HTTPException(status_code=409, detail="Email ya está registrado")
+
+
+def _insert_user(db: Session, user: User) -> User:
+    db.add(user)
+    _commit_or_409(db)
+    db.refresh(user)
+    return user
+
+
 class PaginatedUsers(BaseModel):
     page: int
     limit: int
@@ -36,8 +61,10 @@ class PaginatedUsers(BaseModel):
     items: List[UserOut]
 
 @router.post("", response_model=UserOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin)])
-def create_user(payload: UserCreate, db: Session = Depends(get_db)):
-    
+async def create_user(payload: UserCreate, db: Session = Depends(get_db)):
+    # async como login: bcrypt se espera en el pool de procesos sin ocupar
+    # un hilo de anyio; las queries van al threadpool
+
     # 🔹 Normalizar antes de guardar
     payload.email = payload.email.lower().strip()
     if payload.name:
@@ -45,7 +72,7 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db)):
 
     if payload.password is not None:
         validate_password_strength(payload.password)
-        payload.password = hash_password(payload.password)
+        payload.password = await _hash_or_503(payload.password)
 
     user = User(
         name=payload.name,
@@ -54,15 +81,7 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db)):
         password_hash=payload.password,
         password_update_datetime=datetime.utcnow(),  # primera vez que se establece
     )
-    db.add(user)
-    try:
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        # normalmente es por UNIQUE(email)
-        raise HTTPException(status_code=409, detail="Email ya está registrado")
-    db.refresh(user)
-    return user
+    return await run_in_threadpool(_insert_user, db, user)
 
 
 @router.get("/paged", response_model=PaginatedUsers, dependencies=[Depends(require_admin)])
@@ -115,10 +134,9 @@ def get_user_detail(
 
 @router.put("/{user_id}", response_model=UserOut)
 @router.patch("/{user_id}", response_model=UserOut)
-def update_user(user_id: int, payload: UserUpdate, db: Session = Depends(get_db), current=Depends(require_self_or_admin)):
-    u = db.get(User, user_id)
-    if not u:
-        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+async def update_user(user_id: int, payload: UserUpdate, db: Session = Depends(get_db), current=Depends(require_self_or_admin)):
+    # async por el mismo motivo que create_user
+    u = await run_in_threadpool(get_user_or_404, db, user_id)
 
     # Solo ADMIN puede cambiar 'role'
     if payload.role is not None:
@@ -133,16 +151,15 @@ def update_user(user_id: int, payload: UserUpdate, db: Session = Depends(get_db)
         u.email = payload.email.lower().strip()
     if payload.password is not None:
         validate_password_strength(payload.password)
-        u.password_hash = hash_password(payload.password)
+        u.password_hash = await _hash_or_503(payload.password)
         u.password_update_datetime = datetime.utcnow()
 
-    try:
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(status_code=409, detail="Email ya está registrado")
+    await run_in_threadpool(_commit_or_409, db)
+    # rol / contraseña / email pudieron cambiar → fuera de la cache de auth
+    # (user_id, no u.id: tras el commit leerlo haría una query en el event loop)
+    auth_cache.invalidate_user(user_id)
 
-    db.refresh(u)
+    await run_in_threadpool(db.refresh, u)
     return u
 
 
@@ -154,4 +171,5 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     db.delete(u)
     db.commit()
+    auth_cache.invalidate_user(user_id)
     return None
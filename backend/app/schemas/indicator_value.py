@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict, confloat
-from typing import List
+from typing import List, Literal
 from datetime import datetime
 
 class IndicatorValueBase(BaseModel):
@@ -24,6 +24,45 @@ class IndicatorValueOut(IndicatorValueBase):
 class PaginatedIndicatorValues(BaseModel):
     page: int
     limit: int
-    total: int
-    total_pages: int
+    # None cuando se pide include_total=false
+    total: int | None = None
+    total_pages: int | None = None
+    # cursor para la siguiente página (paginación keyset); None si no hay más
+    next_cursor: str | None = None
     items: List[IndicatorValueOut]
+
+class IndicatorValueBulkItem(BaseModel):
+    """
+    Una operación del guardado masivo:
+    - upsert: crea o actualiza por (country_id, indicator_id)
+    - update: actualiza por id
+    - delete: borra por id o por (country_id, indicator_id)
+    """
+    op: Literal["upsert", "update", "delete"] = "upsert"
+    id: int | None = None
+    country_id: int | None = None
+    indicator_id: int | None = None
+    raw_value: confloat(ge=-1e15, le=1e15) | None = None
+
+class IndicatorValueBulkPayload(BaseModel):
+    scenario_id: int
+    # si es True y alguna operación falla, no se guarda nada
+    atomic: bool = False
+    items: List[IndicatorValueBulkItem] = Field(..., min_length=1, max_length=5000)
+
+class IndicatorValueBulkResult(BaseModel):
+    index: int
+    op: str
+    status: Literal["created", "updated", "deleted", "error"]
+    id: int | None = None
+    country_id: int | None = None
+    indicator_id: int | None = None
+    normalized_value: float | None = None
+    error: str | None = None
+
+class IndicatorValueBulkOut(BaseModel):
+    scenario_id: int
+    processed: int
+    errors: int
+    committed: bool
+    items: List[IndicatorValueBulkResult]
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, ConfigDict, computed_field
+from datetime import datetime
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    target_id: int
+    status: str          # pending | running | done | failed
+    total: int
+    done: int
+    error: str | None = None
+    created_by: int | None = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None = None
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def progress(self) -> float:
+        """0..1"""
+        if self.status == "done":
+            return 1.0
+        return round(min(self.done / self.total, 1.0), 4) if self.total else 0.0
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
-from typing import List
+from typing import List, Literal
+from app.schemas.job import JobOut
 
 class ScenarioBase(BaseModel):
     name: str = Field(..., min_length=2, max_length=120)
@@ -8,15 +9,20 @@ class ScenarioBase(BaseModel):
     active: bool = True
 
 class ScenarioCreate(ScenarioBase):
-    pass
+    parent_id: int | None = None  # hereda valores y pesos; guarda solo lo que cambie
 
 class ScenarioUpdate(BaseModel):
     name: str | None = Field(default=None, min_length=2, max_length=120)
     description: str | None = Field(default=None, max_length=500)
     active: bool | None = None
 
+class ScenarioClone(BaseModel):
+    name: str = Field(..., min_length=2, max_length=120)
+    description: str | None = Field(default=None, max_length=500)  # None = la del original
+
 class ScenarioOut(ScenarioBase):
     id: int
+    parent_id: int | None = None
     created_by: int | None = None
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
@@ -27,3 +33,11 @@ class PaginatedScenarios(BaseModel):
     total: int
     total_pages: int
     items: List[ScenarioOut]
+
+class ActivationStatus(BaseModel):
+    scenario_id: int
+    active: bool
+    # active: ya es el activo | warming: precalentando, aún se sirve el anterior
+    # failed: la última activación falló | inactive: sin activación pendiente
+    state: Literal["active", "warming", "failed", "inactive"]
+    job: JobOut | None = None
@@ -0,0 +1,187 @@
+# app/scripts/generate_synthetic_dataset.py
+"""
+Dataset sintético para medir el backend a escala de producción:
+N países × M categorías × K indicadores por categoría × S escenarios,
+con pesos y cobertura parcial (celdas sin dato).
+
+Es determinista (misma semilla → mismos datos) y escribe en bloque
+(executemany), así que sirve igual para SQLite que para MySQL.
+
+Uso (sobre una BD vacía; NUNCA sobre la de producción):
+
+    python -m app.scripts.generate_synthetic_dataset \\
+        --database-url sqlite:////tmp/ceipa_scale.sqlite --create-tables \\
+        --countries 200 --categories 8 --indicators 10 --scenarios 4
+
+Los benchmarks (benchmarks/conftest.py) usan generate() directamente.
+"""
+import argparse
+import random
+import string
+from itertools import product
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.normalization import normalize_value
+from app.models.category import Category
+from app.models.country import Country
+from app.models.indicator import Indicator, IndicatorType, ScaleType
+from app.models.indicator_value import IndicatorValue
+from app.models.scenario import Scenario
+from app.models.weights import CategoryWeight, IndicatorWeight
+
+BATCH_SIZE = 5000
+
+# ISO sintéticos: 00..99 y luego aa..zz (iso3: c00..c99 y xaa..xzz)
+MAX_COUNTRIES = 100 + 26 * 26
+
+
+def _country_codes(i: int) -> tuple[str, str]:
+    if i < 100:
+        return f"{i:02d}", f"c{i:02d}"
+    a, b = divmod(i - 100, 26)
+    letters = string.ascii_lowercase[a] + string.ascii_lowercase[b]
+    return letters, "x" + letters
+
+
+def _insert_batches(db: Session, model, rows: list[dict], batch_size: int) -> None:
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(model), rows[start:start + batch_size])
+
+
+def generate(
+    db: Session,
+    *,
+    countries: int,
+    categories: int,
+    indicators_per_category: int,
+    scenarios: int,
+    coverage: float = 0.9,
+    seed: int = 42,
+    batch_size: int = BATCH_SIZE,
+) -> dict:
+    """
+    Crea el dataset y hace commit. El primer escenario queda activo.
+    `coverage` es la fracción de celdas país × indicador con valor.
+    Devuelve cuántas filas se crearon de cada tipo.
+    """
+    if not 0 < countries <= MAX_COUNTRIES:
+        raise ValueError(f"countries debe estar entre 1 y {MAX_COUNTRIES}")
+
+    rnd = random.Random(seed)
+
+    cs = []
+    for i in range(countries):
+        iso2, iso3 = _country_codes(i)
+        cs.append(Country(iso2=iso2, iso3=iso3, name_es=f"País {i}", name_en=f"Country {i}"))
+    cats = [Category(name=f"Entorno {i}", slug=f"entorno-{i}") for i in range(categories)]
+    db.add_all(cs + cats)
+    db.flush()
+
+    inds = []
+    for cat in cats:
+        for j in range(indicators_per_category):
+            inds.append(Indicator(
+                name=f"{cat.name} / Indicador {j}",
+                slug=f"{cat.slug}-indicador-{j}",
+                value_type=rnd.choice([IndicatorType.IMP, IndicatorType.DMP]),
+                scale=ScaleType.FIJA_0_100,
+                min_value=0,
+                max_value=100,
+                category_id=cat.id,
+            ))
+    db.add_all(inds)
+    db.flush()
+
+    scs = [Scenario(name=f"Escenario {s}", active=(s == 0)) for s in range(scenarios)]
+    db.add_all(scs)
+    db.flush()
+
+    cat_weight = round(1 / categories, 4) if categories else 0
+    ind_weight = round(1 / indicators_per_category, 4) if indicators_per_category else 0
+    category_weights = [
+        {"scenario_id": sc.id, "category_id": cat.id, "weight": cat_weight}
+        for sc, cat in product(scs, cats)
+    ]
+    indicator_weights = [
+        {"scenario_id": sc.id, "indicator_id": ind.id, "weight": ind_weight}
+        for sc, ind in product(scs, inds)
+    ]
+
+    values = []
+    for sc in scs:
+        for c in cs:
+            for ind in inds:
+                if rnd.random() >= coverage:
+                    continue
+                raw = round(rnd.uniform(0, 100), 6)
+                values.append({
+                    "scenario_id": sc.id,
+                    "country_id": c.id,
+                    "indicator_id": ind.id,
+                    "raw_value": raw,
+                    "normalized_value": round(normalize_value(ind, raw), 4),
+                })
+
+    _insert_batches(db, CategoryWeight, category_weights, batch_size)
+    _insert_batches(db, IndicatorWeight, indicator_weights, batch_size)
+    _insert_batches(db, IndicatorValue, values, batch_size)
+    db.commit()
+
+    return {
+        "countries": len(cs),
+        "categories": len(cats),
+        "indicators": len(inds),
+        "scenarios": len(scs),
+        "category_weights": len(category_weights),
+        "indicator_weights": len(indicator_weights),
+        "indicator_values": len(values),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Genera un dataset sintético de CEIPA.")
+    parser.add_argument("--database-url", help="Por defecto, DATABASE_URL de la app")
+    parser.add_argument("--create-tables", action="store_true",
+                        help="Crea el esquema con metadata.create_all (BD desechable)")
+    parser.add_argument("--countries", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--indicators", type=int, default=10, help="Indicadores por categoría")
+    parser.add_argument("--scenarios", type=int, default=4)
+    parser.add_argument("--coverage", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+        SessionFactory = sessionmaker(bind=engine, autoflush=False)
+    else:
+        from app.db import SessionLocal as SessionFactory, engine
+
+    if args.create_tables:
+        import app.models  # noqa: F401  (registra todas las tablas)
+        from app.db import Base
+
+        Base.metadata.create_all(engine)
+
+    db = SessionFactory()
+    try:
+        if db.scalar(select(func.count(Country.id))):
+            raise SystemExit("❌ La BD ya tiene países: usa una BD vacía para el dataset sintético.")
+        counts = generate(
+            db,
+            countries=args.countries,
+            categories=args.categories,
+            indicators_per_category=args.indicators,
+            scenarios=args.scenarios,
+            coverage=args.coverage,
+            seed=args.seed,
+        )
+        print("✅ Dataset sintético creado:", ", ".join(f"{k}={v}" for k, v in counts.items()))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+# app/scripts/load_test.py
+"""
+Generador de carga HTTP de punta a punta, sin herramientas externas.
+
+Lanza `concurrency` clientes concurrentes contra la app con una mezcla
+configurable de operaciones (rankings, índices, /countries y escrituras
+autenticadas de valores) y reporta throughput, latencias p50/p95/p99 y
+tasa de errores, en total y por operación, como JSON.
+
+Dos modos:
+- en proceso (por defecto): httpx.ASGITransport contra app.main, sin red.
+  Con --synthetic 60x4x5x2 crea un SQLite temporal con el dataset
+  sintético (app/scripts/generate_synthetic_dataset.py); si no, usa la
+  BD de DATABASE_URL, que ya debe tener datos.
+- remoto: --base-url http://localhost:8000 contra un uvicorn levantado
+  (para medir con workers / pool reales). Las escrituras necesitan
+  --token, o --email y --password.
+
+    python -m app.scripts.load_test --synthetic 60x4x5x2 --duration 15 \\
+        --concurrency 16 --mix ranking_global=3,index_global=3,countries=2,write_value=1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import httpx
+
+API = "/api/v1"
+
+DEFAULT_MIX = {
+    "ranking_global": 3,
+    "ranking_category": 2,
+    "index_global": 3,
+    "index_category": 2,
+    "countries": 2,
+    "write_value": 1,
+}
+
+
+@dataclass
+class Target:
+    """Ids reales del dataset, descubiertos al inicio vía la API."""
+    country_ids: list[int]
+    category_ids: list[int]
+    indicator_ids: list[int]
+    scenario_id: int
+    headers: dict = field(default_factory=dict)  # auth para escrituras
+
+
+Op = Callable[[httpx.AsyncClient, Target, random.Random], Awaitable[httpx.Response]]
+
+
+def _ranking_global(client, t, rnd):
+    return client.get(f"{API}/public/ranking/global", params={"limit": 50})
+
+
+def _ranking_category(client, t, rnd):
+    return client.get(f"{API}/public/ranking/category", params={
+        "category_id": rnd.choice(t.category_ids), "limit": 50,
+    })
+
+
+def _index_global(client, t, rnd):
+    return client.get(f"{API}/public/index/global", params={"country_id": rnd.choice(t.country_ids)})
+
+
+def _index_category(client, t, rnd):
+    return client.get(f"{API}/public/index/category", params={
+        "country_id": rnd.choice(t.country_ids), "category_id": rnd.choice(t.category_ids),
+    })
+
+
+def _countries(client, t, rnd):
+    params = {"limit": 50}
+    if rnd.random() < 0.5:
+        params["q"] = rnd.choice(["pa", "país 1", "co", "c0"])
+    return client.get(f"{API}/countries", params=params)
+
+
+def _write_value(client, t, rnd):
+    return client.post(f"{API}/indicator-values", headers=t.headers, json={
+        "scenario_id": t.scenario_id,
+        "country_id": rnd.choice(t.country_ids),
+        "indicator_id": rnd.choice(t.indicator_ids),
+        "raw_value": round(rnd.uniform(0, 100), 2),
+    })
+
+
+OPS: dict[str, Op] = {
+    "ranking_global": _ranking_global,
+    "ranking_category": _ranking_category,
+    "index_global": _index_global,
+    "index_category": _index_category,
+    "countries": _countries,
+    "write_value": _write_value,
+}
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """"ranking_global=3,countries=1" → {"ranking_global": 3.0, "countries": 1.0}"""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in OPS:
+            raise ValueError(f"Operación desconocida: {name} (válidas: {', '.join(OPS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def _summary(latencies: list[float], errors: int, elapsed: float) -> dict:
+    lat = sorted(latencies)
+    n = len(lat)
+    return {
+        "requests": n,
+        "errors": errors,
+        "error_rate": round(errors / n, 4) if n else 0.0,
+        "throughput_rps": round(n / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(lat) / n * 1000, 3) if n else 0.0,
+            "p50": round(_percentile(lat, 50) * 1000, 3),
+            "p95": round(_percentile(lat, 95) * 1000, 3),
+            "p99": round(_percentile(lat, 99) * 1000, 3),
+            "max": round(lat[-1] * 1000, 3) if n else 0.0,
+        },
+    }
+
+
+async def _get_all(client: httpx.AsyncClient, path: str, limit: int) -> list[dict]:
+    items, page = [], 1
+    while True:
+        r = await client.get(path, params={"limit": limit, "page": page})
+        r.raise_for_status()
+        body = r.json()
+        items.extend(body["items"])
+        if page >= (body.get("total_pages") or 1):
+            return items
+        page += 1
+
+
+async def discover(client: httpx.AsyncClient, headers: dict | None = None) -> Target:
+    countries = await _get_all(client, f"{API}/countries", 500)
+    indicators = await _get_all(client, f"{API}/indicators", 100)
+    scenario = (await client.get(f"{API}/scenarios/active")).json()
+    if not countries or not indicators:
+        raise RuntimeError("La BD no tiene países / indicadores: carga un dataset primero")
+    return Target(
+        country_ids=[c["id"] for c in countries],
+        category_ids=sorted({i["category_id"] for i in indicators}),
+        indicator_ids=[i["id"] for i in indicators],
+        scenario_id=scenario["id"],
+        headers=headers or {},
+    )
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    target: Target,
+    mix: dict[str, float],
+    *,
+    concurrency: int = 8,
+    duration: float | None = None,
+    requests: int | None = None,
+    seed: int = 1,
+) -> dict:
+    """
+    Corre la carga hasta `duration` segundos o `requests` requests (lo que
+    llegue primero) y devuelve el reporte. Error = excepción o status >= 400.
+    """
+    if duration is None and requests is None:
+        raise ValueError("Indica duration o requests")
+    if "write_value" in mix and not target.headers:
+        raise ValueError("write_value necesita credenciales (token)")
+
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    latencies: dict[str, list[float]] = {n: [] for n in names}
+    errors: dict[str, int] = dict.fromkeys(names, 0)
+    statuses: dict[str, int] = {}
+    issued = 0
+    deadline = time.perf_counter() + duration if duration is not None else None
+
+    async def worker(wid: int) -> None:
+        nonlocal issued
+        rnd = random.Random(seed * 1000 + wid)
+        while True:
+            if requests is not None and issued >= requests:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            issued += 1
+            name = rnd.choices(names, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                r = await OPS[name](client, target, rnd)
+                status = str(r.status_code)
+                failed = r.status_code >= 400
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                failed = True
+            latencies[name].append(time.perf_counter() - t0)
+            statuses[status] = statuses.get(status, 0) + 1
+            errors[name] += failed
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    all_latencies = [x for lat in latencies.values() for x in lat]
+    report = {
+        "config": {"concurrency": concurrency, "duration": duration, "requests": requests, "mix": mix},
+        "elapsed_s": round(elapsed, 3),
+        **_summary(all_latencies, sum(errors.values()), elapsed),
+        "status_codes": dict(sorted(statuses.items())),
+        "by_op": {n: _summary(latencies[n], errors[n], elapsed) for n in names},
+    }
+    return report
+
+
+def _prepare_synthetic(spec: str) -> None:
+    """SQLite temporal + dataset sintético; debe correr ANTES de importar app.*"""
+    tmp = tempfile.mkdtemp(prefix="ceipa_load_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/load.sqlite"
+    os.environ.setdefault("APP_NAME", "CEIPA Risk (load)")
+    os.environ.setdefault("APP_ENV", "load")
+    os.environ.setdefault("JWT_SECRET", "load-secret-not-for-production")
+    os.environ.setdefault("JWT_ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("CORS_ORIGINS", "[]")
+
+    import app.models  # noqa: F401  (registra todas las tablas)
+    from app.db import Base, SessionLocal, engine
+    from app.scripts.generate_synthetic_dataset import generate
+
+    Base.metadata.create_all(engine)
+    countries, categories, indicators, scenarios = (int(x) for x in spec.lower().split("x"))
+    db = SessionLocal()
+    try:
+        generate(db, countries=countries, categories=categories,
+                 indicators_per_category=indicators, scenarios=scenarios)
+    finally:
+        db.close()
+
+
+def _local_writer_headers() -> dict:
+    """Usuario ADMIN de carga (se crea si no existe) y su token, sin pasar por bcrypt."""
+    from app.core.security import create_access_token
+    from app.db import SessionLocal
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        u = db.query(User).filter(User.email == "loadtest@ceipa.local").first()
+        if u is None:
+            u = User(name="Load test", email="loadtest@ceipa.local", role="ADMIN", password_hash="!")
+            db.add(u)
+            db.commit()
+        return {"Authorization": "Bearer " + create_access_token(subject=str(u.id))}
+    finally:
+        db.close()
+
+
+async def _remote_headers(client: httpx.AsyncClient, args) -> dict:
+    if args.token:
+        return {"Authorization": f"Bearer {args.token}"}
+    if args.email and args.password:
+        r = await client.post(f"{API}/auth/login", data={"username": args.email, "password": args.password})
+        r.raise_for_status()
+        return {"Authorization": f"Bearer {r.json()['access_token']}"}
+    return {}
+
+
+async def _main(args) -> dict:
+    mix = parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX)
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        headers = await _remote_headers(client, args)
+    else:
+        if args.synthetic:
+            _prepare_synthetic(args.synthetic)
+        from app.main import app
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout
+        )
+        headers = _local_writer_headers() if "write_value" in mix else {}
+
+    if "write_value" in mix and not headers:
+        raise SystemExit("❌ write_value necesita --token o --email/--password en modo remoto")
+
+    async with client:
+        target = await discover(client, headers)
+        return await run_load(
+            client, target, mix,
+            concurrency=args.concurrency, duration=args.duration, requests=args.requests, seed=args.seed,
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API de CEIPA.")
+    parser.add_argument("--base-url", help="URL de un servidor levantado (si no, en proceso)")
+    parser.add_argument("--synthetic", metavar="NxMxKxS",
+                        help="En proceso: SQLite temporal con el dataset sintético")
+    parser.add_argument("--mix", help="p.ej. ranking_global=3,countries=1 (por defecto: todas)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos")
+    parser.add_argument("--requests", type=int, help="Tope de requests (corta antes que duration)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--token")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    parser.add_argument("--output", help="Archivo JSON para el reporte (además de stdout)")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(_main(args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 # app/scripts/seed_countries.py
 import json
 from pathlib import Path
+from app.core.cache import bump_catalog
 from app.db import SessionLocal
 from app.models.country import Country
 
@@ -37,6 +38,7 @@ def run():
             db.add(c)
 
         db.commit()
+        bump_catalog()
         print("✅ Países insertados correctamente.")
     except Exception as e:
         db.rollback()
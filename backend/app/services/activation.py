@@ -0,0 +1,64 @@
+# app/services/activation.py
+"""
+Activación de escenarios en dos fases (blue-green).
+
+Antes, activar cambiaba el flag enseguida y los primeros visitantes del
+sitio público armaban en frío el bundle del escenario nuevo (pico de
+latencia). Ahora activar encola un job (tabla background_jobs):
+
+1. precalentar: arma el bundle público del escenario tal como se verá
+   activo (incluye matriz y rankings, y su variante gzip).
+2. swap: set_active_exclusive cambia el activo en una sola transacción.
+
+Hasta el swap se sigue sirviendo el escenario anterior desde su cache.
+El progreso / la disponibilidad se consultan en GET /scenarios/{id}/activation
+(o GET /jobs/{id}).
+
+Las caches son por proceso: el precalentado queda en el worker que corrió
+el job; los demás arman el bundle en su primera request, como al arrancar.
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.job import Job
+from app.models.scenario import Scenario
+from app.repositories import scenario_repo
+from app.services import jobs, public_bundle
+
+KIND = "activate_scenario"
+
+
+def request(db: Session, sc: Scenario, user_id: int | None = None) -> Job:
+    """Fase 1 en segundo plano; el swap lo hace el mismo job al terminar."""
+    return jobs.submit(db, KIND, sc.id, user_id)
+
+
+def in_progress(db: Session) -> Job | None:
+    """Activación sin terminar (de cualquier escenario): hay una a la vez."""
+    return db.scalar(
+        select(Job).where(Job.kind == KIND, Job.status.in_(jobs.ACTIVE_STATUSES)).limit(1)
+    )
+
+
+def latest(db: Session, scenario_id: int) -> Job | None:
+    return db.scalar(
+        select(Job).where(Job.kind == KIND, Job.target_id == scenario_id)
+        .order_by(Job.id.desc()).limit(1)
+    )
+
+
+@jobs.handler(KIND)
+def activate_when_warm(db: Session, scenario_id: int, progress: jobs.Progress) -> None:
+    sc = db.get(Scenario, scenario_id)
+    if sc is None or sc.deleting:
+        raise ValueError("Escenario no encontrado")
+
+    progress.set_total(2)
+    scenario_repo.lineage(db, sc)  # registra la herencia antes de armar la clave de cache
+    public_bundle.prepare_activation(db, sc)
+    progress.advance(1)
+    db.commit()
+
+    # el avance del swap va en la misma transacción que el swap
+    progress.advance(1)
+    scenario_repo.set_active_exclusive(db, scenario_id)
@@ -1,13 +1,17 @@
 # app/services/analytics.py
 from __future__ import annotations
-from typing import Dict, List, Tuple, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple, Optional
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.models.scenario import Scenario
+from app.models.category import Category
 from app.models.indicator import Indicator
 from app.models.indicator_value import IndicatorValue
 from app.models.weights import CategoryWeight, IndicatorWeight
+from app.core.tracing import traced
+from app.repositories import scenario_repo
 
 # -------- helpers --------
 def _get_scenario(db: Session, scenario_id: Optional[int]) -> Scenario:
@@ -17,34 +21,116 @@ def _get_scenario(db: Session, scenario_id: Optional[int]) -> Scenario:
             raise ValueError("No hay escenario activo")
         return sc
     sc = db.get(Scenario, scenario_id)
-    if not sc:
+    if not sc or sc.deleting:
         raise ValueError("Escenario no encontrado")
     return sc
 
-def _indicator_weights_map(db: Session, scenario_id: int) -> Dict[int, float]:
-    rows = db.scalars(select(IndicatorWeight).where(IndicatorWeight.scenario_id == scenario_id)).all()
-    return {r.indicator_id: float(r.weight) for r in rows}
+@traced
+def resolve_scenario(db: Session, scenario_id: Optional[int]) -> Scenario:
+    """Escenario pedido o el activo (None); ValueError si no existe."""
+    return _get_scenario(db, scenario_id)
 
-def _category_weights_map(db: Session, scenario_id: int) -> Dict[int, float]:
-    rows = db.scalars(select(CategoryWeight).where(CategoryWeight.scenario_id == scenario_id)).all()
-    return {r.category_id: float(r.weight) for r in rows}
+def _indicator_weights_map(db: Session, chain: List[int]) -> Dict[int, float]:
+    rows = db.execute(
+        select(IndicatorWeight.scenario_id, IndicatorWeight.indicator_id, IndicatorWeight.weight, IndicatorWeight.excluded)
+        .join(Indicator, Indicator.id == IndicatorWeight.indicator_id)
+        .join(Category, Category.id == Indicator.category_id)
+        .where(IndicatorWeight.scenario_id.in_(chain), Category.deleting.is_(False))
+    )
+    merged = scenario_repo.overlay(chain, ((sid, ind_id, (w, ex)) for sid, ind_id, w, ex in rows))
+    return {ind_id: float(w) for ind_id, (w, ex) in merged.items() if not ex}
 
-def _country_indicator_norm_map(db: Session, country_id: int) -> Dict[int, float]:
-    rows = db.scalars(select(IndicatorValue).where(IndicatorValue.country_id == country_id)).all()
-    return {r.indicator_id: float(r.normalized_value) for r in rows if r.normalized_value is not None}
+def _category_weights_map(db: Session, chain: List[int]) -> Tuple[Dict[int, float], Set[int]]:
+    """(pesos efectivos, entornos que un hijo quitó con un tombstone)."""
+    rows = db.execute(
+        select(CategoryWeight.scenario_id, CategoryWeight.category_id, CategoryWeight.weight, CategoryWeight.excluded)
+        .join(Category, Category.id == CategoryWeight.category_id)
+        .where(CategoryWeight.scenario_id.in_(chain), Category.deleting.is_(False))
+    )
+    merged = scenario_repo.overlay(chain, ((sid, cat_id, (w, ex)) for sid, cat_id, w, ex in rows))
+    weights = {cat_id: float(w) for cat_id, (w, ex) in merged.items() if not ex}
+    return weights, {cat_id for cat_id, (_, ex) in merged.items() if ex}
 
-# -------- índice por categoría --------
-def category_index(db: Session, country_id: int, category_id: int, *, scenario_id: Optional[int] = None) -> dict:
+# -------- snapshot del escenario --------
+@dataclass(slots=True)
+class ScenarioSnapshot:
+    """
+    Todo lo que usan los índices de un escenario, leído en un número fijo
+    de queries (escenario, pesos, indicadores, valores). Los cálculos por
+    país / categoría trabajan sobre esto en memoria: un ranking ya no hace
+    queries por país × categoría.
+    """
+    scenario: Scenario
+    indicator_weights: Dict[int, float]
+    category_weights: Dict[int, float]
+    indicators_by_category: Dict[int, List[int]]
+    norm_values: Dict[int, Dict[int, float]]  # país → {indicador: valor normalizado}
+    country_ids: List[int]                    # países con alguna fila en el escenario
+
+@traced
+def load_snapshot(db: Session, scenario_id: Optional[int], *, country_id: Optional[int] = None) -> ScenarioSnapshot:
+    """
+    Snapshot del escenario (None = activo); con country_id solo lee ese país.
+    Si el escenario hereda, valores y pesos de toda la cadena se leen en la
+    misma query y gana el más cercano. Los entornos que el hijo quitó
+    (tombstone) no cuentan aunque el padre los tenga, ni los que se están
+    borrando (`deleting`) aunque el job aún no haya terminado.
+    """
     sc = _get_scenario(db, scenario_id)
-    iw = _indicator_weights_map(db, sc.id)
+    chain = scenario_repo.lineage(db, sc)
+    category_weights, excluded = _category_weights_map(db, chain)
+
+    indicators_by_category: Dict[int, List[int]] = {}
+    for ind_id, cat_id in db.execute(
+        select(Indicator.id, Indicator.category_id)
+        .join(Category, Category.id == Indicator.category_id)
+        .where(Category.deleting.is_(False))
+        .order_by(Indicator.id)
+    ):
+        if cat_id not in excluded:
+            indicators_by_category.setdefault(cat_id, []).append(ind_id)
+
+    # solo las columnas del índice cubriente idx_iv_scenario_country_cover
+    stmt = select(
+        IndicatorValue.country_id, IndicatorValue.indicator_id, IndicatorValue.normalized_value
+    )
+    if len(chain) == 1:
+        stmt = stmt.where(IndicatorValue.scenario_id == sc.id)
+    else:
+        stmt = stmt.add_columns(IndicatorValue.scenario_id).where(IndicatorValue.scenario_id.in_(chain))
+    if country_id is not None:
+        stmt = stmt.where(IndicatorValue.country_id == country_id)
+    rows = db.execute(stmt)
+    if len(chain) > 1:
+        merged = scenario_repo.overlay(chain, ((sid, (cid, ind_id), nv) for cid, ind_id, nv, sid in rows))
+        rows = ((cid, ind_id, nv) for (cid, ind_id), nv in merged.items())
+
+    norm_values: Dict[int, Dict[int, float]] = {}
+    for cid, ind_id, nv in rows:
+        per_country = norm_values.setdefault(cid, {})
+        if nv is not None:
+            per_country[ind_id] = float(nv)
+
+    return ScenarioSnapshot(
+        scenario=sc,
+        indicator_weights=_indicator_weights_map(db, chain),
+        category_weights=category_weights,
+        indicators_by_category=indicators_by_category,
+        norm_values=norm_values,
+        country_ids=sorted(norm_values),
+    )
+
+def _category_index(snap: ScenarioSnapshot, country_id: int, category_id: int) -> dict:
+    sc_id = snap.scenario.id
+    iw = snap.indicator_weights
 
     # Indicadores de la categoría
-    inds = db.scalars(select(Indicator.id).where(Indicator.category_id == category_id)).all()
+    inds = snap.indicators_by_category.get(category_id, [])
     if not inds:
-        return {"country_id": country_id, "category_id": category_id, "scenario_id": sc.id, "index": None, "detail": []}
+        return {"country_id": country_id, "category_id": category_id, "scenario_id": sc_id, "index": None, "detail": []}
 
     # Valores normalizados del país
-    norm_map = _country_indicator_norm_map(db, country_id)
+    norm_map = snap.norm_values.get(country_id, {})
 
     # Pesos/indicadores presentes y renormalización local
     pairs: List[Tuple[int, float]] = [(ind_id, iw[ind_id]) for ind_id in inds if ind_id in norm_map and ind_id in iw]
@@ -58,55 +144,78 @@ def category_index(db: Session, country_id: int, category_id: int, *, scenario_i
             nv = norm_map[ind_id]
             idx += nv * w_local
             detail.append({"indicator_id": ind_id, "norm_value": nv, "weight_local": w_local})
-        return {"country_id": country_id, "category_id": category_id, "scenario_id": sc.id, "index": round(idx, 4), "detail": detail}
+        return {"country_id": country_id, "category_id": category_id, "scenario_id": sc_id, "index": round(idx, 4), "detail": detail}
 
     # Sin pesos → promedio simple si hay datos
     vals = [norm_map[i] for i in inds if i in norm_map]
     if not vals:
-        return {"country_id": country_id, "category_id": category_id, "scenario_id": sc.id, "index": None, "detail": []}
+        return {"country_id": country_id, "category_id": category_id, "scenario_id": sc_id, "index": None, "detail": []}
     avg = sum(vals) / len(vals)
     for ind_id in inds:
         if ind_id in norm_map:
             detail.append({"indicator_id": ind_id, "norm_value": norm_map[ind_id], "weight_local": 1/len(vals)})
-    return {"country_id": country_id, "category_id": category_id, "scenario_id": sc.id, "index": round(avg, 4), "detail": detail}
+    return {"country_id": country_id, "category_id": category_id, "scenario_id": sc_id, "index": round(avg, 4), "detail": detail}
 
-# -------- índice global --------
-def global_index(db: Session, country_id: int, *, scenario_id: Optional[int] = None) -> dict:
-    sc = _get_scenario(db, scenario_id)
-    cw = _category_weights_map(db, sc.id)
+def _global_index(snap: ScenarioSnapshot, country_id: int) -> dict:
+    sc_id = snap.scenario.id
+    cw = snap.category_weights
     if not cw:
-        return {"country_id": country_id, "scenario_id": sc.id, "index": None, "detail": []}
+        return {"country_id": country_id, "scenario_id": sc_id, "index": None, "detail": []}
 
     detail = []
     total = 0.0
     sum_w = sum(cw.values()) or 1.0
     for cat_id, w in cw.items():
         w_local = w / sum_w
-        ci = category_index(db, country_id, cat_id, scenario_id=sc.id).get("index")
+        ci = _category_index(snap, country_id, cat_id).get("index")
         detail.append({"category_id": cat_id, "index": ci, "weight": w_local})
         if ci is not None:
             total += ci * w_local
-    return {"country_id": country_id, "scenario_id": sc.id, "index": round(total, 4), "detail": detail}
+    return {"country_id": country_id, "scenario_id": sc_id, "index": round(total, 4), "detail": detail}
+
+# -------- índice por categoría --------
+@traced
+def category_index(
+    db: Session, country_id: int, category_id: int, *,
+    scenario_id: Optional[int] = None, snapshot: Optional[ScenarioSnapshot] = None,
+) -> dict:
+    snap = snapshot or load_snapshot(db, scenario_id, country_id=country_id)
+    return _category_index(snap, country_id, category_id)
+
+# -------- índice global --------
+@traced
+def global_index(
+    db: Session, country_id: int, *,
+    scenario_id: Optional[int] = None, snapshot: Optional[ScenarioSnapshot] = None,
+) -> dict:
+    snap = snapshot or load_snapshot(db, scenario_id, country_id=country_id)
+    return _global_index(snap, country_id)
 
 # -------- rankings --------
-def ranking_global(db: Session, limit: int, order: str = "desc", *, scenario_id: Optional[int] = None) -> dict:
-    sc = _get_scenario(db, scenario_id)
-    country_ids = db.scalars(select(IndicatorValue.country_id).distinct()).all()
+@traced
+def ranking_global(
+    db: Session, limit: int, order: str = "desc", *,
+    scenario_id: Optional[int] = None, snapshot: Optional[ScenarioSnapshot] = None,
+) -> dict:
+    snap = snapshot or load_snapshot(db, scenario_id)
     rows = []
-    for cid in country_ids:
-        gi = global_index(db, cid, scenario_id=sc.id).get("index")
+    for cid in snap.country_ids:
+        gi = _global_index(snap, cid).get("index")
         if gi is not None:
             rows.append({"country_id": cid, "index": gi})
     rows.sort(key=lambda x: x["index"], reverse=(order.lower() != "asc"))
-    return {"scenario_id": sc.id, "order": order, "items": rows[:limit]}
+    return {"scenario_id": snap.scenario.id, "order": order, "items": rows[:limit]}
 
-def ranking_by_category(db: Session, category_id: int, limit: int, order: str = "desc", *, scenario_id: Optional[int] = None) -> dict:
-    sc = _get_scenario(db, scenario_id)
-    country_ids = db.scalars(select(IndicatorValue.country_id).distinct()).all()
+@traced
+def ranking_by_category(
+    db: Session, category_id: int, limit: int, order: str = "desc", *,
+    scenario_id: Optional[int] = None, snapshot: Optional[ScenarioSnapshot] = None,
+) -> dict:
+    snap = snapshot or load_snapshot(db, scenario_id)
     rows = []
-    for cid in country_ids:
-        ci = category_index(db, cid, category_id, scenario_id=sc.id).get("index")
+    for cid in snap.country_ids:
+        ci = _category_index(snap, cid, category_id).get("index")
         if ci is not None:
             rows.append({"country_id": cid, "index": ci})
     rows.sort(key=lambda x: x["index"], reverse=(order.lower() != "asc"))
-    return {"scenario_id": sc.id, "category_id": category_id, "order": order, "items": rows[:limit]}
+    return {"scenario_id": snap.scenario.id, "category_id": category_id, "order": order, "items": rows[:limit]}
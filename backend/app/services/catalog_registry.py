@@ -0,0 +1,318 @@
+# app/services/catalog_registry.py
+"""
+Registro en memoria (por proceso) del catálogo: países, categorías e
+indicadores. Casi nunca cambian y se consultan todo el tiempo (listados,
+importador de Excel, normalización de cada valor), así que se cargan una
+vez y se resuelven en O(1) por id / iso2 / iso3 / slug / nombre normalizado.
+
+- Carga perezosa: la primera lectura lo arma con 3 queries.
+- Se recarga cuando cambia catalog_version() (bump_catalog en las
+  escrituras) o al vencer el TTL (otros workers no ven nuestros bumps).
+  Una carga durante la que cambió catalog_version() no se instala.
+- `version` es un digest del contenido: igual en todos los procesos con
+  los mismos datos → sirve como ETag de los listados.
+
+Las entradas son dataclasses inmutables (no instancias ORM): se pueden
+compartir entre sesiones e hilos sin riesgo de lazy-load ni expiración.
+Para escribir hay que seguir cargando la fila ORM (db.get).
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import read_routing
+from app.core.cache import catalog_version
+from app.core.search import SearchIndex
+from app.core.text import normalize_text
+from app.models.category import Category
+from app.models.country import Country
+from app.models.indicator import Indicator, IndicatorType, ScaleType
+
+# Segundos antes de recargar aunque no haya bump local. bump_catalog()
+# solo avisa al proceso que escribe: otros workers de uvicorn y los
+# scripts (seed_countries, seed_*, importaciones por consola) no lo ven,
+# así que sus cambios aparecen aquí al vencer este TTL (o antes, para ids
+# nuevos, vía refresh_on_miss). Corto a propósito: recargar son 3 queries.
+TTL_SECONDS = 30.0
+# recarga por "id no encontrado" como mucho una vez por este intervalo
+MISS_REFRESH_SECONDS = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class CountryEntry:
+    id: int
+    iso2: str
+    iso3: str
+    name_es: str
+    name_en: str
+    enabled: bool
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryEntry:
+    id: int
+    name: str
+    slug: str
+    description: str | None
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class IndicatorEntry:
+    id: int
+    name: str
+    slug: str
+    value_type: IndicatorType
+    scale: ScaleType
+    min_value: float | None
+    max_value: float | None
+    unit: str | None
+    source_url: str | None
+    justification: str | None
+    category_id: int
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass
+class Catalog:
+    """Foto inmutable del catálogo; se reemplaza entera al recargar."""
+
+    version: str
+    loaded_at: float
+    source_version: int
+
+    countries: dict[int, CountryEntry] = field(default_factory=dict)
+    country_by_iso2: dict[str, CountryEntry] = field(default_factory=dict)
+    country_by_iso3: dict[str, CountryEntry] = field(default_factory=dict)
+    # iso2 / iso3 / name_es / name_en normalizados → país (como el importador)
+    country_by_name: dict[str, CountryEntry] = field(default_factory=dict)
+    country_ambiguous: set[str] = field(default_factory=set)
+    countries_sorted: list[CountryEntry] = field(default_factory=list)
+
+    categories: dict[int, CategoryEntry] = field(default_factory=dict)
+    category_by_slug: dict[str, CategoryEntry] = field(default_factory=dict)
+    category_by_name: dict[str, CategoryEntry] = field(default_factory=dict)
+    categories_sorted: list[CategoryEntry] = field(default_factory=list)
+
+    indicators: dict[int, IndicatorEntry] = field(default_factory=dict)
+    indicator_by_slug: dict[str, IndicatorEntry] = field(default_factory=dict)
+    indicator_by_name: dict[str, IndicatorEntry] = field(default_factory=dict)
+    indicator_ambiguous: set[str] = field(default_factory=set)
+    indicators_sorted: list[IndicatorEntry] = field(default_factory=list)
+
+    # índices de búsqueda (q=) de los listados; ver app/core/search.py
+    country_search: SearchIndex = field(default_factory=SearchIndex)
+    category_search: SearchIndex = field(default_factory=SearchIndex)
+    indicator_search: SearchIndex = field(default_factory=SearchIndex)
+
+    @property
+    def etag(self) -> str:
+        return f'W/"catalog-{self.version}"'
+
+    # -------- lookups --------
+    def country(self, code_or_id: str | int) -> CountryEntry | None:
+        """Por id (int o dígitos) o por ISO2 / ISO3 (sin importar mayúsculas)."""
+        if isinstance(code_or_id, int):
+            return self.countries.get(code_or_id)
+        c = code_or_id.strip().lower()
+        if c.isdigit():
+            return self.countries.get(int(c))
+        if len(c) == 2:
+            return self.country_by_iso2.get(c)
+        if len(c) == 3:
+            return self.country_by_iso3.get(c)
+        return None
+
+    def indicators_of_category(self, category_id: int) -> list[IndicatorEntry]:
+        return [i for i in self.indicators_sorted if i.category_id == category_id]
+
+
+# El lock solo protege _current / _loading, nunca se tiene durante la
+# query: con ASYNC_DB_ENABLED get_catalog corre vía run_sync en el hilo del
+# event loop, y otra corrutina esperando el lock bloquearía el loop entero.
+_lock = threading.Lock()
+_current: Catalog | None = None
+_loading = False
+
+
+def _load(db: Session) -> Catalog:
+    source_version = catalog_version()
+    countries = db.execute(
+        select(
+            Country.id, Country.iso2, Country.iso3,
+            Country.name_es, Country.name_en, Country.enabled,
+        )
+    ).all()
+    categories = db.execute(
+        select(
+            Category.id, Category.name, Category.slug, Category.description,
+            Category.created_at, Category.updated_at,
+        ).where(Category.deleting.is_(False))
+    ).all()
+    indicators = db.execute(
+        select(
+            Indicator.id, Indicator.name, Indicator.slug,
+            Indicator.value_type, Indicator.scale,
+            Indicator.min_value, Indicator.max_value,
+            Indicator.unit, Indicator.source_url, Indicator.justification,
+            Indicator.category_id, Indicator.created_at, Indicator.updated_at,
+        )
+        # los de categorías en borrado (job de borrado en cascada) no existen ya
+        .join(Category, Category.id == Indicator.category_id)
+        .where(Category.deleting.is_(False))
+    ).all()
+
+    digest = hashlib.sha1()
+    for rows in (countries, categories, indicators):
+        for row in sorted(rows, key=lambda r: r[0]):
+            digest.update(repr(tuple(row)).encode("utf-8"))
+        digest.update(b"|")
+
+    cat = Catalog(
+        version=digest.hexdigest()[:16],
+        loaded_at=time.monotonic(),
+        source_version=source_version,
+    )
+
+    for row in countries:
+        c = CountryEntry(
+            id=row.id,
+            iso2=(row.iso2 or "").lower(),
+            iso3=(row.iso3 or "").lower(),
+            name_es=row.name_es,
+            name_en=row.name_en,
+            enabled=bool(row.enabled),
+        )
+        cat.countries[c.id] = c
+        cat.country_by_iso2[c.iso2] = c
+        cat.country_by_iso3[c.iso3] = c
+        for key in (c.iso2, c.iso3, c.name_es, c.name_en):
+            if not key:
+                continue
+            norm = normalize_text(str(key))
+            prev = cat.country_by_name.get(norm)
+            if prev is not None and prev.id != c.id:
+                cat.country_ambiguous.add(norm)
+            else:
+                cat.country_by_name[norm] = c
+    # mismo orden que el listado en BD: nombre_es, luego iso2
+    cat.countries_sorted = sorted(
+        cat.countries.values(), key=lambda c: (normalize_text(c.name_es), c.iso2)
+    )
+    for c in cat.countries_sorted:
+        cat.country_search.add(c.id, (c.name_es, c.name_en, c.iso2, c.iso3))
+
+    for row in categories:
+        c = CategoryEntry(**row._mapping)
+        cat.categories[c.id] = c
+        cat.category_by_slug[c.slug] = c
+        cat.category_by_name[normalize_text(c.name)] = c
+    cat.categories_sorted = sorted(
+        cat.categories.values(), key=lambda c: normalize_text(c.name)
+    )
+    for c in cat.categories_sorted:
+        cat.category_search.add(c.id, (c.name,), exact_keys=(c.slug,))
+
+    for row in indicators:
+        data = dict(row._mapping)
+        for k in ("min_value", "max_value"):
+            if data[k] is not None:
+                data[k] = float(data[k])
+        ind = IndicatorEntry(**data)
+        cat.indicators[ind.id] = ind
+        cat.indicator_by_slug[ind.slug] = ind
+        norm = normalize_text(ind.name)
+        prev = cat.indicator_by_name.get(norm)
+        if prev is not None and prev.id != ind.id:
+            cat.indicator_ambiguous.add(norm)
+        else:
+            cat.indicator_by_name[norm] = ind
+    cat.indicators_sorted = sorted(
+        cat.indicators.values(), key=lambda i: normalize_text(i.name)
+    )
+    for i in cat.indicators_sorted:
+        cat.indicator_search.add(i.id, (i.name,), exact_keys=(i.slug,))
+    return cat
+
+
+def _is_fresh(cat: Catalog | None) -> bool:
+    return (
+        cat is not None
+        and cat.source_version == catalog_version()
+        and time.monotonic() - cat.loaded_at < TTL_SECONDS
+    )
+
+
+def _reload(db: Session, needed) -> Catalog:
+    """
+    Recarga si needed(_current). Si ya hay otra recarga en curso y el
+    catálogo actual solo venció por TTL (ninguna escritura lo cambió), se
+    devuelve ese en vez de esperar; si no, se carga en paralelo.
+    """
+    global _current, _loading
+    with _lock:
+        if not needed(_current):
+            return _current
+        if _loading and _current is not None and _current.source_version == catalog_version():
+            return _current
+        _loading = True
+    try:
+        cat = _load(db)
+        if cat.source_version != catalog_version():
+            # una escritura terminó durante la carga: puede faltarle; otra vez
+            cat = _load(db)
+    finally:
+        with _lock:
+            _loading = False
+    if not read_routing.may_fill_caches():
+        return cat  # réplica quizá atrasada tras una escritura: solo para esta request
+    with _lock:
+        if cat.source_version != catalog_version():
+            # sigue cambiando: sirve a esta request pero no se instala
+            return cat
+        # otra recarga pudo terminar antes con datos más nuevos
+        if _current is None or cat.loaded_at >= _current.loaded_at:
+            _current = cat
+        return _current
+
+
+def get_catalog(db: Session) -> Catalog:
+    """Catálogo vigente; lo (re)carga con la sesión dada si hace falta."""
+    cat = _current
+    if _is_fresh(cat):
+        return cat
+    return _reload(db, lambda c: not _is_fresh(c))
+
+
+def refresh_on_miss(db: Session) -> Catalog:
+    """
+    Un id que no está puede haberlo creado otro worker (no vemos su bump):
+    recarga, pero como mucho una vez por MISS_REFRESH_SECONDS para que
+    ids inválidos no fuercen una recarga por request.
+    """
+    return _reload(
+        db, lambda c: c is None or time.monotonic() - c.loaded_at >= MISS_REFRESH_SECONDS
+    )
+
+
+def get_indicator(db: Session, indicator_id: int) -> IndicatorEntry | None:
+    ind = get_catalog(db).indicators.get(indicator_id)
+    if ind is None:
+        ind = refresh_on_miss(db).indicators.get(indicator_id)
+    return ind
+
+
+def invalidate() -> None:
+    """Fuerza la recarga en la próxima lectura (tests / scripts)."""
+    global _current
+    with _lock:
+        _current = None
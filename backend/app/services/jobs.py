@@ -0,0 +1,259 @@
+# app/services/jobs.py
+"""
+Trabajos en segundo plano con progreso en la BD (tabla background_jobs).
+
+Hoy: borrados en cascada de escenarios y categorías, que antes eran un
+DELETE sin límite dentro de la request (segundos de locks sobre
+indicator_values). Ahora la request solo marca la fila como `deleting` y
+encola el trabajo; aquí se borra por lotes de DELETE_BATCH_SIZE ids, cada
+lote en su propia transacción corta junto con el avance del progreso.
+
+Corren en un ThreadPoolExecutor del proceso (JOB_WORKERS hilos). Como el
+estado está en la BD, GET /jobs/{id} responde desde cualquier worker.
+
+Lease: cada job tiene dueño (worker) y heartbeat_at. Un hilo por proceso
+renueva cada JOB_HEARTBEAT_SECONDS el heartbeat de todos sus jobs sin
+terminar (también los encolados), y Progress lo renueva en cada avance.
+Solo se retoman jobs cuyo heartbeat venció (JOB_LEASE_SECONDS): al arrancar
+y en cada tick del mismo hilo, así un worker vivo nunca pierde los suyos y
+los de uno caído se retoman aunque se reinicie enseguida. Los handlers son
+idempotentes, así que repetir un lote no hace daño.
+"""
+import logging
+import os
+import secrets
+import socket
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# identifica a este proceso (el token distingue reinicios con el mismo pid)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(3)}"[:100]
+
+ACTIVE_STATUSES = ("pending", "running")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Progress:
+    """Avance del job; se escribe en la misma transacción que el lote."""
+
+    def __init__(self, db: Session, job_id: int):
+        self.db = db
+        self.job_id = job_id
+
+    def set_total(self, total: int) -> None:
+        self.db.execute(update(Job).where(Job.id == self.job_id).values(total=total, heartbeat_at=_now()))
+        self.db.commit()
+
+    def advance(self, n: int) -> None:
+        self.db.execute(
+            update(Job).where(Job.id == self.job_id).values(done=Job.done + n, heartbeat_at=_now())
+        )
+
+
+Handler = Callable[[Session, int, Progress], None]
+HANDLERS: dict[str, Handler] = {}
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    def register(fn: Handler) -> Handler:
+        HANDLERS[kind] = fn
+        return fn
+
+    return register
+
+
+def delete_in_batches(db: Session, model, *where, progress: Progress | None = None,
+                      batch_size: int | None = None) -> int:
+    """
+    Borra las filas de `model` que cumplen `where` en lotes por id
+    ascendente (SELECT ids ... LIMIT n + DELETE ... WHERE id IN), con un
+    commit por lote. Devuelve cuántas borró.
+    """
+    batch_size = batch_size or settings.DELETE_BATCH_SIZE
+    deleted = 0
+    last_id = 0
+    while True:
+        ids = db.scalars(
+            select(model.id).where(*where, model.id > last_id).order_by(model.id).limit(batch_size)
+        ).all()
+        if not ids:
+            return deleted
+        db.execute(delete(model).where(model.id.in_(ids)))
+        if progress is not None:
+            progress.advance(len(ids))
+        db.commit()
+        deleted += len(ids)
+        last_id = ids[-1]
+
+
+# ==========================================
+# Ejecución
+# ==========================================
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_futures: dict[int, Future] = {}
+_heartbeat: threading.Thread | None = None
+_stop: threading.Event | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.JOB_WORKERS), thread_name_prefix="job",
+                )
+    _start_heartbeat()
+    return _executor
+
+
+def _start_heartbeat() -> None:
+    global _heartbeat, _stop
+    if _heartbeat is not None:
+        return
+    with _lock:
+        if _heartbeat is None:
+            _stop = threading.Event()
+            _heartbeat = threading.Thread(
+                target=_heartbeat_loop, args=(_stop,), name="job-heartbeat", daemon=True,
+            )
+            _heartbeat.start()
+
+
+def beat() -> int:
+    """Renueva el lease de los jobs sin terminar de este worker."""
+    db = SessionLocal()
+    try:
+        n = db.execute(
+            update(Job).where(Job.worker == WORKER_ID, Job.status.in_(ACTIVE_STATUSES))
+            .values(heartbeat_at=_now())
+        ).rowcount
+        db.commit()
+        return n
+    finally:
+        db.close()
+
+
+def _heartbeat_loop(stop: threading.Event) -> None:
+    while not stop.wait(settings.JOB_HEARTBEAT_SECONDS):
+        try:
+            beat()
+            resume_unfinished()
+        except Exception:
+            logger.warning("Falló el heartbeat de jobs", exc_info=True)
+
+
+def _schedule(job_id: int) -> None:
+    _futures[job_id] = _get_executor().submit(_run, job_id)
+
+
+def submit(db: Session, kind: str, target_id: int, user_id: int | None = None) -> Job:
+    """Crea el job (pending) y lo encola en este proceso."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Tipo de trabajo desconocido: {kind}")
+    job = Job(kind=kind, target_id=target_id, status="pending", total=0, done=0,
+              worker=WORKER_ID, heartbeat_at=_now(), created_by=user_id)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _schedule(job.id)
+    return job
+
+
+def _run(job_id: int) -> None:
+    db = SessionLocal()
+    # si otro worker lo retomó (lease vencido), el resultado es suyo
+    mine = (Job.id == job_id, Job.worker == WORKER_ID)
+    try:
+        job = db.get(Job, job_id)
+        if job is None or job.status not in ACTIVE_STATUSES or job.worker != WORKER_ID:
+            return
+        job.status = "running"
+        job.heartbeat_at = _now()
+        db.commit()
+        HANDLERS[job.kind](db, job.target_id, Progress(db, job_id))
+        db.execute(update(Job).where(*mine).values(status="done", finished_at=_now()))
+        db.commit()
+    except Exception as e:
+        logger.exception("Falló el job %s", job_id)
+        db.rollback()
+        db.execute(update(Job).where(*mine).values(
+            status="failed", error=str(e)[:500], finished_at=_now(),
+        ))
+        db.commit()
+    finally:
+        db.close()
+        _futures.pop(job_id, None)
+
+
+def wait(job_id: int, timeout: float | None = None) -> None:
+    """Espera a un job encolado en este proceso (tests / scripts)."""
+    future = _futures.get(job_id)
+    if future is not None:
+        future.result(timeout=timeout)
+
+
+def resume_unfinished() -> int:
+    """
+    Retoma los jobs pending / running de otro worker cuyo lease venció (el
+    dueño no renovó el heartbeat en JOB_LEASE_SECONDS: murió o se colgó).
+    El UPDATE condicionado al dueño y heartbeat leídos hace que, si varios
+    workers lo intentan a la vez, solo uno se lo quede.
+    """
+    _start_heartbeat()
+    db = SessionLocal()
+    try:
+        cutoff = _now() - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+        expired = (Job.heartbeat_at.is_(None)) | (Job.heartbeat_at < cutoff)
+        rows = db.execute(
+            select(Job.id, Job.worker, Job.heartbeat_at)
+            .where(Job.status.in_(ACTIVE_STATUSES), Job.worker != WORKER_ID, expired)
+        ).all()
+        resumed = 0
+        for job_id, worker, heartbeat_at in rows:
+            same_lease = (
+                Job.heartbeat_at.is_(None) if heartbeat_at is None else Job.heartbeat_at == heartbeat_at
+            )
+            claimed = db.execute(
+                update(Job).where(Job.id == job_id, Job.worker == worker, same_lease)
+                .values(worker=WORKER_ID, status="pending", heartbeat_at=_now())
+            ).rowcount
+            db.commit()
+            if claimed:
+                _schedule(job_id)
+                resumed += 1
+        if resumed:
+            logger.info("Retomados %d jobs con el lease vencido", resumed)
+        return resumed
+    finally:
+        db.close()
+
+
+def shutdown() -> None:
+    """
+    Al apagar: lo que no terminó queda pending / running y, al vencer su
+    lease, lo retoma otro worker (o este mismo al volver a arrancar).
+    """
+    global _executor, _heartbeat
+    with _lock:
+        if _stop is not None:
+            _stop.set()
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        _heartbeat = None
@@ -0,0 +1,145 @@
+# app/services/public_bundle.py
+from __future__ import annotations
+import logging
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache, catalog_version, scenario_version
+from app.core.responses import CachedPayload, cached_payload
+from app.models.public_description import PublicDescription
+from app.models.scenario import Scenario
+from app.repositories import indicator_value_repo, weights_repo
+from app.services import analytics, catalog_registry
+
+logger = logging.getLogger(__name__)
+
+# bundle serializado (y sus variantes comprimidas) por (escenario, versión de datos)
+_bundles = TTLCache("public_bundle", ttl_seconds=600, maxsize=16)
+
+
+def invalidate() -> None:
+    """Lo llaman las escrituras de descripciones públicas (no llevan versión)."""
+    _bundles.invalidate()
+
+
+def build_bundle(db: Session, sc: Scenario, active: Optional[bool] = None) -> dict:
+    """
+    Todo lo que necesita la página de resultados públicos para un escenario,
+    en una sola estructura (antes eran 8 + N requests). `active` permite
+    armarlo como quedará tras activarlo (ver services/activation.py).
+    """
+    # efectivos: un escenario hijo incluye los heredados
+    cat_weights = weights_repo.get_category_weights(db, sc.id)
+    ind_weights = weights_repo.get_indicator_weights(db, sc.id)
+    category_ids = [cw.category_id for cw in cat_weights]
+
+    # catálogo desde el registro en memoria (ya sin categorías en borrado);
+    # catalog_version() va en la clave del bundle
+    catalog = catalog_registry.get_catalog(db)
+    categories = catalog.categories_sorted
+    countries = [c for c in catalog.countries_sorted if c.enabled]
+
+    indicators_by_category: dict[str, list[dict]] = {
+        str(cid): [
+            {
+                "id": ind.id,
+                "name": ind.name,
+                "slug": ind.slug,
+                "category_id": ind.category_id,
+                "value_type": str(ind.value_type),
+                "unit": ind.unit,
+                "source_url": ind.source_url,
+                "justification": ind.justification,
+            }
+            for ind in catalog.indicators_of_category(cid)
+        ]
+        for cid in category_ids
+    }
+
+    descriptions = db.scalars(select(PublicDescription)).all()
+
+    # un solo snapshot para el ranking global y los de cada categoría
+    snapshot = analytics.load_snapshot(db, sc.id)
+    ranking_global = analytics.ranking_global(db, limit=len(countries) or 1, snapshot=snapshot)
+    ranking_by_category = {
+        str(cid): analytics.ranking_by_category(
+            db, category_id=cid, limit=len(countries) or 1, snapshot=snapshot
+        )["items"]
+        for cid in category_ids
+    }
+
+    return {
+        "scenario": {
+            "id": sc.id,
+            "name": sc.name,
+            "description": sc.description,
+            "active": sc.active if active is None else active,
+        },
+        "category_weights": [
+            {"category_id": cw.category_id, "weight": float(cw.weight)} for cw in cat_weights
+        ],
+        "indicator_weights": [
+            {"indicator_id": iw.indicator_id, "weight": float(iw.weight)} for iw in ind_weights
+        ],
+        "categories": [
+            {"id": c.id, "name": c.name, "slug": c.slug, "description": c.description}
+            for c in categories
+        ],
+        "countries": [
+            {"id": c.id, "iso2": c.iso2, "iso3": c.iso3, "name_es": c.name_es, "name_en": c.name_en}
+            for c in countries
+        ],
+        "indicators_by_category": indicators_by_category,
+        "matrix": indicator_value_repo.get_matrix(db, sc.id),
+        "public_descriptions": [{"key": d.key, "content": d.content} for d in descriptions],
+        "results": {
+            "ranking_global": ranking_global["items"],
+            "ranking_by_category": ranking_by_category,
+        },
+    }
+
+
+def get_bundle(db: Session, scenario_id: Optional[int] = None) -> CachedPayload:
+    """
+    Devuelve el bundle ya serializado (body + ETag + variantes comprimidas).
+    Se arma una sola vez por versión de datos del escenario + versión del
+    catálogo; los hits siguientes no tocan la BD más allá de resolver el
+    escenario.
+    """
+    sc = analytics.resolve_scenario(db, scenario_id)
+    return cached_payload(_bundles, _key(sc, sc.active), lambda: build_bundle(db, sc))
+
+
+def _key(sc: Scenario, active: bool) -> tuple:
+    # el flag active va en la clave: activar no obliga a invalidar nada
+    return (sc.id, scenario_version(sc.id), catalog_version(), active)
+
+
+def prepare_activation(db: Session, sc: Scenario) -> CachedPayload:
+    """
+    Bundle del escenario tal como se servirá una vez activo (más gzip),
+    antes del swap: el primer visitante después no lo arma en frío.
+    """
+    payload = cached_payload(_bundles, _key(sc, True), lambda: build_bundle(db, sc, active=True))
+    payload.encoded("gzip")
+    return payload
+
+
+def warm_active(db: Session) -> None:
+    """Precalcula el bundle del escenario activo (arranque de la app)."""
+    warm(db, None)
+
+
+def warm(db: Session, scenario_id: Optional[int]) -> None:
+    """Precalcula el bundle de un escenario (None = el activo)."""
+    try:
+        payload = get_bundle(db, scenario_id)
+        # la variante comprimida también, para que el primer cliente no la pague
+        payload.encoded("gzip")
+    except ValueError:
+        # escenario inexistente o sin activo: nada que precalentar
+        pass
+    except Exception:
+        logger.exception("No se pudo precalentar el bundle público")
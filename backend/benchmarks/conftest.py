@@ -0,0 +1,105 @@
+# benchmarks/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# ⚠️ IMPORTANTE:
+# Igual que en tests/, no importes app.* aquí arriba: primero fijamos
+# DATABASE_URL para que la app apunte a la BD de benchmarks.
+# Por defecto es un SQLite temporal; BENCH_DATABASE_URL permite usar
+# otra (p.ej. un MySQL desechable). NUNCA se usa DATABASE_URL real.
+_TMP_DIR = tempfile.mkdtemp(prefix="ceipa_bench_")
+os.environ["DATABASE_URL"] = os.environ.get(
+    "BENCH_DATABASE_URL", f"sqlite:///{_TMP_DIR}/bench.sqlite"
+)
+os.environ.setdefault("APP_NAME", "CEIPA Risk (bench)")
+os.environ.setdefault("APP_ENV", "bench")
+os.environ.setdefault("JWT_SECRET", "bench-secret-not-for-production")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("CORS_ORIGINS", '["http://localhost:3000"]')
+# rutas de lectura por el motor async (sqlite+aiosqlite sobre el mismo archivo)
+os.environ.setdefault("ASYNC_DB_ENABLED", "true")
+
+
+# Tamaño del dataset: países x categorías x indicadores por categoría x escenarios.
+# Por defecto es chico para que la suite corra rápido; para medir a escala de
+# producción: BENCH_SCALE=200x8x10x4 (ver benchmarks/README.md).
+_dims = [int(x) for x in os.environ.get("BENCH_SCALE", "60x4x5x2").lower().split("x")]
+SCALE = dict(zip(("countries", "categories", "indicators_per_category", "scenarios"), _dims))
+
+
+@pytest.fixture(scope="session")
+def bench_engine():
+    from app.db import Base, engine
+    import app.models  # noqa: F401  (registra todas las tablas)
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture(scope="session")
+def dataset(bench_engine):
+    from sqlalchemy import text
+    from app.db import SessionLocal
+    from app.scripts.generate_synthetic_dataset import generate
+
+    db = SessionLocal()
+    try:
+        generate(db, **SCALE)
+    finally:
+        db.close()
+
+    # estadísticas para que el planner decida como en una BD con datos
+    if bench_engine.dialect.name == "sqlite":
+        with bench_engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+    return bench_engine
+
+
+@pytest.fixture(scope="session")
+def scale(dataset) -> dict:
+    """Dimensiones del dataset cargado (BENCH_SCALE)."""
+    return dict(SCALE)
+
+
+@pytest.fixture()
+def db(dataset):
+    from app.db import SessionLocal
+
+    s = SessionLocal()
+    try:
+        yield s
+    finally:
+        s.close()
+
+
+@pytest.fixture(scope="session")
+def client(dataset):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture()
+def query_budget(client):
+    """
+    query_budget(url, max_queries): hace GET con las caches de resultados
+    vacías (el catálogo en memoria sí queda cargado) y falla si la request
+    usó más queries de las permitidas (cabecera X-DB-Queries).
+    """
+    from app.core.cache import CACHES
+
+    def check(url: str, max_queries: int, **kwargs):
+        for cache in CACHES.values():
+            cache.invalidate()
+        r = client.get(url, **kwargs)
+        assert r.status_code == 200, r.text
+        used = int(r.headers["X-DB-Queries"])
+        assert used <= max_queries, f"{url}: {used} queries (presupuesto {max_queries})"
+        return r
+
+    return check
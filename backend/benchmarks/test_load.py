@@ -0,0 +1,51 @@
+# benchmarks/test_load.py
+"""Arnés de carga (app/scripts/load_test.py) en proceso contra el dataset."""
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.security import create_access_token
+from app.models.indicator_value import IndicatorValue
+from app.models.user import User
+from app.scripts import load_test
+
+
+@pytest.fixture()
+def writer(db):
+    u = User(name="Load", email="load.bench@ceipa.com", role="ANALISTA", password_hash="x")
+    db.add(u)
+    db.commit()
+    yield {"Authorization": "Bearer " + create_access_token(subject=str(u.id))}
+    # loaded_by apunta al usuario (FK en MySQL)
+    db.query(IndicatorValue).filter(IndicatorValue.loaded_by == u.id).update({IndicatorValue.loaded_by: None})
+    db.delete(u)
+    db.commit()
+
+
+def test_parse_mix():
+    assert load_test.parse_mix("ranking_global=3, countries") == {"ranking_global": 3.0, "countries": 1.0}
+    with pytest.raises(ValueError):
+        load_test.parse_mix("nope=1")
+
+
+def test_mixed_load_report(dataset, scale, writer):
+    from app.main import app
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+            target = await load_test.discover(client, writer)
+            return target, await load_test.run_load(
+                client, target, load_test.DEFAULT_MIX, concurrency=6, requests=120
+            )
+
+    target, report = asyncio.run(run())
+    assert len(target.country_ids) == scale["countries"]
+    assert report["requests"] == 120
+    assert report["errors"] == 0, report["status_codes"]
+    assert report["throughput_rps"] > 0
+    lat = report["latency_ms"]
+    assert 0 < lat["p50"] <= lat["p95"] <= lat["p99"] <= lat["max"]
+    assert set(report["by_op"]) == set(load_test.DEFAULT_MIX)
+    assert sum(op["requests"] for op in report["by_op"].values()) == 120
@@ -0,0 +1,45 @@
+# benchmarks/test_overhead.py
+"""Costo por request / por llamada de la instrumentación siempre activa."""
+import asyncio
+import time
+
+from app.core import tracing
+from app.core.http_metrics import MetricsMiddleware
+
+
+def test_middleware_overhead():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def send(message):
+        pass
+
+    wrapped = MetricsMiddleware(app)
+    scope = {"type": "http", "method": "GET", "path": "/x"}
+    n = 20000
+
+    async def run(target):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            await target(scope, None, send)
+        return time.perf_counter() - t0
+
+    base = asyncio.run(run(app))
+    timed = asyncio.run(run(wrapped))
+    per_request_us = (timed - base) / n * 1e6
+    # holgado para CI; en una máquina normal ronda 3-6 µs
+    assert per_request_us < 50, per_request_us
+
+
+def test_unsampled_overhead():
+    @tracing.traced
+    def f(x):
+        return x
+
+    n = 100_000
+    t0 = time.perf_counter()
+    for i in range(n):
+        f(i)
+    per_call = (time.perf_counter() - t0) / n
+    assert per_call < 5e-6, f"{per_call * 1e9:.0f} ns por llamada sin muestrear"
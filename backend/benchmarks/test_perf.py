@@ -0,0 +1,197 @@
+# benchmarks/test_perf.py
+"""
+Micro-benchmarks (pytest-benchmark) de los caminos calientes sobre el
+dataset sintético: rankings, índices, listado de valores, guardado
+masivo, importación de Excel y exportación de la matriz.
+
+Cada benchmark tiene además un techo absoluto (mediana) para cortar
+regresiones groseras aunque no haya baseline guardado; se escala con el
+tamaño del dataset (BENCH_SCALE). La comparación fina contra un baseline
+se hace con --benchmark-compare (ver benchmarks/README.md).
+"""
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import func, select
+
+from app.core.cache import CACHES
+from app.core.security import create_access_token
+from app.models.indicator_value import IndicatorValue
+from app.models.scenario import Scenario
+from app.models.user import User
+from app.repositories import indicator_value_repo
+from app.schemas.indicator_value import IndicatorValueBulkPayload
+from app.services import analytics, catalog_registry
+
+# techos de la mediana (segundos) para el dataset por defecto (60x4x5x2)
+THRESHOLDS = {
+    "ranking_global": 0.05,
+    "ranking_by_category": 0.05,
+    "global_index": 0.01,
+    "category_index": 0.01,
+    "list_values_page": 0.05,
+    "list_values_cursor": 0.05,
+    "bulk_apply": 1.0,
+    "excel_import": 10.0,
+    "matrix_export": 0.2,
+}
+_DEFAULT_CELLS = 60 * 4 * 5 * 2
+
+
+def _clear_caches():
+    for cache in CACHES.values():
+        cache.invalidate()
+
+
+@pytest.fixture()
+def check(benchmark, scale):
+    """Mide y falla si la mediana supera el techo (escalado por tamaño)."""
+    cells = scale["countries"] * scale["categories"] * scale["indicators_per_category"] * scale["scenarios"]
+    factor = max(1.0, cells / _DEFAULT_CELLS)
+
+    def _check(name: str):
+        if benchmark.stats is None:  # --benchmark-disable: solo corre una vez
+            return
+        median = benchmark.stats.stats.median
+        limit = THRESHOLDS[name] * factor
+        assert median <= limit, f"{name}: mediana {median * 1000:.1f} ms > {limit * 1000:.0f} ms"
+
+    return _check
+
+
+@pytest.fixture()
+def admin_headers(db):
+    u = User(name="Admin", email="admin.perf@ceipa.com", role="ADMIN", password_hash="x")
+    db.add(u)
+    db.commit()
+    yield {"Authorization": "Bearer " + create_access_token(subject=str(u.id))}
+    db.delete(u)
+    db.commit()
+
+
+def _last_scenario_cells(db) -> tuple[int, list[tuple[int, int, float]]]:
+    """Celdas existentes del último escenario (no el activo) con su raw_value."""
+    scenario_id = db.scalar(select(func.max(Scenario.id)))
+    rows = db.execute(
+        select(IndicatorValue.country_id, IndicatorValue.indicator_id, IndicatorValue.raw_value)
+        .where(IndicatorValue.scenario_id == scenario_id)
+    ).all()
+    return scenario_id, [(c, i, float(v)) for c, i, v in rows]
+
+
+# ---------- analytics ----------
+
+def test_ranking_global(benchmark, check, db):
+    result = benchmark(analytics.ranking_global, db, limit=1000)
+    assert result["items"]
+    check("ranking_global")
+
+
+def test_ranking_by_category(benchmark, check, db):
+    cat_id = catalog_registry.get_catalog(db).categories_sorted[0].id
+    result = benchmark(analytics.ranking_by_category, db, cat_id, limit=1000)
+    assert result["items"]
+    check("ranking_by_category")
+
+
+def test_global_index(benchmark, check, db):
+    cid = catalog_registry.get_catalog(db).countries_sorted[0].id
+    result = benchmark(analytics.global_index, db, cid)
+    assert result["index"] is not None
+    check("global_index")
+
+
+def test_category_index(benchmark, check, db):
+    cat = catalog_registry.get_catalog(db)
+    result = benchmark(
+        analytics.category_index, db, cat.countries_sorted[0].id, cat.categories_sorted[0].id
+    )
+    assert result["index"] is not None
+    check("category_index")
+
+
+# ---------- listado de valores ----------
+
+def test_list_values_page(benchmark, check, db):
+    def run():
+        _clear_caches()  # incluye el COUNT(*) cacheado
+        return indicator_value_repo.list_values(db, 1, None, None, page=1, limit=500, sort="cell")
+
+    result = benchmark(run)
+    assert result["items"]
+    check("list_values_page")
+
+
+def test_list_values_cursor(benchmark, check, db):
+    first = indicator_value_repo.list_values(
+        db, 1, None, None, page=1, limit=200, sort="cell", include_total=False
+    )
+    cursor = first["next_cursor"]
+    assert cursor
+
+    result = benchmark(
+        indicator_value_repo.list_values, db, 1, None, None, page=1, limit=200,
+        cursor=cursor, sort="cell", include_total=False,
+    )
+    assert result["items"]
+    check("list_values_cursor")
+
+
+# ---------- escrituras masivas ----------
+
+def test_bulk_apply(benchmark, check, db):
+    # reescribe los mismos valores del último escenario: idempotente entre rondas
+    scenario_id, cells = _last_scenario_cells(db)
+    cells = cells[:5000]
+    payload = IndicatorValueBulkPayload(
+        scenario_id=scenario_id,
+        items=[{"op": "upsert", "country_id": c, "indicator_id": i, "raw_value": v} for c, i, v in cells],
+    )
+
+    result = benchmark.pedantic(
+        indicator_value_repo.bulk_apply, args=(db, payload, None), rounds=5, iterations=1
+    )
+    assert result["errors"] == 0 and result["committed"]
+    check("bulk_apply")
+
+
+def test_excel_import(benchmark, check, client, db, admin_headers):
+    scenario_id, cells = _last_scenario_cells(db)
+    cat = catalog_registry.get_catalog(db)
+    values = {(c, i): v for c, i, v in cells}
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["País"] + [ind.name for ind in cat.indicators_sorted])
+    for c in cat.countries_sorted:
+        ws.append([c.name_es] + [values.get((c.id, ind.id)) for ind in cat.indicators_sorted])
+    buf = BytesIO()
+    wb.save(buf)
+    content = buf.getvalue()
+
+    def run():
+        r = client.post(
+            f"/api/v1/indicator-values/import-matrix-excel?scenario_id={scenario_id}",
+            files={"file": ("matriz.xlsx", content)},
+            headers=admin_headers,
+        )
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    result = benchmark.pedantic(run, rounds=2, iterations=1)
+    assert result["processed"] == len(cells)
+    check("excel_import")
+
+
+# ---------- exportación ----------
+
+def test_matrix_export(benchmark, check, client):
+    def run():
+        _clear_caches()
+        r = client.get("/api/v1/scenarios/1/matrix")
+        assert r.status_code == 200
+        return r
+
+    benchmark(run)
+    check("matrix_export")
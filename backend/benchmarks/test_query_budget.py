@@ -0,0 +1,105 @@
+# benchmarks/test_query_budget.py
+"""
+Presupuesto de queries por endpoint: un regreso a queries por país (N+1)
+rompe el build en vez de notarse en producción.
+"""
+import time
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.core import query_stats
+from app.core.security import create_access_token
+from app.models.job import Job
+from app.models.user import User
+from app.repositories import scenario_repo
+from app.services import catalog_registry, jobs
+
+BUDGETS = [
+    ("/api/v1/public/ranking/global?limit=200", 5),
+    ("/api/v1/public/ranking/category?category_id=1&limit=200", 5),
+    ("/api/v1/public/index/global?country_id=1", 5),
+    ("/api/v1/public/index/category?country_id=1&category_id=1", 5),
+    ("/api/v1/public/bundle", 9),  # catálogo desde el registro en memoria
+    ("/api/v1/scenarios/1/matrix", 2),
+    ("/api/v1/countries?limit=500", 0),
+]
+
+
+@pytest.mark.parametrize("url,budget", BUDGETS)
+def test_query_budget(query_budget, client, url, budget):
+    client.get("/api/v1/countries")  # catálogo en memoria ya cargado
+    query_budget(url, budget)
+
+
+def test_headers_and_db_time(client):
+    r = client.get("/api/v1/public/ranking/global?limit=5&order=asc")
+    assert int(r.headers["X-DB-Queries"]) >= 0
+    assert float(r.headers["X-DB-Time"]) >= 0
+    assert query_stats.current() is None  # no queda fijado fuera de la request
+
+
+def test_no_headers_in_production(client, monkeypatch):
+    monkeypatch.setattr(query_stats.settings, "APP_ENV", "production")
+    assert "X-DB-Queries" not in client.get("/health").headers
+
+
+@contextmanager
+def counted_queries(engine):
+    statements: list[str] = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+@pytest.fixture()
+def admin(db):
+    u = User(name="Admin", email="admin.budget@ceipa.com", role="ADMIN", password_hash="x")
+    db.add(u)
+    db.commit()
+    yield u
+    db.query(Job).filter(Job.created_by == u.id).update({Job.created_by: None})
+    db.query(User).filter(User.id == u.id).delete()
+    db.commit()
+
+
+def test_catalog_loaded_once(db, dataset):
+    catalog_registry.invalidate()
+    with counted_queries(dataset) as first:
+        catalog_registry.get_catalog(db)
+    assert len(first) == 3
+
+    with counted_queries(dataset) as later:
+        for _ in range(10):
+            catalog_registry.get_catalog(db).country("c01")
+    assert later == []
+
+
+def test_cached_user_without_select(client, dataset, admin):
+    headers = {"Authorization": "Bearer " + create_access_token(subject=str(admin.id))}
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    with counted_queries(dataset) as seen:
+        for _ in range(5):
+            assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    assert not [s for s in seen if "FROM users" in s]
+
+
+def test_clone_is_set_based(client, db, admin):
+    headers = {"Authorization": "Bearer " + create_access_token(subject=str(admin.id))}
+    t0 = time.perf_counter()
+    r = client.post("/api/v1/scenarios/1/clone", json={"name": "Copia medida"}, headers=headers)
+    elapsed = time.perf_counter() - t0
+    assert r.status_code == 201, r.text
+    try:
+        # un INSERT ... SELECT por tabla, no una query por fila
+        assert int(r.headers["X-DB-Queries"]) <= 15
+        assert elapsed < 1.0, f"clonar tardó {elapsed:.3f}s"
+    finally:
+        jobs.wait(scenario_repo.delete(db, scenario_repo.get_by_id(db, r.json()["id"])).id, timeout=30)
@@ -0,0 +1,113 @@
+# benchmarks/test_query_plans.py
+"""
+Comprueba con EXPLAIN QUERY PLAN que las consultas REALES de analytics y
+del listado de valores usan los índices de indicator_values
+(ver migración b7d2e4f1a6c3).
+
+Las sentencias se capturan ejecutando las funciones de verdad, así que si
+alguien cambia la forma de la query (p.ej. vuelve a hacer SELECT de la
+entidad completa) el plan deja de ser index-only y el test falla.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.repositories import indicator_value_repo
+from app.services import analytics
+
+
+@pytest.fixture(autouse=True)
+def _only_sqlite(dataset):
+    if dataset.dialect.name != "sqlite":
+        pytest.skip("EXPLAIN QUERY PLAN solo se interpreta en SQLite")
+
+
+@contextmanager
+def captured_sql(engine):
+    statements: list[tuple[str, tuple]] = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+def value_plans(engine, statements, table_only: bool = True) -> list[tuple[str, list[str]]]:
+    """Plan de cada sentencia que lee indicator_values (por defecto solo las líneas de esa tabla)."""
+    plans = []
+    with engine.connect() as conn:
+        for statement, params in statements:
+            if "indicator_values" not in statement or not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params).all()
+            details = [r[-1] for r in rows if not table_only or "indicator_values" in r[-1]]
+            plans.append((statement, details))
+    return plans
+
+
+def assert_index_only(plans):
+    assert plans, "no se capturó ninguna consulta sobre indicator_values"
+    for statement, details in plans:
+        for d in details:
+            assert "USING COVERING INDEX" in d, f"{d}\n{statement}"
+
+
+def test_category_index_is_index_only(dataset, db):
+    with captured_sql(dataset) as stmts:
+        analytics.category_index(db, country_id=1, category_id=1, scenario_id=1)
+    assert_index_only(value_plans(dataset, stmts))
+
+
+def test_ranking_global_is_index_only(dataset, db):
+    with captured_sql(dataset) as stmts:
+        analytics.ranking_global(db, limit=10, scenario_id=1)
+    assert_index_only(value_plans(dataset, stmts))
+
+
+def test_ranking_by_category_is_index_only(dataset, db):
+    with captured_sql(dataset) as stmts:
+        analytics.ranking_by_category(db, category_id=2, limit=10, scenario_id=2)
+    assert_index_only(value_plans(dataset, stmts))
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"scenario_id": 1, "country_id": None, "indicator_id": None},
+        {"scenario_id": 1, "country_id": 3, "indicator_id": None},
+        {"scenario_id": 2, "country_id": None, "indicator_id": 5},
+    ],
+)
+def test_value_count_is_index_only(dataset, db, filters):
+    with captured_sql(dataset) as stmts:
+        indicator_value_repo.count_values(db, **filters)
+    assert_index_only(value_plans(dataset, stmts))
+
+
+@pytest.mark.parametrize(
+    "sort, country_id",
+    [("id", None), ("cell", None), ("cell", 3)],
+)
+def test_value_listing_uses_index_without_sort(dataset, db, sort, country_id):
+    with captured_sql(dataset) as stmts:
+        page = indicator_value_repo.list_values(
+            db, 1, country_id, None, 1, 5, sort=sort, include_total=False
+        )
+        assert page["next_cursor"]
+        indicator_value_repo.list_values(
+            db, 1, country_id, None, 1, 5, cursor=page["next_cursor"], sort=sort, include_total=False
+        )
+
+    plans = value_plans(dataset, stmts, table_only=False)
+    assert len(plans) == 2
+    for statement, details in plans:
+        # el listado devuelve filas completas: no puede ser index-only, pero
+        # sí debe buscar por índice y salir ya ordenado (sin temp b-tree)
+        iv = [d for d in details if "indicator_values" in d]
+        assert iv and all("INDEX" in d for d in iv), f"{details}\n{statement}"
+        assert not any("TEMP B-TREE" in d for d in details), f"{details}\n{statement}"
@@ -0,0 +1,94 @@
+# benchmarks/test_startup.py
+"""
+Arranque en frío: qué importa `app.main` (python -X importtime) y cuánto
+tarda un uvicorn nuevo en responder el primer /health.
+
+Las dependencias pesadas (openpyxl, passlib/bcrypt, jose/cryptography)
+se cargan en el primer uso, no al importar la app.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+LAZY_MODULES = ("openpyxl", "passlib", "jose", "bcrypt", "cryptography")
+
+# techos generosos (segundos): cortan regresiones groseras, no miden fino
+IMPORT_CEILING = 3.0
+FIRST_HEALTH_CEILING = 10.0
+
+
+def importtime(module: str) -> dict[str, int]:
+    """{módulo: µs acumulados} según `python -X importtime -c "import <module>"`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND, env=os.environ.copy(), capture_output=True, text=True, check=True,
+    )
+    out = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        out[name.strip()] = int(cumulative)
+    return out
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def first_health_seconds() -> float:
+    """Desde lanzar uvicorn hasta el primer 200 de /health."""
+    port = _free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND, env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        while time.perf_counter() - t0 < 30:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn terminó: {proc.stderr.read().decode()[-2000:]}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    return time.perf_counter() - t0
+            except httpx.TransportError:
+                pass
+            time.sleep(0.005)
+        raise TimeoutError("/health no respondió en 30 s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def test_heavy_modules_are_lazy():
+    modules = importtime("app.main")
+    loaded = sorted({m.split(".")[0] for m in modules} & set(LAZY_MODULES))
+    assert loaded == [], f"se importan al arrancar: {loaded}"
+    assert modules["app.main"] / 1e6 < IMPORT_CEILING
+
+
+def test_lazy_modules_load_on_first_use():
+    code = (
+        "import sys; from app.core import security\n"
+        "assert 'jose' not in sys.modules and 'passlib' not in sys.modules\n"
+        "assert security.decode_token(security.create_access_token(subject='7')) == '7'\n"
+        "assert 'jose' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND, env=os.environ.copy(), check=True)
+
+
+def test_first_health(benchmark, dataset):
+    seconds = benchmark.pedantic(first_health_seconds, rounds=3, iterations=1)
+    assert seconds < FIRST_HEALTH_CEILING
+    if benchmark.stats is not None:
+        assert benchmark.stats.stats.median < FIRST_HEALTH_CEILING
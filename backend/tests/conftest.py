@@ -3,7 +3,6 @@ import os
 import uuid
 import subprocess
 import pytest
-import psycopg
 
 # ⚠️ IMPORTANTE:
 # No importes nada de app.* aquí arriba. Lo haremos DESPUÉS de crear la BD temporal
@@ -35,6 +34,8 @@ def test_database():
     Crea una BD temporal, aplica migraciones Alembic y la borra al final.
     Además exporta DB_NAME a esa BD antes de importar la app.
     """
+    import psycopg  # solo esta suite usa Postgres (tests/synthetic corre sin él)
+
     base_name = _current_db_name()
     suffix = uuid.uuid4().hex[:6]
     test_db_name = f"{base_name}_test_{suffix}"
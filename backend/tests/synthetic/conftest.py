@@ -0,0 +1,162 @@
+# tests/synthetic/conftest.py
+"""
+Tests de comportamiento sobre el dataset sintético (SQLite temporal), sin
+Postgres: escenarios, herencia, jobs, caches, auth, métricas...
+Los tiempos y presupuestos de queries viven en benchmarks/.
+
+    cd backend && python -m pytest -q tests/synthetic
+
+Se corre aparte de benchmarks/ (cada suite arma su propia BD al importar).
+"""
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# ⚠️ IMPORTANTE:
+# Igual que en tests/conftest.py, no importes app.* aquí arriba: primero
+# fijamos DATABASE_URL para que la app apunte al SQLite temporal.
+# NUNCA se usa DATABASE_URL real.
+_TMP_DIR = tempfile.mkdtemp(prefix="ceipa_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/tests.sqlite"
+os.environ.setdefault("APP_NAME", "CEIPA Risk (tests)")
+os.environ.setdefault("APP_ENV", "test")
+os.environ.setdefault("JWT_SECRET", "test-secret-not-for-production")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("CORS_ORIGINS", '["http://localhost:3000"]')
+# rutas de lectura por el motor async (sqlite+aiosqlite sobre el mismo archivo)
+os.environ.setdefault("ASYNC_DB_ENABLED", "true")
+
+# chico a propósito: los tests miran comportamiento, no escala
+SCALE = {"countries": 60, "categories": 4, "indicators_per_category": 5, "scenarios": 2}
+
+
+# -----------------------------
+# BD sintética por sesión
+# -----------------------------
+@pytest.fixture(scope="session")
+def dataset():
+    from app.db import Base, SessionLocal, engine
+    from app.scripts.generate_synthetic_dataset import generate
+    import app.models  # noqa: F401  (registra todas las tablas)
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        generate(db, **SCALE)
+    finally:
+        db.close()
+    return engine
+
+
+@pytest.fixture(scope="session")
+def scale(dataset) -> dict:
+    return dict(SCALE)
+
+
+@pytest.fixture()
+def db(dataset):
+    from app.db import SessionLocal
+
+    s = SessionLocal()
+    try:
+        yield s
+    finally:
+        s.close()
+
+
+@pytest.fixture(scope="session")
+def client(dataset):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
+# -----------------------------
+# Usuarios
+# -----------------------------
+@pytest.fixture()
+def make_user(db):
+    """
+    make_user(role="ADMIN", password_hash="x") -> User con email único.
+    Al final se sueltan sus jobs y se borran con un DELETE directo (algún
+    test los borra por la API y el identity map no se entera); también se
+    sacan de la cache de auth, que SQLite reutiliza los ids.
+    """
+    from sqlalchemy import delete, update
+    from app.core import auth_cache
+    from app.models.job import Job
+    from app.models.user import User
+
+    created: list[int] = []
+
+    def make(role: str = "ADMIN", password_hash: str = "x", name: str | None = None):
+        u = User(
+            name=name or role.title(),
+            email=f"{role.lower()}.{uuid.uuid4().hex[:8]}@ceipa.com",
+            role=role,
+            password_hash=password_hash,
+        )
+        db.add(u)
+        db.commit()
+        created.append(u.id)
+        return u
+
+    yield make
+    if created:
+        db.execute(update(Job).where(Job.created_by.in_(created)).values(created_by=None))
+        db.execute(delete(User).where(User.id.in_(created)))
+        db.commit()
+        for user_id in created:
+            auth_cache.invalidate_user(user_id)
+
+
+@pytest.fixture(scope="session")
+def auth_headers():
+    """auth_headers(user) -> cabecera Authorization con un token válido."""
+    from app.core.security import create_access_token
+
+    def headers(user) -> dict:
+        return {"Authorization": "Bearer " + create_access_token(subject=str(user.id))}
+
+    return headers
+
+
+@pytest.fixture()
+def admin_headers(make_user, auth_headers) -> dict:
+    return auth_headers(make_user("ADMIN"))
+
+
+# -----------------------------
+# Escenarios
+# -----------------------------
+@pytest.fixture()
+def cleanup_scenarios(db):
+    """
+    Lista de ids de escenarios a borrar al final (en orden inverso: los
+    hijos antes que el padre), esperando al job de borrado.
+    """
+    from app.repositories import scenario_repo
+    from app.services import jobs
+
+    created: list[int] = []
+    yield created
+    db.expire_all()
+    for scenario_id in reversed(created):
+        sc = scenario_repo.get_by_id(db, scenario_id)
+        if sc is not None:
+            jobs.wait(scenario_repo.delete(db, sc).id, timeout=30)
+
+
+@pytest.fixture()
+def scenario(db, cleanup_scenarios) -> int:
+    """Copia inactiva del escenario 1 (se puede escribir sin afectar a otros tests)."""
+    from app.repositories import scenario_repo
+
+    sc = scenario_repo.clone(db, scenario_repo.get_by_id(db, 1), "Escenario de prueba", None, None)
+    cleanup_scenarios.append(sc.id)
+    return sc.id
@@ -0,0 +1,64 @@
+# tests/synthetic/test_activation.py
+"""Activación en dos fases: precalentar el escenario nuevo y recién después el swap."""
+import threading
+
+import pytest
+from sqlalchemy import select
+
+from app.models.scenario import Scenario
+from app.repositories import scenario_repo
+from app.services import jobs, public_bundle
+
+
+@pytest.fixture()
+def candidate(db, scenario):
+    """(activo actual, escenario a activar); al final se restaura el activo."""
+    current = db.scalar(select(Scenario.id).where(Scenario.active.is_(True)))
+    yield current, scenario
+    scenario_repo.set_active_exclusive(db, current)
+
+
+def test_old_scenario_served_until_swap(client, admin_headers, candidate, monkeypatch):
+    current, target = candidate
+    assert client.get("/api/v1/public/bundle").json()["scenario"]["id"] == current
+
+    release = threading.Event()
+    real_prepare = public_bundle.prepare_activation
+
+    def slow_prepare(db, sc):
+        assert release.wait(10)
+        return real_prepare(db, sc)
+
+    monkeypatch.setattr(public_bundle, "prepare_activation", slow_prepare)
+
+    r = client.post(f"/api/v1/scenarios/{target}/activate", headers=admin_headers)
+    assert r.status_code == 202, r.text
+    job_id = r.json()["id"]
+    try:
+        status = client.get(f"/api/v1/scenarios/{target}/activation", headers=admin_headers).json()
+        assert status["state"] == "warming" and status["active"] is False
+        assert client.get("/api/v1/public/bundle").json()["scenario"]["id"] == current
+        # una sola activación a la vez
+        assert client.post(f"/api/v1/scenarios/{current}/activate", headers=admin_headers).status_code == 409
+    finally:
+        release.set()
+    jobs.wait(job_id, timeout=30)
+
+    status = client.get(f"/api/v1/scenarios/{target}/activation", headers=admin_headers).json()
+    assert status["state"] == "active" and status["job"]["status"] == "done"
+
+    # el primer visitante tras el swap ya encuentra el bundle armado
+    misses = public_bundle._bundles.misses
+    body = client.get("/api/v1/public/bundle").json()
+    assert body["scenario"]["id"] == target and body["scenario"]["active"] is True
+    assert public_bundle._bundles.misses == misses
+
+
+def test_patch_active_queues_activation(client, admin_headers, candidate):
+    _, target = candidate
+    r = client.patch(f"/api/v1/scenarios/{target}", json={"active": True}, headers=admin_headers)
+    assert r.status_code == 200, r.text
+    assert r.json()["active"] is False  # todavía no: primero se precalienta
+    jobs.wait(int(r.headers["X-Activation-Job"]), timeout=30)
+
+    assert client.get("/api/v1/scenarios/active").json()["id"] == target
@@ -0,0 +1,24 @@
+# tests/synthetic/test_auth_cache.py
+"""
+get_current_user con cache de tokens / usuarios: los cambios de rol y los
+borrados se ven de inmediato (la ausencia de SELECT por request se mide en
+benchmarks/test_query_budget.py).
+"""
+
+
+def test_role_change_and_delete_invalidate(client, make_user, auth_headers):
+    admin, analyst = make_user("ADMIN"), make_user("ANALISTA")
+    headers = auth_headers(analyst)
+    assert client.get("/api/v1/auth/me", headers=headers).json()["role"] == "ANALISTA"
+
+    r = client.patch(f"/api/v1/users/{analyst.id}", json={"role": "PUBLICO"}, headers=auth_headers(admin))
+    assert r.status_code == 200
+    assert client.get("/api/v1/auth/me", headers=headers).json()["role"] == "PUBLICO"
+
+    assert client.delete(f"/api/v1/users/{analyst.id}", headers=auth_headers(admin)).status_code == 204
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+
+def test_invalid_token_rejected(client):
+    r = client.get("/api/v1/auth/me", headers={"Authorization": "Bearer not-a-jwt"})
+    assert r.status_code == 401
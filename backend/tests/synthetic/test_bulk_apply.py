@@ -0,0 +1,78 @@
+# tests/synthetic/test_bulk_apply.py
+"""Guardado masivo (bulk_apply): atomicidad, errores por ítem y borrados."""
+from sqlalchemy import select
+
+from app.models.indicator_value import IndicatorValue
+from app.repositories import indicator_value_repo
+from app.schemas.indicator_value import IndicatorValueBulkPayload
+
+
+def _rows(db, scenario_id: int, limit: int = 3) -> list[IndicatorValue]:
+    return db.scalars(
+        select(IndicatorValue)
+        .where(IndicatorValue.scenario_id == scenario_id, IndicatorValue.raw_value.is_not(None))
+        .order_by(IndicatorValue.id).limit(limit)
+    ).all()
+
+
+def _apply(db, scenario_id: int, items: list[dict], atomic: bool = False) -> dict:
+    payload = IndicatorValueBulkPayload(scenario_id=scenario_id, atomic=atomic, items=items)
+    return indicator_value_repo.bulk_apply(db, payload, None)
+
+
+def _raw(db, scenario_id: int, country_id: int, indicator_id: int):
+    db.expire_all()
+    return db.scalar(select(IndicatorValue.raw_value).where(
+        IndicatorValue.scenario_id == scenario_id,
+        IndicatorValue.country_id == country_id,
+        IndicatorValue.indicator_id == indicator_id,
+    ))
+
+
+def test_per_item_errors(db, scenario):
+    a, b, _ = _rows(db, scenario)
+    result = _apply(db, scenario, [
+        {"op": "update", "id": a.id, "raw_value": float(b.raw_value)},
+        {"op": "upsert", "country_id": 99999, "indicator_id": a.indicator_id, "raw_value": 1.0},
+        {"op": "upsert", "country_id": a.country_id, "indicator_id": 99999, "raw_value": 1.0},
+        {"op": "update", "id": 10**9, "raw_value": 1.0},
+    ])
+    assert result["committed"] and result["processed"] == 1 and result["errors"] == 3
+    statuses = [(it["status"], it.get("error")) for it in result["items"]]
+    assert statuses[0] == ("updated", None)
+    assert statuses[1] == ("error", "País no existe")
+    assert statuses[2] == ("error", "Indicador no existe")
+    assert statuses[3][0] == "error"
+    assert float(_raw(db, scenario, a.country_id, a.indicator_id)) == float(b.raw_value)
+
+
+def test_atomic_rolls_back_everything(db, scenario):
+    a, b, _ = _rows(db, scenario)
+    before = float(a.raw_value)
+    result = _apply(db, scenario, [
+        {"op": "update", "id": a.id, "raw_value": float(b.raw_value)},
+        {"op": "upsert", "country_id": 99999, "indicator_id": a.indicator_id, "raw_value": 1.0},
+    ], atomic=True)
+    assert not result["committed"] and result["processed"] == 0 and result["errors"] == 1
+    assert float(_raw(db, scenario, a.country_id, a.indicator_id)) == before
+
+
+def test_delete_by_id(db, scenario):
+    a, _, _ = _rows(db, scenario)
+    cell = (a.country_id, a.indicator_id)
+    result = _apply(db, scenario, [{"op": "delete", "id": a.id}])
+    assert result["items"][0]["status"] == "deleted" and result["committed"]
+    assert _raw(db, scenario, *cell) is None
+    assert db.get(IndicatorValue, a.id) is None
+
+
+def test_delete_then_upsert_same_cell(db, scenario):
+    a, b, _ = _rows(db, scenario)
+    cell = (a.country_id, a.indicator_id)
+    result = _apply(db, scenario, [
+        {"op": "delete", "id": a.id},
+        {"op": "upsert", "country_id": cell[0], "indicator_id": cell[1], "raw_value": float(b.raw_value)},
+    ])
+    assert [it["status"] for it in result["items"]] == ["deleted", "created"]
+    assert result["committed"] and result["errors"] == 0
+    assert float(_raw(db, scenario, *cell)) == float(b.raw_value)
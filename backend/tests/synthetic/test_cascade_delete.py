@@ -0,0 +1,187 @@
+# tests/synthetic/test_cascade_delete.py
+"""Borrado en cascada en segundo plano: marca `deleting`, lotes y progreso."""
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.config import settings
+from app.models.category import Category
+from app.models.indicator import Indicator, IndicatorType, ScaleType
+from app.models.indicator_value import IndicatorValue
+from app.models.job import Job
+from app.models.scenario import Scenario
+from app.services import catalog_registry, jobs
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(settings, "DELETE_BATCH_SIZE", 100)
+
+
+def _copy_scenario(db, source_id: int, name: str) -> tuple[int, int]:
+    sc = Scenario(name=name, active=False)
+    db.add(sc)
+    db.flush()
+    db.execute(insert(IndicatorValue).from_select(
+        ["scenario_id", "country_id", "indicator_id", "raw_value", "normalized_value"],
+        select(sc.id, IndicatorValue.country_id, IndicatorValue.indicator_id,
+               IndicatorValue.raw_value, IndicatorValue.normalized_value)
+        .where(IndicatorValue.scenario_id == source_id),
+    ))
+    db.commit()
+    n = db.scalar(select(func.count()).select_from(IndicatorValue).where(IndicatorValue.scenario_id == sc.id))
+    return sc.id, n
+
+
+def _count_values(db, *where) -> int:
+    return db.scalar(select(func.count()).select_from(IndicatorValue).where(*where))
+
+
+def test_delete_scenario_in_background(client, db, admin_headers):
+    scenario_id, n = _copy_scenario(db, 1, "Escenario a borrar")
+    assert n > 300  # varios lotes
+
+    r = client.delete(f"/api/v1/scenarios/{scenario_id}", headers=admin_headers)
+    assert r.status_code == 202, r.text
+    job = r.json()
+    assert job["kind"] == "delete_scenario" and job["target_id"] == scenario_id
+
+    # ya no se ve, aunque el job no haya terminado
+    assert client.get(f"/api/v1/scenarios/{scenario_id}", headers=admin_headers).status_code == 404
+    assert client.get(f"/api/v1/public/ranking/global?scenario_id={scenario_id}").status_code in (400, 404)
+
+    jobs.wait(job["id"], timeout=30)
+    r = client.get(f"/api/v1/jobs/{job['id']}", headers=admin_headers)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["status"] == "done" and body["progress"] == 1.0
+    assert body["done"] == body["total"] >= n
+
+    db.expire_all()
+    assert db.get(Scenario, scenario_id) is None
+    assert _count_values(db, IndicatorValue.scenario_id == scenario_id) == 0
+
+
+def _temp_category(db, slug: str) -> tuple[int, list[int]]:
+    """Entorno sin asignar con 3 indicadores y valores en el escenario 1."""
+    cat = Category(name=slug.replace("-", " ").capitalize(), slug=slug)
+    db.add(cat)
+    db.flush()
+    inds = [
+        Indicator(name=f"{slug} {i}", slug=f"{slug}-{i}", value_type=IndicatorType.IMP,
+                  scale=ScaleType.FIJA_0_100, min_value=0, max_value=100, category_id=cat.id)
+        for i in range(3)
+    ]
+    db.add_all(inds)
+    db.flush()
+    country_ids = db.scalars(select(IndicatorValue.country_id).distinct()).all()
+    db.execute(insert(IndicatorValue), [
+        {"scenario_id": 1, "country_id": c, "indicator_id": ind.id, "raw_value": 50, "normalized_value": 2.5}
+        for c in country_ids for ind in inds
+    ])
+    db.commit()
+    catalog_registry.invalidate()
+    return cat.id, [i.id for i in inds]
+
+
+def test_delete_category_in_background(client, db, admin_headers):
+    cat_id, ind_ids = _temp_category(db, "entorno-temporal")
+
+    r = client.delete("/api/v1/categories/entorno-temporal", headers=admin_headers)
+    assert r.status_code == 202, r.text
+    job_id = r.json()["id"]
+    catalog = catalog_registry.get_catalog(db)
+    assert cat_id not in catalog.categories and not set(ind_ids) & set(catalog.indicators)
+
+    jobs.wait(job_id, timeout=30)
+    db.expire_all()
+    assert db.get(Job, job_id).status == "done"
+    assert db.get(Category, cat_id) is None
+    assert _count_values(db, IndicatorValue.indicator_id.in_(ind_ids)) == 0
+
+
+def test_deleting_category_leaves_analytics_at_once(client, db, admin_headers, monkeypatch):
+    cat_id, _ = _temp_category(db, "entorno-saliente")
+    ranking = f"/api/v1/public/ranking/category?category_id={cat_id}&limit=200&scenario_id=1"
+    index = f"/api/v1/public/index/category?country_id=1&category_id={cat_id}&scenario_id=1"
+    assert client.get(ranking).json()["items"]
+    assert client.get(index).json()["index"] is not None
+
+    # el job queda frenado: lo que se ve es solo la marca `deleting`
+    release = threading.Event()
+    real_delete_in_batches = jobs.delete_in_batches
+
+    def slow_delete_in_batches(*args, **kwargs):
+        assert release.wait(10)
+        return real_delete_in_batches(*args, **kwargs)
+
+    monkeypatch.setattr(jobs, "delete_in_batches", slow_delete_in_batches)
+    r = client.delete("/api/v1/categories/entorno-saliente", headers=admin_headers)
+    assert r.status_code == 202, r.text
+    try:
+        assert client.get(ranking).json()["items"] == []
+        assert client.get(index).json()["index"] is None
+        db.expire_all()
+        assert db.get(Category, cat_id) is not None  # el job no terminó
+    finally:
+        release.set()
+    jobs.wait(r.json()["id"], timeout=30)
+
+
+def test_assigned_category_is_not_deleted(client, db, admin_headers):
+    slug = catalog_registry.get_catalog(db).categories_sorted[0].slug
+    r = client.delete(f"/api/v1/categories/{slug}", headers=admin_headers)
+    assert r.status_code == 409
+    db.expire_all()
+    assert not db.scalar(select(Category.deleting).where(Category.slug == slug))
+
+
+def test_resume_unfinished_job(db):
+    # job de un worker que murió a mitad del borrado (lease vencido)
+    scenario_id, _ = _copy_scenario(db, 2, "Escenario huérfano")
+    db.get(Scenario, scenario_id).deleting = True
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_LEASE_SECONDS + 5)
+    job = Job(kind="delete_scenario", target_id=scenario_id, status="running",
+              total=0, done=0, worker="otro-host:1:abc", heartbeat_at=stale)
+    db.add(job)
+    db.commit()
+
+    assert jobs.resume_unfinished() == 1
+    jobs.wait(job.id, timeout=30)
+    db.expire_all()
+    assert db.get(Job, job.id).status == "done"
+    assert db.get(Scenario, scenario_id) is None
+    assert jobs.resume_unfinished() == 0
+
+
+def test_live_worker_keeps_its_jobs(db):
+    # otro worker vivo (heartbeat reciente): no se le roba el job
+    job = Job(kind="delete_scenario", target_id=10**9, status="running", total=0, done=0,
+              worker="otro-host:2:def", heartbeat_at=datetime.now(timezone.utc))
+    db.add(job)
+    db.commit()
+    try:
+        assert jobs.resume_unfinished() == 0
+        db.expire_all()
+        assert db.get(Job, job.id).worker == "otro-host:2:def"
+    finally:
+        db.delete(job)
+        db.commit()
+
+
+def test_heartbeat_renews_own_jobs(db):
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_LEASE_SECONDS + 5)
+    job = Job(kind="delete_scenario", target_id=10**9, status="pending", total=0, done=0,
+              worker=jobs.WORKER_ID, heartbeat_at=stale)
+    db.add(job)
+    db.commit()
+    try:
+        assert jobs.beat() >= 1
+        db.expire_all()
+        renewed = db.get(Job, job.id).heartbeat_at.replace(tzinfo=timezone.utc)
+        assert renewed > stale + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    finally:
+        db.delete(job)
+        db.commit()
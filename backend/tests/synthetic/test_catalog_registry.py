@@ -0,0 +1,73 @@
+# tests/synthetic/test_catalog_registry.py
+"""
+Registro en memoria del catálogo: lookups O(1), recarga por versión y GET
+condicional de los listados (la carga perezosa sin queries repetidas se
+mide en benchmarks/test_query_budget.py).
+"""
+from app.core.cache import bump_catalog
+from app.core.text import normalize_text
+from app.models.country import Country
+from app.services import catalog_registry
+
+
+def test_lookups(db):
+    cat = catalog_registry.get_catalog(db)
+    c = cat.countries_sorted[0]
+    assert cat.country(c.id) is c
+    assert cat.country(str(c.id)) is c
+    assert cat.country_by_iso2[c.iso2] is c
+    assert cat.country(c.iso3.upper()) is c
+    assert cat.country_by_name[normalize_text(c.name_es.upper())] is c
+
+    ind = cat.indicators_sorted[0]
+    assert cat.indicator_by_slug[ind.slug] is ind
+    assert catalog_registry.get_indicator(db, ind.id) is ind
+    assert cat.category_by_slug[cat.categories[ind.category_id].slug].id == ind.category_id
+
+
+def test_conditional_get_and_invalidation(client, db):
+    r = client.get("/api/v1/countries?limit=500")
+    etag = r.headers["etag"]
+    assert r.status_code == 200
+    assert client.get("/api/v1/countries?limit=500", headers={"If-None-Match": etag}).status_code == 304
+
+    c = Country(iso2="zz", iso3="zzz", name_es="Zzlandia", name_en="Zzland")
+    db.add(c)
+    db.commit()
+    try:
+        bump_catalog()
+        r = client.get("/api/v1/countries?limit=500", headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.headers["etag"] != etag
+        assert client.get("/api/v1/countries/ZZZ").json()["name_es"] == "Zzlandia"
+    finally:
+        db.delete(c)
+        db.commit()
+        bump_catalog()
+
+
+def test_load_raced_by_a_write_is_not_installed(db, monkeypatch):
+    real_load = catalog_registry._load
+    loads = []
+
+    def load_then_write(session, every=False):
+        cat = real_load(session)
+        if every or not loads:
+            bump_catalog()  # escritura que termina mientras se cargaba
+        loads.append(cat)
+        return cat
+
+    catalog_registry.invalidate()
+    monkeypatch.setattr(catalog_registry, "_load", load_then_write)
+    # la primera carga quedó vieja: se repite una vez y se instala la nueva
+    cat = catalog_registry.get_catalog(db)
+    assert len(loads) == 2 and cat is loads[1]
+    assert catalog_registry._current is cat
+
+    # si la versión sigue moviéndose, la request usa lo cargado pero no se instala
+    catalog_registry.invalidate()
+    loads.clear()
+    monkeypatch.setattr(catalog_registry, "_load", lambda s: load_then_write(s, every=True))
+    assert catalog_registry.get_catalog(db) is loads[-1]
+    assert catalog_registry._current is None
+    catalog_registry.invalidate()
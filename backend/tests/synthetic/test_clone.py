@@ -0,0 +1,51 @@
+# tests/synthetic/test_clone.py
+"""Clonado de escenarios en la BD (INSERT ... SELECT) con caches precalentadas."""
+from sqlalchemy import func, select
+
+from app.models.indicator_value import IndicatorValue
+from app.models.weights import CategoryWeight, IndicatorWeight
+from app.routes.scenarios import _matrix_payloads
+from app.services import public_bundle
+
+
+def _count(db, model, scenario_id: int) -> int:
+    return db.scalar(select(func.count()).select_from(model).where(model.scenario_id == scenario_id))
+
+
+def test_clone_copies_values_and_weights(client, db, admin_headers, cleanup_scenarios):
+    r = client.post("/api/v1/scenarios/1/clone", json={"name": "Copia de escenario 1"}, headers=admin_headers)
+    assert r.status_code == 201, r.text
+    body = r.json()
+    cleanup_scenarios.append(body["id"])
+    assert body["active"] is False and body["name"] == "Copia de escenario 1"
+
+    for model in (IndicatorValue, IndicatorWeight, CategoryWeight):
+        assert _count(db, model, body["id"]) == _count(db, model, 1), model.__name__
+
+    a = client.get("/api/v1/public/ranking/global?scenario_id=1&limit=1000").json()
+    b = client.get(f"/api/v1/public/ranking/global?scenario_id={body['id']}&limit=1000").json()
+    assert a == b
+
+
+def test_clone_warms_caches(client, admin_headers, cleanup_scenarios):
+    r = client.post("/api/v1/scenarios/1/clone", json={"name": "Copia precalentada"}, headers=admin_headers)
+    assert r.status_code == 201, r.text
+    scenario_id = r.json()["id"]
+    cleanup_scenarios.append(scenario_id)
+
+    # la BackgroundTask ya corrió: matriz y bundle salen de cache
+    misses = (_matrix_payloads.misses, public_bundle._bundles.misses)
+    assert client.get(f"/api/v1/scenarios/{scenario_id}/matrix").status_code == 200
+    assert client.get(f"/api/v1/public/bundle?scenario_id={scenario_id}").status_code == 200
+    assert (_matrix_payloads.misses, public_bundle._bundles.misses) == misses
+
+
+def test_clone_errors(client, admin_headers, cleanup_scenarios):
+    r = client.post("/api/v1/scenarios/1/clone", json={"name": "Copia con nombre repetido"}, headers=admin_headers)
+    assert r.status_code == 201
+    cleanup_scenarios.append(r.json()["id"])
+    again = client.post("/api/v1/scenarios/2/clone", json={"name": "Copia con nombre repetido"}, headers=admin_headers)
+    assert again.status_code == 409
+
+    missing = client.post("/api/v1/scenarios/999999/clone", json={"name": "No existe"}, headers=admin_headers)
+    assert missing.status_code == 404
@@ -0,0 +1,87 @@
+# tests/synthetic/test_db_async.py
+"""
+Motor async opcional para rutas de lectura: conversión de URL, ambas
+variantes de get_async_db y peticiones concurrentes sobre aiosqlite.
+"""
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from app import db_async
+from app.services import catalog_registry
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("mysql+pymysql://u:p@h/db", "mysql+aiomysql://u:p@h/db"),
+        ("sqlite:////tmp/x.sqlite", "sqlite+aiosqlite:////tmp/x.sqlite"),
+        ("sqlite+aiosqlite:///x.sqlite", "sqlite+aiosqlite:///x.sqlite"),
+    ],
+)
+def test_async_url(url, expected):
+    assert db_async.async_url(url) == expected
+
+
+def test_get_async_db_variants(dataset, scale, monkeypatch):
+    async def _use_dependency():
+        gen = db_async.get_async_db(Request({"type": "http", "headers": []}))
+        session = await gen.__anext__()
+        try:
+            cat = await session.run_sync(catalog_registry.get_catalog)
+            return type(session), len(cat.countries)
+        finally:
+            await gen.aclose()
+
+    kind, n = asyncio.run(_use_dependency())
+    assert kind is AsyncSession and n == scale["countries"]
+
+    # sin motor async: mismo contrato, con Session sync en el threadpool
+    monkeypatch.setattr(db_async, "AsyncSessionLocal", None)
+    kind, n = asyncio.run(_use_dependency())
+    assert kind is db_async.ThreadpoolSession and n == scale["countries"]
+
+
+def test_concurrent_public_reads(dataset):
+    from app.main import app
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            urls = [
+                "/api/v1/public/ranking/global?limit=20",
+                "/api/v1/public/index/global?country_id=1",
+                "/api/v1/countries?limit=500",
+                "/api/v1/indicators?q=entorno",
+            ] * 10
+            return await asyncio.gather(*(client.get(u) for u in urls))
+
+    responses = asyncio.run(_run())
+    assert {r.status_code for r in responses} == {200}
+
+
+def test_concurrent_reads_with_stale_catalog(dataset):
+    """
+    Catálogo vencido + lecturas concurrentes en el event loop: la recarga
+    no puede bloquear el hilo del loop esperando un lock (deadlock).
+    """
+    import threading
+
+    from app.main import app
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get("/api/v1/countries?limit=5") for _ in range(10)))
+
+    for _ in range(3):
+        catalog_registry.invalidate()
+        result: list = []
+        t = threading.Thread(target=lambda: result.append(asyncio.run(_run())), daemon=True)
+        t.start()
+        t.join(timeout=20)
+        assert not t.is_alive(), "lecturas colgadas con el catálogo vencido"
+        assert {r.status_code for r in result[0]} == {200}
@@ -0,0 +1,54 @@
+# tests/synthetic/test_db_pool.py
+"""Opciones del pool según Settings e instrumentación por eventos."""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config import settings
+from app.core import metrics
+from app.core.db_metrics import InstrumentedQueuePool, instrument_engine, pool_stats
+from app.db import engine_options
+
+
+def test_engine_options():
+    mysql = engine_options("mysql+pymysql://u:p@h/db")
+    assert mysql["poolclass"] is InstrumentedQueuePool
+    assert mysql["pool_size"] == settings.DB_POOL_SIZE
+    assert mysql["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert mysql["pool_recycle"] == settings.DB_POOL_RECYCLE
+    assert mysql["pool_timeout"] == settings.DB_POOL_TIMEOUT
+
+    assert "pool_size" not in engine_options("sqlite:////tmp/x.sqlite")
+    assert "poolclass" not in engine_options("sqlite://")
+    assert "poolclass" not in engine_options("sqlite+aiosqlite:////tmp/x.sqlite", is_async=True)
+
+
+def test_checkout_metrics_and_timeout(tmp_path):
+    eng = create_engine(
+        f"sqlite:///{tmp_path}/pool.sqlite",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    instrument_engine(eng, "test")
+
+    held = eng.connect()
+    held.execute(text("SELECT 1"))
+    assert metrics.REGISTRY["db_pool_checked_out"].values[("test",)] == 1
+    assert pool_stats(eng)["checked_out"] == 1
+
+    with pytest.raises(PoolTimeoutError):
+        eng.connect()
+    assert metrics.REGISTRY["db_pool_checkout_timeouts_total"].values[("test",)] == 1
+
+    held.close()
+    assert metrics.REGISTRY["db_pool_checked_out"].values[("test",)] == 0
+    assert metrics.REGISTRY["db_pool_connections_total"].values[("test",)] == 1
+    count = sum(metrics.REGISTRY["db_pool_checkout_seconds"].values[("test",)][0])
+    assert count == 2
+    eng.dispose()
+
+
+def test_db_health_reports_pool(client):
+    body = client.get("/db/health").json()
+    assert body["ok"] is True
+    assert body["pool"]["class"] == "InstrumentedQueuePool"
+    assert "checked_out" in body["pool"]
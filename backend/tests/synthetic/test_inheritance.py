@@ -0,0 +1,192 @@
+# tests/synthetic/test_inheritance.py
+"""Escenarios hijos copy-on-write: solo guardan el delta y leen a través del padre."""
+from io import BytesIO
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.indicator_value import IndicatorValue
+from app.models.weights import CategoryWeight, IndicatorWeight
+from app.services import catalog_registry
+
+
+@pytest.fixture()
+def family(client, admin_headers, scenario, cleanup_scenarios):
+    """(padre, hijo): el padre es una copia del escenario 1 para poder escribirle."""
+    r = client.post(
+        "/api/v1/scenarios",
+        json={"name": "Variante de la base", "active": False, "parent_id": scenario},
+        headers=admin_headers,
+    )
+    assert r.status_code == 201, r.text
+    child_id = r.json()["id"]
+    assert r.json()["parent_id"] == scenario
+    cleanup_scenarios.append(child_id)
+    return scenario, child_id
+
+
+def _own_rows(db, scenario_id: int) -> int:
+    return db.scalar(select(func.count()).select_from(IndicatorValue).where(IndicatorValue.scenario_id == scenario_id))
+
+
+def _matrix(client, scenario_id: int) -> dict:
+    body = client.get(f"/api/v1/scenarios/{scenario_id}/matrix").json()
+    return {k: body[k] for k in ("country_ids", "indicator_ids", "values", "raw_values")}
+
+
+def test_child_reads_through_parent(client, db, admin_headers, family):
+    parent_id, child_id = family
+    assert _own_rows(db, child_id) == 0
+
+    assert _matrix(client, child_id) == _matrix(client, parent_id)
+    ranking = "/api/v1/public/ranking/global?limit=1000&scenario_id="
+    assert client.get(ranking + str(child_id)).json() == client.get(ranking + str(parent_id)).json()
+    weights = client.get(f"/api/v1/weights/categories?scenario_id={child_id}").json()
+    assert weights["items"] and abs(weights["sum"] - 1.0) < 1e-6
+
+
+def test_override_and_parent_changes(client, db, admin_headers, family):
+    parent_id, child_id = family
+    m = _matrix(client, parent_id)
+    width = len(m["indicator_ids"])
+    cell = (m["country_ids"][0], m["indicator_ids"][0])
+    other = m["raw_values"][width]  # mismo indicador, otro país: valor válido
+    assert other is not None and other != m["raw_values"][0]
+
+    r = client.post("/api/v1/indicator-values", headers=admin_headers, json={
+        "scenario_id": child_id, "country_id": cell[0], "indicator_id": cell[1], "raw_value": other,
+    })
+    assert r.status_code == 201, r.text
+    assert _own_rows(db, child_id) == 1
+
+    child = _matrix(client, child_id)
+    assert child["raw_values"][0] == other
+    assert child["raw_values"][1:] == m["raw_values"][1:]
+    assert _matrix(client, parent_id) == m
+
+    # escribir en el padre invalida lo cacheado del hijo
+    r = client.post("/api/v1/indicator-values", headers=admin_headers, json={
+        "scenario_id": parent_id, "country_id": cell[0], "indicator_id": m["indicator_ids"][1],
+        "raw_value": m["raw_values"][width + 1],
+    })
+    assert r.status_code == 201, r.text
+    assert _matrix(client, child_id)["raw_values"][1] == m["raw_values"][width + 1]
+
+
+def test_import_stores_only_delta(client, db, admin_headers, family):
+    from openpyxl import Workbook
+
+    parent_id, child_id = family
+    m = _matrix(client, parent_id)
+    cat = catalog_registry.get_catalog(db)
+    names = {c.id: c.name_es for c in cat.countries_sorted}
+    indicators = {i.id: i.name for i in cat.indicators_sorted}
+    width = len(m["indicator_ids"])
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["País"] + [indicators[i] for i in m["indicator_ids"]])
+    for row, cid in enumerate(m["country_ids"]):
+        ws.append([names[cid]] + m["raw_values"][row * width:(row + 1) * width])
+    ws.cell(row=2, column=2).value = m["raw_values"][width]  # una sola celda distinta
+    buf = BytesIO()
+    wb.save(buf)
+
+    r = client.post(
+        f"/api/v1/indicator-values/import-matrix-excel?scenario_id={child_id}",
+        files={"file": ("matriz.xlsx", buf.getvalue())},
+        headers=admin_headers,
+    )
+    assert r.status_code == 200, r.text
+    body = r.json()
+    filled = sum(v is not None for v in m["raw_values"])
+    assert body["processed"] == 1 and body["inherited"] == filled - 1
+    assert _own_rows(db, child_id) == 1
+
+
+def test_parent_with_children_cannot_be_deleted(client, admin_headers, family):
+    parent_id, _ = family
+    r = client.delete(f"/api/v1/scenarios/{parent_id}", headers=admin_headers)
+    assert r.status_code == 409
+    assert client.get(f"/api/v1/scenarios/{parent_id}").status_code == 200
+
+
+def test_unknown_parent(client, admin_headers):
+    r = client.post(
+        "/api/v1/scenarios",
+        json={"name": "Huérfano", "active": False, "parent_id": 999999},
+        headers=admin_headers,
+    )
+    assert r.status_code == 404
+
+
+def _own_weights(db, model, scenario_id: int) -> list[tuple]:
+    key = model.category_id if model is CategoryWeight else model.indicator_id
+    return db.execute(
+        select(key, model.weight, model.excluded).where(model.scenario_id == scenario_id).order_by(key)
+    ).all()
+
+
+def test_weights_store_only_delta(client, db, admin_headers, family):
+    parent_id, child_id = family
+    url = "/api/v1/weights/categories?scenario_id="
+    parent = {i["category_id"]: i["weight"] for i in client.get(url + str(parent_id)).json()["items"]}
+    assert len(parent) >= 2
+
+    # el editor manda siempre el set completo: igual al heredado → nada propio
+    items = [{"category_id": k, "weight": w} for k, w in parent.items()]
+    r = client.put("/api/v1/weights/categories", json={"scenario_id": child_id, "items": items}, headers=admin_headers)
+    assert r.status_code == 204, r.text
+    assert _own_weights(db, CategoryWeight, child_id) == []
+
+    inds = client.get(f"/api/v1/weights/indicators?scenario_id={parent_id}").json()["items"]
+    r = client.put("/api/v1/weights/indicators", json={"scenario_id": child_id, "items": inds}, headers=admin_headers)
+    assert r.status_code == 204, r.text
+    assert _own_weights(db, IndicatorWeight, child_id) == []
+
+    # quitar un entorno y pasar su peso a otro: un cambio + un tombstone
+    (gone, w_gone), (kept, w_kept) = list(parent.items())[:2]
+    items = [{"category_id": k, "weight": w} for k, w in parent.items() if k not in (gone, kept)]
+    items.append({"category_id": kept, "weight": w_gone + w_kept})
+    r = client.put("/api/v1/weights/categories", json={"scenario_id": child_id, "items": items}, headers=admin_headers)
+    assert r.status_code == 204, r.text
+    own = {k: (float(w), ex) for k, w, ex in _own_weights(db, CategoryWeight, child_id)}
+    assert own == {gone: (0.0, True), kept: (pytest.approx(w_gone + w_kept), False)}
+
+    child = {i["category_id"]: i["weight"] for i in client.get(url + str(child_id)).json()["items"]}
+    assert gone not in child and child[kept] == pytest.approx(w_gone + w_kept)
+    assert {i["category_id"]: i["weight"] for i in client.get(url + str(parent_id)).json()["items"]} == parent
+
+    index = client.get(f"/api/v1/public/index/global?country_id=1&scenario_id={child_id}").json()
+    assert {d["category_id"] for d in index["detail"]} == set(child)
+
+    # lo que el hijo no tocó sigue llegando del padre
+    other = next(k for k in parent if k not in (gone, kept))
+    swapped = {**parent, other: parent[gone], gone: parent[other]}
+    items = [{"category_id": k, "weight": w} for k, w in swapped.items()]
+    r = client.put("/api/v1/weights/categories", json={"scenario_id": parent_id, "items": items}, headers=admin_headers)
+    assert r.status_code == 204, r.text
+    child = {i["category_id"]: i["weight"] for i in client.get(url + str(child_id)).json()["items"]}
+    assert child[other] == pytest.approx(w_gone) and gone not in child
+
+
+def test_remove_category_from_child(client, db, admin_headers, family):
+    parent_id, child_id = family
+    cat = catalog_registry.get_catalog(db)
+    category_id = next(iter(sorted(cat.categories)))
+    ind_ids = {i.id for i in cat.indicators_sorted if i.category_id == category_id}
+
+    r = client.delete(f"/api/v1/scenarios/{child_id}/categories/{category_id}", headers=admin_headers)
+    assert r.status_code == 204, r.text
+
+    weights = client.get(f"/api/v1/weights/categories?scenario_id={child_id}").json()["items"]
+    assert category_id not in {i["category_id"] for i in weights}
+    index = client.get(f"/api/v1/public/index/global?country_id=1&scenario_id={child_id}").json()
+    assert category_id not in {d["category_id"] for d in index["detail"]}
+    ranking = "/api/v1/public/ranking/category?limit=200&category_id="
+    assert client.get(f"{ranking}{category_id}&scenario_id={child_id}").json()["items"] == []
+    assert not ind_ids & set(_matrix(client, child_id)["indicator_ids"])
+
+    # el padre no cambia
+    assert client.get(f"{ranking}{category_id}&scenario_id={parent_id}").json()["items"]
+    assert ind_ids <= set(_matrix(client, parent_id)["indicator_ids"])
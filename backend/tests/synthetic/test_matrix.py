@@ -0,0 +1,51 @@
+# tests/synthetic/test_matrix.py
+"""Forma de GET /scenarios/{id}/matrix: row-major, null donde no hay dato, raw vs normalizado."""
+from sqlalchemy import delete, select, update
+
+from app.core.cache import bump_scenario
+from app.models.indicator_value import IndicatorValue
+
+
+def test_matrix_shape(client, db, scenario):
+    rows = db.execute(
+        select(IndicatorValue.id, IndicatorValue.country_id, IndicatorValue.indicator_id)
+        .where(IndicatorValue.scenario_id == scenario).order_by(IndicatorValue.id)
+    ).all()
+    # una celda sin fila y otra con fila pero sin dato
+    missing, empty = rows[0], rows[1]
+    db.execute(delete(IndicatorValue).where(IndicatorValue.id == missing.id))
+    db.execute(update(IndicatorValue).where(IndicatorValue.id == empty.id)
+               .values(raw_value=None, normalized_value=None))
+    db.commit()
+    bump_scenario(scenario)
+
+    r = client.get(f"/api/v1/scenarios/{scenario}/matrix")
+    assert r.status_code == 200
+    m = r.json()
+    assert m["scenario_id"] == scenario
+    assert m["country_ids"] == sorted(m["country_ids"]) and m["indicator_ids"] == sorted(m["indicator_ids"])
+    width = len(m["indicator_ids"])
+    assert len(m["values"]) == len(m["raw_values"]) == len(m["country_ids"]) * width
+
+    def at(country_id: int, indicator_id: int) -> int:
+        return m["country_ids"].index(country_id) * width + m["indicator_ids"].index(indicator_id)
+
+    db.expire_all()
+    stored = db.execute(
+        select(IndicatorValue.country_id, IndicatorValue.indicator_id,
+               IndicatorValue.raw_value, IndicatorValue.normalized_value)
+        .where(IndicatorValue.scenario_id == scenario)
+    ).all()
+    for country_id, indicator_id, raw, norm in stored:
+        k = at(country_id, indicator_id)
+        assert m["raw_values"][k] == (float(raw) if raw is not None else None)
+        assert m["values"][k] == (float(norm) if norm is not None else None)
+    # raw y normalizado son arrays distintos (no el mismo valor repetido)
+    assert any(r != v for r, v in zip(m["raw_values"], m["values"]) if r is not None)
+
+    for cell in (missing, empty):
+        k = at(cell.country_id, cell.indicator_id)
+        assert m["values"][k] is None and m["raw_values"][k] is None
+    # null = celda sin fila o con fila sin normalizado
+    null_rows = sum(norm is None for *_, norm in stored)
+    assert sum(v is None for v in m["values"]) == len(m["values"]) - len(stored) + null_rows
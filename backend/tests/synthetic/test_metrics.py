@@ -0,0 +1,47 @@
+# tests/synthetic/test_metrics.py
+"""/metrics en formato Prometheus (el costo del middleware: benchmarks/test_overhead.py)."""
+import re
+
+from app.config import settings
+
+
+def _sample(text: str, name: str, **labels) -> float:
+    want = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    for line in text.splitlines():
+        m = re.match(rf"^{re.escape(name)}\{{(.*)\}} (\S+)$", line)
+        if m and all(p in m.group(1).split(",") for p in want.split(",")):
+            return float(m.group(2))
+    raise AssertionError(f"{name} {labels} no está en /metrics")
+
+
+def test_metrics_exposition(client, admin_headers):
+    route = "/api/v1/countries/{code_or_id}"
+    for _ in range(3):
+        assert client.get("/api/v1/countries/c01").status_code == 200
+    client.get("/no-existe")
+
+    r = client.get("/metrics", headers=admin_headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert _sample(text, "http_requests_total", method="GET", route=route, status="200") >= 3
+    assert _sample(text, "http_requests_total", route="unmatched", status="404") >= 1
+    # buckets acumulados: +Inf == _count
+    inf = _sample(text, "http_request_duration_seconds_bucket", route=route, le="+Inf")
+    assert inf == _sample(text, "http_request_duration_seconds_count", route=route)
+    assert _sample(text, "http_response_size_bytes_sum", route=route) > 0
+    assert "http_requests_in_flight" in text
+
+    assert 0 <= _sample(text, "cache_hit_ratio", cache="public_results") <= 1
+    assert _sample(text, "db_pool_checked_out", engine="primary") >= 0
+
+
+def test_metrics_requires_token_or_admin(client, make_user, auth_headers, monkeypatch):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers=auth_headers(make_user("ANALISTA"))).status_code == 403
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scraper-secret")
+    assert client.get("/metrics", headers={"Authorization": "Bearer scraper-secret"}).status_code == 200
+    assert client.get("/metrics", headers={"Authorization": "Bearer otro"}).status_code == 401
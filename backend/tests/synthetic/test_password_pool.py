@@ -0,0 +1,72 @@
+# tests/synthetic/test_password_pool.py
+"""bcrypt en el pool de procesos: login y alta / cambio de contraseña async, métricas y admisión (503)."""
+import inspect
+
+import pytest
+
+from app.config import settings
+from app.core import metrics
+from app.core.security import hash_password
+
+
+@pytest.fixture()
+def user(make_user):
+    return make_user("ADMIN", password_hash=hash_password("Pool#12345"))
+
+
+def _login(client, user, password="Pool#12345"):
+    return client.post("/api/v1/auth/login", data={"username": user.email, "password": password})
+
+
+def test_login_through_pool(client, user):
+    assert _login(client, user).status_code == 200
+    assert _login(client, user, "incorrecta").status_code == 401
+
+    latency = metrics.REGISTRY["password_pool_seconds"]
+    assert sum(latency.values[("verify",)][0]) >= 2
+    assert metrics.REGISTRY["password_pool_pending"].values[()] == 0
+
+
+def test_user_passwords_through_pool(client, user, auth_headers):
+    from app.routes.users import create_user, update_user
+
+    # async: la espera del hash no ocupa un hilo de anyio
+    assert inspect.iscoroutinefunction(create_user)
+    assert inspect.iscoroutinefunction(update_user)
+
+    hashes = metrics.REGISTRY["password_pool_seconds"].values.get(("hash",))
+    before = sum(hashes[0]) if hashes else 0
+    headers = auth_headers(user)
+    r = client.post(
+        "/api/v1/users",
+        json={"name": "Nuevo", "email": "nuevo.hash@ceipa.com", "password": "Nuevo#12345"},
+        headers=headers,
+    )
+    assert r.status_code == 201, r.text
+    new_id = r.json()["id"]
+    try:
+        r = client.patch(f"/api/v1/users/{new_id}", json={"password": "Cambio#12345"}, headers=headers)
+        assert r.status_code == 200, r.text
+        assert client.post(
+            "/api/v1/auth/login", data={"username": "nuevo.hash@ceipa.com", "password": "Cambio#12345"}
+        ).status_code == 200
+        assert client.patch("/api/v1/users/999999", json={"name": "Otro nombre"}, headers=headers).status_code == 404
+    finally:
+        assert client.delete(f"/api/v1/users/{new_id}", headers=headers).status_code == 204
+    assert sum(metrics.REGISTRY["password_pool_seconds"].values[("hash",)][0]) == before + 2
+    assert metrics.REGISTRY["password_pool_pending"].values[()] == 0
+
+
+def test_admission_control_rejects_early(client, user, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_POOL_MAX_PENDING", 0)
+    r = _login(client, user)
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
+
+    r = client.post(
+        "/api/v1/users",
+        json={"name": "Nuevo", "email": "nuevo.pool@ceipa.com", "password": "Nuevo#12345"},
+        headers=auth_headers(user),
+    )
+    assert r.status_code == 503
+    assert metrics.REGISTRY["password_pool_rejected_total"].values[("verify",)] >= 1
@@ -0,0 +1,67 @@
+# tests/synthetic/test_profiling.py
+"""X-Profile: 1 solo para ADMIN, perfiles acotados y descargables."""
+import pstats
+
+import pytest
+
+from app.core import profiling
+
+
+@pytest.fixture()
+def store(tmp_path, monkeypatch):
+    s = profiling.ProfileStore(str(tmp_path), max_files=3)
+    monkeypatch.setattr(profiling, "store", s)
+    return s
+
+
+@pytest.fixture()
+def tokens(make_user, auth_headers):
+    return {"admin": auth_headers(make_user("ADMIN")), "editor": auth_headers(make_user("EDITOR"))}
+
+
+def test_admin_profiles_sync_endpoint(client, store, tokens, tmp_path):
+    h = {**tokens["admin"], "X-Profile": "1"}
+    r = client.get("/api/v1/scenarios/1/matrix", headers=h)
+    assert r.status_code == 200
+    pid = r.headers["x-profile-id"]
+
+    items = client.get("/api/v1/admin/profiles", headers=tokens["admin"]).json()["items"]
+    assert items[0]["id"] == pid
+    assert items[0]["route"] == "/api/v1/scenarios/{scenario_id}/matrix"
+    assert items[0]["status"] == 200
+
+    # el endpoint sync (threadpool) aparece en el perfil
+    funcs = {f[2] for f in pstats.Stats(str(tmp_path / f"{pid}.pstats")).stats}
+    assert "get_scenario_matrix" in funcs
+
+    r = client.get(f"/api/v1/admin/profiles/{pid}", headers=tokens["admin"])
+    assert r.status_code == 200 and len(r.content) > 0
+    r = client.get(f"/api/v1/admin/profiles/{pid}/summary?top=10", headers=tokens["admin"])
+    assert r.status_code == 200 and "function calls" in r.text
+
+
+def test_profile_requires_admin(client, store, tokens):
+    r = client.get("/api/v1/countries", headers={**tokens["editor"], "X-Profile": "1"})
+    assert r.status_code == 200 and "x-profile-id" not in r.headers
+    client.cookies.clear()  # otra prueba pudo dejar la cookie "token"
+    r = client.get("/api/v1/countries", headers={"X-Profile": "1"})
+    assert r.status_code == 200 and "x-profile-id" not in r.headers
+    r = client.get("/api/v1/countries", headers=tokens["admin"])  # sin cabecera
+    assert "x-profile-id" not in r.headers
+    assert store.list() == []
+
+    assert client.get("/api/v1/admin/profiles", headers=tokens["editor"]).status_code == 403
+
+
+def test_store_is_bounded(client, store, tokens):
+    h = {**tokens["admin"], "X-Profile": "1"}
+    ids = [client.get("/api/v1/countries", headers=h).headers["x-profile-id"] for _ in range(5)]
+    listed = [p["id"] for p in store.list()]
+    assert len(listed) == 3
+    assert set(listed) <= set(ids)
+
+
+def test_invalid_profile_id(client, store, tokens):
+    for pid in ("..%2F..%2Fetc%2Fpasswd", "20990101T000000-deadbeef"):
+        r = client.get(f"/api/v1/admin/profiles/{pid}", headers=tokens["admin"])
+        assert r.status_code == 404
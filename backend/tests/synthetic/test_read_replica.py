@@ -0,0 +1,111 @@
+# tests/synthetic/test_read_replica.py
+"""
+Réplica de lectura con dos SQLite (primario = BD de los tests, réplica =
+copia aparte): las lecturas van a la réplica, salvo para quien acaba de
+escribir (cookie); tras una escritura del proceso no llenan las caches.
+"""
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import db as db_module
+from app.config import settings
+from app.core import read_routing
+from app.models.public_description import PublicDescription
+from app.services import catalog_registry
+
+KEY = "hero"
+
+
+@pytest.fixture()
+def replica(dataset, tmp_path, monkeypatch):
+    # copia del primario "al día"; luego divergen como una réplica atrasada
+    dst = sqlite3.connect(tmp_path / "replica.sqlite")
+    src = sqlite3.connect(dataset.url.database)
+    src.backup(dst)
+    src.close()
+    dst.close()
+
+    url = f"sqlite:///{tmp_path}/replica.sqlite"
+    eng = create_engine(url)
+    ReplicaSession = sessionmaker(bind=eng, autoflush=False)
+    with ReplicaSession() as s:
+        s.add(PublicDescription(key=KEY, content="réplica"))
+        s.commit()
+
+    monkeypatch.setattr(settings, "READ_DATABASE_URL", url)
+    monkeypatch.setattr(db_module, "ReadSessionLocal", ReplicaSession)
+    monkeypatch.setattr(read_routing, "_last_write", float("-inf"))
+    yield
+    eng.dispose()
+
+
+@pytest.fixture()
+def admin(db, admin_headers):
+    yield admin_headers
+    db.query(PublicDescription).filter(PublicDescription.key == KEY).delete()
+    db.commit()
+
+
+def test_only_the_writer_reads_from_primary(replica, admin):
+    from app.main import app
+
+    client = TestClient(app)  # cookies propias, no las del client de sesión
+    url = f"/api/v1/public-descriptions/{KEY}"
+    assert client.get(url).json()["content"] == "réplica"
+
+    r = client.put(url, json={"content": "primario"}, headers=admin)
+    assert r.status_code == 200
+    assert read_routing.STICKY_COOKIE in r.headers["set-cookie"]
+    # quien escribió lee su cambio aunque la réplica no lo tenga
+    assert client.get(url).json()["content"] == "primario"
+
+    # los demás clientes siguen en la réplica aunque el proceso acabe de escribir
+    other = TestClient(app)
+    assert other.get(url).json()["content"] == "réplica"
+
+
+def test_login_is_not_a_write(replica, make_user):
+    from app.core.security import hash_password
+    from app.main import app
+
+    user = make_user("ADMIN", password_hash=hash_password("Login#12345"))
+    client = TestClient(app)
+    r = client.post("/api/v1/auth/login", data={"username": user.email, "password": "Login#12345"})
+    assert r.status_code == 200
+    assert read_routing.STICKY_COOKIE not in r.headers.get("set-cookie", "")
+    assert client.get(f"/api/v1/public-descriptions/{KEY}").json()["content"] == "réplica"
+
+
+def test_replica_reads_do_not_fill_caches_after_a_write(replica):
+    from app.main import app
+    from app.routes.public import _results
+
+    other = TestClient(app)
+    url = "/api/v1/public/ranking/global?limit=7"
+    _results.invalidate()
+    catalog_registry.invalidate()
+
+    read_routing.mark_write()
+    for _ in range(2):
+        assert other.get(url).status_code == 200
+        assert other.get("/api/v1/countries?limit=5").status_code == 200
+    assert _results.stats()["size"] == 0
+    assert catalog_registry._current is None
+
+    # fuera de la ventana la réplica ya está al día: se cachea como siempre
+    read_routing._last_write = float("-inf")
+    assert other.get(url).status_code == 200
+    assert other.get("/api/v1/countries?limit=5").status_code == 200
+    assert _results.stats()["size"] == 1
+    assert catalog_registry._current is not None
+
+
+def test_no_cookie_without_replica(client, db):
+    assert not read_routing.enabled()
+    r = client.post("/api/v1/auth/login", data={"username": "nadie@ceipa.com", "password": "x"})
+    assert "set-cookie" not in r.headers
+    assert read_routing.use_primary()
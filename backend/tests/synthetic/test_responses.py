@@ -0,0 +1,72 @@
+# tests/synthetic/test_responses.py
+"""
+Capa de respuestas: payloads cacheados ya comprimidos, negociación
+gzip / br, ETag débil y compresión al vuelo de respuestas grandes.
+"""
+import gzip
+
+import pytest
+
+from app.core import metrics
+from app.core.responses import CachedPayload, negotiate_encoding
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip, deflate", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("br;q=0, gzip", "gzip"),
+        ("*", "br"),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_cached_payload_compresses_once():
+    payload = CachedPayload.from_data({"values": list(range(2000))})
+    first = payload.encoded("gzip")
+    assert payload.encoded("gzip") is first
+    assert gzip.decompress(first) == payload.body
+    assert payload.encoded(None) is payload.body
+
+
+def test_bundle_served_precompressed_with_etag(client):
+    r = client.get("/api/v1/public/bundle", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.json()["scenario"]["active"] is True
+
+    etag = r.headers["etag"]
+    r2 = client.get(
+        "/api/v1/public/bundle",
+        headers={"Accept-Encoding": "br", "If-None-Match": etag},
+    )
+    assert r2.status_code == 304
+
+
+def test_ranking_cached_and_unknown_scenario_404(client):
+    url = "/api/v1/public/ranking/global?limit=50"
+    a = client.get(url, headers={"Accept-Encoding": "identity"})
+    b = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert a.status_code == 200 and "content-encoding" not in a.headers
+    assert a.content == b.content
+    assert a.headers["etag"] == b.headers["etag"]
+
+    assert client.get(url + "&scenario_id=999999").status_code == 404
+
+
+def test_dynamic_compression_and_metrics(client, scale):
+    r = client.get("/api/v1/countries?limit=500", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert len(r.json()["items"]) == min(scale["countries"], 500)
+
+    serialize = metrics.REGISTRY["http_response_serialize_seconds"]
+    compress = metrics.REGISTRY["http_response_compress_seconds"]
+    assert ("/api/v1/countries",) in serialize.values
+    assert ("/api/v1/countries", "gzip", "0") in compress.values
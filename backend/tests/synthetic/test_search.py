@@ -0,0 +1,50 @@
+# tests/synthetic/test_search.py
+"""Índice de búsqueda (trie + tokens) con las reglas de normalize_text."""
+from app.core.search import SearchIndex
+
+
+def _countries() -> SearchIndex:
+    idx = SearchIndex()
+    idx.add(1, ("Alemania", "Germany", "de", "deu"))
+    idx.add(2, ("Colombia", "Colombia", "co", "col"))
+    idx.add(3, ("Costa Rica", "Costa Rica", "cr", "cri"))
+    idx.add(4, ("Perú", "Peru", "pe", "per"))
+    idx.add(5, ("República Dominicana", "Dominican Republic", "do", "dom"))
+    return idx
+
+
+def test_accent_folding_and_prefix():
+    idx = _countries()
+    assert idx.search("PERU") == [4]
+    assert idx.search("repú") == [5]
+    assert idx.search("rep dom") == [5]
+    assert idx.search("dom rep") == [5]
+    assert idx.search("xyz") == []
+    assert idx.search("  ") == []
+
+
+def test_exact_and_iso_rank_first():
+    idx = _countries()
+    # "co" es ISO2 de Colombia y prefijo de Costa Rica
+    assert idx.search("co") == [2, 3]
+    # "cri" es ISO3 de Costa Rica
+    assert idx.search("cri")[0] == 3
+    # "do": ISO2 de Rep. Dominicana antes que "Dominican..." por prefijo
+    assert idx.search("do")[0] == 5
+
+
+def test_list_endpoints_use_index(client):
+    r = client.get("/api/v1/countries", params={"q": "PAÍS 1"})
+    items = r.json()["items"]
+    assert r.status_code == 200
+    assert items[0]["name_es"] == "País 1"  # exacto primero
+    assert all(i["name_es"].startswith("País 1") for i in items)
+
+    r = client.get("/api/v1/indicators", params={"q": "entorno 1 / indicador 0"})
+    names = [i["name"] for i in r.json()["items"]]
+    # exacto primero; "Entorno 0 / Indicador 1" también tiene ambas palabras
+    assert names[0] == "Entorno 1 / Indicador 0"
+    assert "Entorno 0 / Indicador 1" in names
+
+    r = client.get("/api/v1/categories", params={"q": "entorno-2"})
+    assert [c["slug"] for c in r.json()["items"]] == ["entorno-2"]
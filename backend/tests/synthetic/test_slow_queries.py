@@ -0,0 +1,58 @@
+# tests/synthetic/test_slow_queries.py
+"""Queries lentas agregadas por SQL normalizado y /admin/slow-queries."""
+import pytest
+
+from app.config import settings
+from app.core import slow_queries
+from app.core.cache import CACHES
+
+
+@pytest.fixture()
+def slow_log(monkeypatch):
+    log = slow_queries.SlowQueryLog(max_entries=50)
+    monkeypatch.setattr(slow_queries, "log", log)
+    monkeypatch.setattr(settings, "SLOW_QUERY_SECONDS", 0.0)  # todo cuenta como lenta
+    return log
+
+
+def test_normalize():
+    a = slow_queries.normalize("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x''y' LIMIT 10")
+    b = slow_queries.normalize("SELECT *\n FROM t WHERE id IN (%s, %s) AND name = %s LIMIT 5")
+    assert a == b == "SELECT * FROM t WHERE id IN (?, ...) AND name = ? LIMIT ?"
+    assert slow_queries.normalize("SELECT t1.c2 FROM t1") == "SELECT t1.c2 FROM t1"
+    assert slow_queries.params_shape([(1, "a"), (2, "b")], True) == "2×(int, str)"
+    assert slow_queries.params_shape({"b": 1.0, "a": None}, False) == "{a: NoneType, b: float}"
+
+
+def test_bounded_by_total_time():
+    log = slow_queries.SlowQueryLog(max_entries=2)
+    log.record("SELECT 1 FROM a", (), False, 0.5, "r")
+    log.record("SELECT 1 FROM b", (), False, 0.1, "r")
+    log.record("SELECT 1 FROM c", (), False, 0.3, "r")  # sale b (menor total)
+    assert [e["statement"] for e in log.top()] == ["SELECT ? FROM a", "SELECT ? FROM c"]
+    assert log.evicted == 1
+
+
+def test_admin_endpoint_aggregates_by_route(client, slow_log, admin_headers):
+    for cache in CACHES.values():
+        cache.invalidate()
+    for _ in range(3):
+        assert client.get("/api/v1/scenarios/1/matrix").status_code == 200
+
+    r = client.get("/api/v1/admin/slow-queries?sort=count&limit=100", headers=admin_headers)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["enabled"] and body["items"]
+    matrix = [e for e in body["items"] if "/api/v1/scenarios/{scenario_id}/matrix" in e["routes"]]
+    assert matrix and all(e["count"] >= 1 and e["max_ms"] >= 0 for e in matrix)
+    assert any("indicator_values" in e["statement"] for e in matrix)
+
+    assert client.delete("/api/v1/admin/slow-queries", headers=admin_headers).status_code == 204
+    # lo que queda es, como mucho, lo que corrió el propio DELETE (auth)
+    assert all("/api/v1/scenarios/{scenario_id}/matrix" not in e["routes"] for e in slow_log.top())
+
+
+def test_threshold(client, slow_log, monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_SECONDS", 60.0)
+    client.get("/api/v1/scenarios/1/matrix")
+    assert slow_log.top() == []
@@ -0,0 +1,90 @@
+# tests/synthetic/test_tracing.py
+"""Spans por request: muestreo, jerarquía padre/hijo y exportadores."""
+import json
+
+import pytest
+
+from app.config import settings
+from app.core import tracing
+from app.core.cache import CACHES
+
+
+@pytest.fixture()
+def spans_file(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(
+        tracing, "processor", tracing.BatchProcessor(tracing.JsonLinesExporter(str(path), 0))
+    )
+
+    def read() -> list[dict]:
+        tracing.flush()
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    for cache in CACHES.values():
+        cache.invalidate()
+    return read
+
+
+def test_sampled_request_has_nested_spans(client, spans_file, monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 1.0)
+    r = client.get("/api/v1/public/ranking/global?limit=5", headers={"X-Request-ID": "req-123"})
+    assert r.status_code == 200
+    assert r.headers["x-request-id"] == "req-123"
+
+    spans = spans_file()
+    by_name = {s["name"]: s for s in spans}
+    root = by_name["GET /api/v1/public/ranking/global"]
+    assert root["parent_id"] is None
+    assert root["attributes"]["http.status_code"] == 200
+    assert r.headers["traceparent"] == f"00-{root['trace_id']}-{root['span_id']}-01"
+
+    ranking = by_name["analytics.ranking_global"]
+    snapshot = by_name["analytics.load_snapshot"]
+    assert ranking["parent_id"] == root["span_id"]
+    assert snapshot["parent_id"] == ranking["span_id"]
+    assert {s["trace_id"] for s in spans} == {root["trace_id"]}
+    assert {s["request_id"] for s in spans} == {"req-123"}
+    assert 0 <= snapshot["duration_ms"] <= root["duration_ms"]
+
+
+def test_not_sampled_by_default(client, spans_file):
+    assert settings.TRACING_SAMPLE_RATE == 0
+    r = client.get("/api/v1/public/ranking/global?limit=5")
+    assert "traceparent" not in r.headers
+    assert spans_file() == []
+
+
+def test_incoming_traceparent(client, spans_file):
+    trace_id, parent = "ab" * 16, "cd" * 8
+    client.get("/api/v1/countries", headers={"traceparent": f"00-{trace_id}-{parent}-00"})
+    assert spans_file() == []  # flag sampled apagado
+
+    client.get("/api/v1/countries", headers={"traceparent": f"00-{trace_id}-{parent}-01"})
+    spans = spans_file()
+    root = next(s for s in spans if s["name"] == "GET /api/v1/countries")
+    assert root["trace_id"] == trace_id and root["parent_id"] == parent
+    assert any(s["name"] == "country_repo.list_countries" for s in spans)
+
+
+def test_error_span_and_otlp_shape():
+    trace = tracing._Trace("ab" * 16, "req")
+    t1 = tracing._trace.set(trace)
+    try:
+        with tracing.span("outer", rows=3):
+            with pytest.raises(ValueError):
+                with tracing.span("inner"):
+                    raise ValueError("x")
+    finally:
+        tracing._trace.reset(t1)
+
+    inner, outer = trace.spans
+    assert inner.status == "error" and inner.attributes["error.type"] == "ValueError"
+    assert inner.parent_id == outer.span_id
+
+    body = tracing.to_otlp(trace.spans)
+    otlp = {s["name"]: s for s in body["resourceSpans"][0]["scopeSpans"][0]["spans"]}
+    assert otlp["outer"]["kind"] == 2 and "parentSpanId" not in otlp["outer"]
+    assert otlp["inner"]["parentSpanId"] == outer.span_id and otlp["inner"]["status"]["code"] == 2
+    assert {"key": "rows", "value": {"intValue": "3"}} in otlp["outer"]["attributes"]
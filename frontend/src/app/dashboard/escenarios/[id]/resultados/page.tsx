@@ -4,6 +4,11 @@ import { useEffect, useMemo, useState } from "react";
 import { useParams } from "next/navigation";
 import dynamic from "next/dynamic";
 import { api } from "@/lib/api";
+import {
+  matrixToValues,
+  type MatrixValue,
+  type ScenarioMatrix,
+} from "@/lib/scenarioMatrix";
 import { CategoryIndexChart } from "@/components/results/CategoryIndexChart";
 import { GlobalIndexChart } from "@/components/results/GlobalIndexChart";
 import type { CountryPoint } from "@/components/results/GlobalIndexMap";
@@ -49,14 +54,7 @@ type Country = {
   name_en: string;
 };
 
-type IndicatorValue = {
-  id: number;
-  country_id: number;
-  indicator_id: number;
-  raw_value: number | null;
-  normalized_value: number | null; // 0..5
-  loaded_at: string;
-};
+type IndicatorValue = MatrixValue; // normalized_value 0..5
 
 type Paginated<T> = {
   page: number;
@@ -131,13 +129,11 @@ export default function ScenarioResultsPage() {
   }
 
   async function loadIndicatorValues() {
-    const { data } = await api.get<Paginated<IndicatorValue>>(
-      "/v1/indicator-values",
-      {
-        params: { scenario_id: scenarioId, page: 1, limit: 200 },
-      }
+    // matriz completa del escenario (antes solo llegaban los primeros 200 valores)
+    const { data } = await api.get<ScenarioMatrix>(
+      `/v1/scenarios/${scenarioId}/matrix`
     );
-    setIndicatorValues(data.items || []);
+    setIndicatorValues(matrixToValues(data));
   }
 
   async function loadIndicatorWeights() {
@@ -62,6 +62,14 @@ type Paginated<T> = {
   items: T[];
 };
 
+// /v1/indicator-values con cursor keyset (include_total=false)
+type CursorPage<T> = {
+  next_cursor: string | null;
+  items: T[];
+};
+
+const VALUES_PAGE_SIZE = 500;
+
 type CurrentUser = {
   id: number;
   name: string;
@@ -155,13 +163,27 @@ export default function ScenarioIndicatorValuesPage() {
   }
 
   async function loadIndicatorValues() {
-    const { data } = await api.get<Paginated<IndicatorValue>>(
-      "/v1/indicator-values",
-      {
-        params: { scenario_id: scenarioId, page: 1, limit: 200 },
-      }
-    );
-    setIndicatorValues(data.items || []);
+    // todas las filas del escenario (con id, para editar / borrar), página a
+    // página con el cursor keyset: antes solo llegaban las primeras 200
+    const all: IndicatorValue[] = [];
+    let cursor: string | null = null;
+    do {
+      const { data }: { data: CursorPage<IndicatorValue> } = await api.get(
+        "/v1/indicator-values",
+        {
+          params: {
+            scenario_id: scenarioId,
+            limit: VALUES_PAGE_SIZE,
+            sort: "cell",
+            include_total: false,
+            ...(cursor ? { cursor } : {}),
+          },
+        }
+      );
+      all.push(...(data.items || []));
+      cursor = data.next_cursor;
+    } while (cursor);
+    setIndicatorValues(all);
   }
 
   async function loadIndicatorsForCategories(catIds: number[]) {
@@ -361,7 +383,14 @@ export default function ScenarioIndicatorValuesPage() {
     }
 
     // ⚙️ 2) Si todos los valores están dentro de la escala → enviar al backend
-    const reqs: Promise<any>[] = [];
+    //    en UNA sola request (un solo commit) vía /indicator-values/bulk
+    const items: {
+      op: "upsert" | "update";
+      id?: number;
+      country_id?: number;
+      indicator_id?: number;
+      raw_value: number;
+    }[] = [];
 
     scenarioCats.forEach((sc) => {
       sc.indicators.forEach((ind) => {
@@ -371,32 +400,40 @@ export default function ScenarioIndicatorValuesPage() {
         const existingId = editingRecordIds[ind.id];
 
         if (existingId) {
-          reqs.push(
-            api.patch(`/v1/indicator-values/${existingId}`, {
-              raw_value: rawNum,
-            })
-          );
+          items.push({ op: "update", id: existingId, raw_value: rawNum });
         } else {
-          reqs.push(
-            api.post("/v1/indicator-values", {
-              scenario_id: scenarioId,
-              country_id: countryId,
-              indicator_id: ind.id,
-              raw_value: rawNum,
-            })
-          );
+          items.push({
+            op: "upsert",
+            country_id: countryId,
+            indicator_id: ind.id,
+            raw_value: rawNum,
+          });
         }
       });
     });
 
-    if (reqs.length === 0) {
+    if (items.length === 0) {
       // nada que guardar
       setOpenModal(false);
       return;
     }
 
     try {
-      await Promise.all(reqs);
+      const { data } = await api.post("/v1/indicator-values/bulk", {
+        scenario_id: scenarioId,
+        atomic: true,
+        items,
+      });
+      if (!data.committed) {
+        const firstError = (data.items || []).find(
+          (it: any) => it.status === "error"
+        );
+        showToast(
+          "error",
+          firstError?.error || "Ocurrió un error al guardar los valores."
+        );
+        return;
+      }
       setOpenModal(false);
       await loadIndicatorValues();
       showToast("success", "Valores guardados correctamente.");
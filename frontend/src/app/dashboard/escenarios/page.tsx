@@ -1,6 +1,6 @@
 "use client";
 
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { api } from "@/lib/api";
 import { Modal } from "@/components/ui/Modal";
 import { Search, Pencil, Trash2 } from "lucide-react";
@@ -21,6 +21,11 @@ type PaginatedScenarios = {
   items: Scenario[];
 };
 
+// GET /v1/scenarios/{id}/activation
+type ActivationState = "active" | "warming" | "failed" | "inactive";
+
+const ACTIVATION_POLL_MS = 1500;
+
 type CurrentUser = {
   id: number;
   name: string;
@@ -53,6 +58,19 @@ export default function EscenariosPage() {
   const [editActive, setEditActive] = useState(true);
   const [errorEdit, setErrorEdit] = useState<string | null>(null);
 
+  // activación en dos fases: el backend precalienta y después hace el swap
+  const [activation, setActivation] = useState<
+    Record<number, ActivationState>
+  >({});
+  const mounted = useRef(true);
+
+  useEffect(() => {
+    mounted.current = true;
+    return () => {
+      mounted.current = false;
+    };
+  }, []);
+
   // modal eliminar
   const [openDelete, setOpenDelete] = useState(false);
   const [deleteId, setDeleteId] = useState<number | null>(null);
@@ -183,8 +201,13 @@ export default function EscenariosPage() {
         payload.active = editActive;
       }
 
-      await api.patch(`/v1/scenarios/${editId}`, payload);
+      const res = await api.patch(`/v1/scenarios/${editId}`, payload);
       setOpenEdit(false);
+      // active=true no se aplica al instante: llega el job de activación
+      if (res.headers["x-activation-job"]) {
+        setActivation((prev) => ({ ...prev, [editId]: "warming" }));
+        void pollActivation(editId);
+      }
       await loadEscenarios();
     } catch (err: any) {
       console.error("Error actualizando escenario", err?.response?.data ?? err);
@@ -193,6 +216,33 @@ export default function EscenariosPage() {
     }
   }
 
+  async function pollActivation(scenarioId: number) {
+    while (mounted.current) {
+      await new Promise((r) => setTimeout(r, ACTIVATION_POLL_MS));
+      let state: ActivationState;
+      try {
+        const { data } = await api.get<{ state: ActivationState }>(
+          `/v1/scenarios/${scenarioId}/activation`
+        );
+        state = data.state;
+      } catch (err) {
+        console.error("Error consultando la activación", err);
+        state = "failed";
+      }
+      if (!mounted.current) return;
+      if (state === "warming") continue;
+
+      setActivation((prev) => {
+        const next = { ...prev };
+        if (state === "failed") next[scenarioId] = "failed";
+        else delete next[scenarioId];
+        return next;
+      });
+      if (state === "active") await loadEscenarios();
+      return;
+    }
+  }
+
   function openDeleteModal(s: Scenario) {
     setDeleteId(s.id);
     setDeleteName(s.name);
@@ -295,6 +345,14 @@ export default function EscenariosPage() {
                           <span className="rounded-full bg-emerald-500/80 px-2 py-0.5 text-[10px] uppercase font-semibold">
                             Activo
                           </span>
+                        ) : activation[esc.id] === "warming" ? (
+                          <span className="rounded-full bg-amber-500/80 px-2 py-0.5 text-[10px] uppercase font-semibold animate-pulse">
+                            Activando…
+                          </span>
+                        ) : activation[esc.id] === "failed" ? (
+                          <span className="rounded-full bg-red-500/80 px-2 py-0.5 text-[10px] uppercase font-semibold">
+                            Falló la activación
+                          </span>
                         ) : (
                           <span className="rounded-full bg-zinc-500/40 px-2 py-0.5 text-[10px] uppercase font-semibold">
                             Inactivo
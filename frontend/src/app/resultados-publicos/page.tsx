@@ -2,6 +2,11 @@
 
 import { useEffect, useMemo, useState, useRef } from "react";
 import { api } from "@/lib/api";
+import {
+  matrixToValues,
+  type MatrixValue,
+  type ScenarioMatrix,
+} from "@/lib/scenarioMatrix";
 import { CategoryIndexChart } from "@/components/results/CategoryIndexChart";
 import { GlobalIndexChart } from "@/components/results/GlobalIndexChart";
 import { getHeatColor } from "@/lib/heatColors";
@@ -61,30 +66,19 @@ type Country = {
   name_en: string;
 };
 
-type IndicatorValue = {
-  id: number;
-  country_id: number;
-  indicator_id: number;
-  raw_value: number | null;
-  normalized_value: number | null;
-  loaded_at: string;
-};
-
-type Paginated<T> = {
-  page: number;
-  limit: number;
-  total: number;
-  total_pages: number;
-  items: T[];
-};
+type IndicatorValue = MatrixValue;
 
 type DescriptionKey = "hero" | "chart_category" | "chart_global";
 
-type PublicDescription = {
-  id: number;
-  key: DescriptionKey;
-  title: string;
-  content: string;
+type PublicBundle = {
+  scenario: Scenario;
+  category_weights: CategoryWeight[];
+  indicator_weights: { indicator_id: number; weight: number }[];
+  categories: Category[];
+  countries: Country[];
+  indicators_by_category: Record<string, Indicator[]>;
+  matrix: ScenarioMatrix;
+  public_descriptions: { key: DescriptionKey; content: string }[];
 };
 
 const DISPLAY_SCALE = 5;
@@ -164,141 +158,59 @@ export default function PublicResultsPage() {
   const [pdfCountrySearch, setPdfCountrySearch] = useState("");
   const mapRef = useRef<GlobalIndexMapRef | null>(null);
 
-  /* ========== Loaders básicos ========== */
-
-  async function loadScenarioCategories(scenarioId: number) {
-    const { data } = await api.get("/v1/weights/categories", {
-      params: { scenario_id: scenarioId },
-    });
-    setCatWeights(data.items || []);
-  }
-
-  async function loadAllCategories() {
-    const { data } = await api.get("/v1/categories", {
-      params: { page: 1, limit: 100 },
-    });
-    setAllCategories(data.items || []);
-  }
-
-  async function loadAllCountries() {
-    const { data } = await api.get("/v1/countries", {
-      params: { page: 1, limit: 500, only_enabled: true },
-    });
-    setCountries(data.items || []);
-  }
-
-  async function loadIndicatorValues(scenarioId: number) {
-    const { data } = await api.get<Paginated<IndicatorValue>>(
-      "/v1/indicator-values",
-      {
-        params: { scenario_id: scenarioId, page: 1, limit: 200 },
-      }
-    );
-    setIndicatorValues(data.items || []);
-  }
-
-  async function loadIndicatorWeights(scenarioId: number) {
-    const { data } = await api.get("/v1/weights/indicators", {
-      params: { scenario_id: scenarioId },
-    });
-
-    const map: Record<number, number> = {};
-    (data.items || []).forEach((it: any) => {
-      map[it.indicator_id] = it.weight;
-    });
-    setIndicatorWeightsMap(map);
-  }
-
-  async function loadIndicatorsForCategories(catIds: number[]) {
-    const copy = { ...indicatorsByCat };
-    for (const cId of catIds) {
-      if (copy[cId]) continue;
-      const { data } = await api.get<Paginated<Indicator>>("/v1/indicators", {
-        params: { category_id: cId, page: 1, limit: 100 },
-      });
-      copy[cId] = data.items || [];
-    }
-    setIndicatorsByCat(copy);
-  }
-
-  /* ========== Cargar escenario activo ========== */
+  /* ========== Carga: un solo bundle público ========== */
 
+  // GET /v1/public/bundle trae escenario activo, pesos, categorías, países,
+  // indicadores por categoría, matriz de valores y descripciones en una
+  // sola respuesta cacheada (antes eran 8 + N requests).
   useEffect(() => {
     (async () => {
       setLoading(true);
       try {
-        const { data } = await api.get<Paginated<Scenario>>("/v1/scenarios", {
-          params: { page: 1, limit: 50 },
-        });
-
-        const items = data.items || [];
-        const activeScenario =
-          items.find((s: any) => s.active === true) || null;
-
-        if (!activeScenario) {
-          setScenario(null);
-          setHasActiveScenario(false);
-          return;
-        }
+        const { data } = await api.get<PublicBundle>("/v1/public/bundle");
 
-        setScenario(activeScenario);
+        setScenario(data.scenario);
         setHasActiveScenario(true);
 
-        const scenarioId = activeScenario.id;
+        setCatWeights(data.category_weights || []);
+        setAllCategories(data.categories || []);
+        setCountries(data.countries || []);
+        setIndicatorValues(matrixToValues(data.matrix));
 
-        await Promise.all([
-          loadScenarioCategories(scenarioId),
-          loadAllCategories(),
-          loadAllCountries(),
-          loadIndicatorValues(scenarioId),
-          loadIndicatorWeights(scenarioId),
-        ]);
-      } catch (err) {
-        console.error("Error cargando escenario activo (pública)", err);
-        setScenario(null);
-        setHasActiveScenario(false);
-      } finally {
-        setLoading(false);
-      }
-    })();
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, []);
+        const wMap: Record<number, number> = {};
+        (data.indicator_weights || []).forEach((it) => {
+          wMap[it.indicator_id] = it.weight;
+        });
+        setIndicatorWeightsMap(wMap);
 
-  // descripciones públicas
-  useEffect(() => {
-    (async () => {
-      try {
-        const { data } = await api.get<PublicDescription[]>(
-          "/v1/public-descriptions"
+        const byCat: Record<number, Indicator[]> = {};
+        Object.entries(data.indicators_by_category || {}).forEach(
+          ([catId, inds]) => {
+            byCat[Number(catId)] = inds;
+          }
         );
+        setIndicatorsByCat(byCat);
 
         const next: Record<DescriptionKey, string> = {
           ...DEFAULT_PUBLIC_TEXT,
         };
-
-        (data || []).forEach((item) => {
-          const key = item.key as DescriptionKey;
+        (data.public_descriptions || []).forEach((item) => {
           const content = item.content?.trim();
           if (content) {
-            next[key] = content;
+            next[item.key] = content;
           }
         });
-
         setPublicText(next);
       } catch (err) {
-        console.error("Error cargando descripciones públicas", err);
+        console.error("Error cargando escenario activo (pública)", err);
+        setScenario(null);
+        setHasActiveScenario(false);
+      } finally {
+        setLoading(false);
       }
     })();
   }, []);
 
-  // cargar indicadores al tener categorías
-  useEffect(() => {
-    if (catWeights.length === 0) return;
-    const ids = catWeights.map((c) => c.category_id);
-    loadIndicatorsForCategories(ids);
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [catWeights]);
-
   /* ========== Helpers / cálculos ========== */
 
   function getCategoryName(catId: number) {
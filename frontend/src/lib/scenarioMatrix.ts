@@ -0,0 +1,37 @@
+// Matriz país × indicador de un escenario (GET /v1/scenarios/{id}/matrix)
+export type ScenarioMatrix = {
+  scenario_id: number;
+  version: number;
+  country_ids: number[];
+  indicator_ids: number[];
+  values: (number | null)[]; // normalized_value, row-major
+  raw_values: (number | null)[];
+};
+
+export type MatrixValue = {
+  country_id: number;
+  indicator_id: number;
+  raw_value: number | null;
+  normalized_value: number | null;
+};
+
+// Expande la matriz a una lista de celdas con dato (mismo shape que /indicator-values)
+export function matrixToValues(m: ScenarioMatrix): MatrixValue[] {
+  const out: MatrixValue[] = [];
+  const width = m.indicator_ids.length;
+  m.country_ids.forEach((countryId, i) => {
+    m.indicator_ids.forEach((indicatorId, j) => {
+      const k = i * width + j;
+      const raw = m.raw_values[k];
+      const norm = m.values[k];
+      if (raw === null && norm === null) return;
+      out.push({
+        country_id: countryId,
+        indicator_id: indicatorId,
+        raw_value: raw,
+        normalized_value: norm,
+      });
+    });
+  });
+  return out;
+}